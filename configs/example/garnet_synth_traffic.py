@@ -36,6 +36,7 @@ addToPath("../")
 
 from common import Options
 from ruby import Ruby
+from network.steady_state import SteadyState
 
 # Get paths we might need.  It's expected this file is in m5/configs/example.
 config_path = os.path.dirname(os.path.abspath(__file__))
@@ -123,7 +124,8 @@ parser.add_argument(
     "--traffic-matrix",
     type = str,
     default = None,
-    help = "Traffic matrix file",
+    help = "Traffic matrix file, text or binary (see "
+    "configs/topologies/traffic_matrix.py)",
 )
 
 parser.add_argument(
@@ -155,30 +157,214 @@ parser.add_argument(
     help = "Use best effort routing",
 )
 
+parser.add_argument(
+    "--link-planner",
+    type=str,
+    default=None,
+    choices=["greedy", "anneal", "load", "random"],
+    help="Planner of the long-range links: greedy on the hop saving, "
+    "annealing from the greedy links, greedy on the maximum channel load "
+    "(--routing-algorithm=1 or 6 only), or random pairs (default: greedy "
+    "with --best-effort, random otherwise)",
+)
+
+parser.add_argument(
+    "--topology-seed",
+    type=int,
+    default=None,
+    help="Seed of the random long-range links and of --link-planner=anneal "
+    "(default: random links are unseeded, annealing uses 0)",
+)
+
+parser.add_argument(
+    "--topology-from",
+    type=str,
+    default=None,
+    help="Replay the long-range links of a topology.json manifest of an "
+    "earlier run instead of planning them",
+)
+
+parser.add_argument(
+    "--planner-time",
+    type=float,
+    default=10.0,
+    help="Wall-clock limit of --link-planner=anneal in seconds",
+)
+
+parser.add_argument(
+    "--planner-moves",
+    type=int,
+    default=200000,
+    help="Number of moves of --link-planner=anneal; the plan of a seed "
+    "is reproducible unless --planner-time stops the search first",
+)
+
+parser.add_argument(
+    "--topology-cache",
+    type=str,
+    default=os.environ.get("GEM5_TOPOLOGY_CACHE"),
+    help="Directory caching planned long-range topologies across runs "
+    "(defaults to $GEM5_TOPOLOGY_CACHE, disabled if unset)",
+)
+
+parser.add_argument(
+    "--topology-cache-size",
+    type=int,
+    default=64,
+    help="Size limit of --topology-cache in MiB, least recently used "
+    "entries are evicted first",
+)
+
+parser.add_argument(
+    "--shared-traffic-matrix",
+    action="store_true",
+    default=False,
+    help="Write the traffic matrix of --synthetic to traffic_matrix.tmb in "
+    "the output directory and inject from it, so that the tester sends "
+    "exactly the traffic the long-range links were planned for",
+)
+
+parser.add_argument(
+    "--steady-state",
+    action="store_true",
+    default=False,
+    help="Stop before --sim-cycles once the average packet latency has "
+    "converged or the network has saturated",
+)
+
+parser.add_argument(
+    "--warmup-cycles",
+    type=int,
+    default=None,
+    help="Cycles simulated before the statistics are reset, part of "
+    "--sim-cycles (default: 1000 with --steady-state, else 0)",
+)
+
+parser.add_argument(
+    "--stats-interval",
+    type=int,
+    default=0,
+    help="Dump and reset the statistics every this many cycles after the "
+    "warm-up, every dump in stats.txt is one window (0 to disable)",
+)
+
+parser.add_argument(
+    "--sample-cycles",
+    type=int,
+    default=1000,
+    help="Cycles of every latency sample (with --steady-state)",
+)
+
+parser.add_argument(
+    "--steady-state-ci",
+    type=float,
+    default=0.02,
+    help="Stop when the 95%% confidence interval of the latency is "
+    "narrower than this fraction of it (with --steady-state)",
+)
+
+parser.add_argument(
+    "--saturation-latency",
+    type=float,
+    default=1000,
+    help="Sampled packet latency at which the network counts as saturated "
+    "(with --steady-state)",
+)
+
+parser.add_argument(
+    "--sweep-rates",
+    nargs="+",
+    type=float,
+    default=None,
+    metavar="RATE",
+    help="Simulate these injection rates one after the other on the same "
+    "network, each for --sim-cycles with its own warm-up and one dump in "
+    "stats.txt, draining the network in between",
+)
+
+parser.add_argument(
+    "--drain-cycles",
+    type=int,
+    default=100000,
+    help="Give up draining the network between --sweep-rates after this "
+    "many cycles",
+)
+
+
+def rate_list(text):
+    return [float(rate) for rate in text.split(",") if rate]
+
+
+parser.add_argument(
+    "--fork-sweep",
+    type=rate_list,
+    default=None,
+    metavar="RATE,RATE,...",
+    help="Instantiate the network once and fork one simulation per "
+    "injection rate, each with its own output directory rate_<RATE>. The "
+    "stats file of the output directory itself stays empty",
+)
+
+parser.add_argument(
+    "--fork-jobs",
+    type=int,
+    default=os.cpu_count(),
+    help="Number of --fork-sweep simulations running at the same time",
+)
+
 #
 # Add the ruby specific and protocol specific options
 #
 Ruby.define_options(parser)
 
 args = parser.parse_args()
+if args.stats_interval > 0 and (
+    args.steady_state or args.sweep_rates or args.fork_sweep is not None
+):
+    parser.error(
+        "--stats-interval cannot be combined with --steady-state, "
+        "--sweep-rates or --fork-sweep"
+    )
+if args.fork_sweep is not None and args.sweep_rates:
+    parser.error("--fork-sweep cannot be combined with --sweep-rates")
+if args.fork_sweep is not None and not args.fork_sweep:
+    parser.error("--fork-sweep needs at least one injection rate")
+warmup_cycles = args.warmup_cycles
+if warmup_cycles is None:
+    warmup_cycles = 1000 if args.steady_state else 0
 tpdim = 2
 if "Cube" in args.topology:
     tpdim = 3
+
+traffic_type = args.synthetic
+traffic_matrix = args.traffic_matrix
+if args.shared_traffic_matrix:
+    from topologies.analyze import topology_dims
+    from topologies.traffic_matrix import TrafficMatrix
+
+    dims = topology_dims(args.topology, args.num_cpus, args.mesh_rows)
+    traffic_matrix = os.path.join(m5.options.outdir, "traffic_matrix.tmb")
+    TrafficMatrix.from_options(args, dims).write_binary(traffic_matrix)
+    traffic_type = "real_traffic"
+
 cpus = [
     GarnetSyntheticTraffic(
         num_packets_max=args.num_packets_max,
         single_sender=args.single_sender_id,
         single_dest=args.single_dest_id,
-        sim_cycles=args.sim_cycles,
-        traffic_type=args.synthetic,
-        inj_rate=args.injectionrate,
+        # With --sweep-rates the script ends the simulation
+        sim_cycles=2**31 - 1 if args.sweep_rates else args.sim_cycles,
+        traffic_type=traffic_type,
+        inj_rate=(
+            args.sweep_rates or args.fork_sweep or [args.injectionrate]
+        )[0],
         inj_vnet=args.inj_vnet,
         precision=args.precision,
         num_dest=args.num_dirs,
         topodim=tpdim,
         hotspots=args.hotspots,
         hotspot_factor=args.hotspot_factor,
-        traffic_matrix=args.traffic_matrix,
+        traffic_matrix=traffic_matrix,
     )
     for i in range(args.num_cpus)
 ]
@@ -196,6 +382,15 @@ system.clk_domain = SrcClockDomain(
 
 Ruby.create_system(args, False, system)
 
+# The long-range topologies leave their plan in args.topology_manifest
+if getattr(args, "topology_manifest", None):
+    from topologies.longrange_planner import write_manifest
+
+    write_manifest(
+        os.path.join(m5.options.outdir, "topology.json"),
+        args.topology_manifest,
+    )
+
 # Create a seperate clock domain for Ruby
 system.ruby.clk_domain = SrcClockDomain(
     clock=args.ruby_clock, voltage_domain=system.voltage_domain
@@ -219,10 +414,165 @@ root.system.mem_mode = "timing"
 # Not much point in this being higher than the L1 latency
 m5.ticks.setGlobalFrequency("500ps")
 
+# m5.fork() refuses to clone a simulator with open listeners
+if args.fork_sweep:
+    m5.disableAllListeners()
+
 # instantiate configuration
 m5.instantiate()
 
-# simulate until program terminates
-exit_event = m5.simulate(args.abs_max_tick)
-
-print("Exiting @ tick", m5.curTick(), "because", exit_event.getCause())
+# The testers compare --sim-cycles with curTick(), the other options count
+# cycles of the system clock
+cycle = m5.ticks.fromSeconds(m5.util.convert.anyToLatency(args.sys_clock))
+LIMIT = "simulate() limit reached"
+network = system.ruby.network
+
+
+def measure(duration):
+    """Warm up, reset the statistics and measure for ``duration`` ticks.
+
+    Returns the exit event of the last m5.simulate() and the reason the
+    measurement stopped before ``duration``, if any. An exit event other
+    than LIMIT ends the whole run.
+    """
+    if warmup_cycles > 0:
+        exit_event = m5.simulate(warmup_cycles * cycle)
+        if exit_event.getCause() != LIMIT:
+            return exit_event, None
+        m5.stats.reset()
+    end = m5.curTick() + duration
+    if args.steady_state:
+        monitor = SteadyState(
+            ci=args.steady_state_ci, saturation_latency=args.saturation_latency
+        )
+        cause = None
+        while cause is None and m5.curTick() < end:
+            exit_event = m5.simulate(
+                min(args.sample_cycles * cycle, end - m5.curTick())
+            )
+            if exit_event.getCause() != LIMIT:
+                break
+            monitor.add(
+                network.getPacketsInjected(),
+                network.getPacketsReceived(),
+                network.getPacketLatency(),
+            )
+            cause = monitor.status()
+        if monitor.latencies:
+            print(
+                f"Sampled {len(monitor.latencies)} windows: packet latency "
+                f"{monitor.mean():.2f} +- {monitor.half_width():.2f}"
+            )
+        return exit_event, cause
+    if args.stats_interval > 0:
+        # The last window is dumped at exit
+        while True:
+            exit_event = m5.simulate(
+                min(args.stats_interval * cycle, end - m5.curTick())
+            )
+            if exit_event.getCause() != LIMIT or m5.curTick() >= end:
+                return exit_event, None
+            m5.stats.dump()
+            m5.stats.reset()
+    return m5.simulate(end - m5.curTick()), None
+
+
+def drain():
+    """Simulate without injection until no packet moves for 100 cycles."""
+    for cpu in cpus:
+        cpu.setInjectionRate(0)
+    last = None
+    for _ in range(0, args.drain_cycles, 100):
+        exit_event = m5.simulate(100 * cycle)
+        if exit_event.getCause() != LIMIT:
+            return exit_event
+        counts = (network.getPacketsInjected(), network.getPacketsReceived())
+        if counts == last:
+            return exit_event
+        last = counts
+    print(f"Warning: network not drained after {args.drain_cycles} cycles")
+    return exit_event
+
+
+def fork_sweep(rates):
+    """Fork one simulation per injection rate, at most --fork-jobs at once.
+
+    Returns the rate of the child in a child process and None in the
+    parent, after all children have exited.
+    """
+    running = {}
+
+    def wait():
+        pid, status = os.wait()
+        rate = running.pop(pid)
+        if os.WIFEXITED(status):
+            code = os.WEXITSTATUS(status)
+            if code != 0:
+                print(f"Injection rate {rate} failed with exit status {code}")
+        elif os.WIFSIGNALED(status):
+            signal = os.WTERMSIG(status)
+            print(f"Injection rate {rate} killed by signal {signal}")
+
+    for rate in rates:
+        if len(running) >= args.fork_jobs:
+            wait()
+        outdir = os.path.join(m5.options.outdir, f"rate_{rate}")
+        pid = m5.fork(outdir.replace("%", "%%"))
+        if pid == 0:
+            return rate
+        running[pid] = rate
+    while running:
+        wait()
+    return None
+
+
+if args.fork_sweep:
+    rate = fork_sweep(args.fork_sweep)
+    if rate is None:
+        exit_event, cause = None, "forked all injection rates"
+    else:
+        # The stats file was opened in the output directory of the parent
+        del m5.stats.outputList[:]
+        m5.stats.addStatVisitor(m5.options.stats_file)
+        for cpu in cpus:
+            cpu.setInjectionRate(rate)
+        exit_event, cause = measure(args.abs_max_tick)
+        received = network.getPacketsReceived()
+        latency = network.getPacketLatency() / received if received else 0
+        print(
+            f"Injection rate {rate}: {received:.0f} packets, average packet "
+            f"latency {latency:.2f} in {m5.options.outdir}"
+        )
+elif args.sweep_rates:
+    for i, rate in enumerate(args.sweep_rates):
+        cause = None
+        if i > 0:
+            exit_event = drain()
+            if exit_event.getCause() != LIMIT:
+                break
+            m5.stats.reset()
+            for cpu in cpus:
+                cpu.setInjectionRate(rate)
+        # As long as a separate run of this rate, warm-up included
+        exit_event, cause = measure(
+            max(0, args.sim_cycles - warmup_cycles * cycle)
+        )
+        if exit_event.getCause() != LIMIT:
+            break
+        received = network.getPacketsReceived()
+        latency = network.getPacketLatency() / received if received else 0
+        print(
+            f"Injection rate {rate}: {received:.0f} packets, average packet "
+            f"latency {latency:.2f}" + (f" ({cause})" if cause else "")
+        )
+        # The last rate is dumped at exit
+        if i < len(args.sweep_rates) - 1:
+            m5.stats.dump()
+    else:
+        cause = "swept all injection rates"
+else:
+    # simulate until program terminates
+    exit_event, cause = measure(args.abs_max_tick)
+
+cause = cause or exit_event.getCause()
+print("Exiting @ tick", m5.curTick(), "because", cause)
@@ -0,0 +1,504 @@
+"""Analytical power and area of a Garnet network, without DSENT.
+
+util/on-chip-network-power-area.py builds DSENT and evaluates every router
+and link through its bindings. This model instead charges a fixed energy
+per bit for every router event and per bit and millimetre for every link
+flit, and sizes buffers, crossbars, allocators and wires from the
+parameters of config.ini or config.json. All routers and links of a
+network, and all runs that share it, are evaluated as NumPy arrays:
+
+  * area: buffers (ports x VCs x depth x flit bits), a crossbar of
+    (ports x flit bits x pitch)^2, allocator gates for the VC and switch
+    arbiters, and the wires of every internal link,
+  * static power: leakage proportional to the router area and to the
+    wire of the links,
+  * dynamic energy: buffer reads and writes, crossbar traversals and
+    switch arbitrations of every router, and the flits of every internal
+    (int_link_flits) and external link of the run.
+
+Routers sit on the grid of the topology, router i at the coordinates of
+topologies.traffic_matrix.grid_coordinates(), so the wire of a link is
+its Euclidean length in tiles, the length charged against the budget of
+the *_longrange topologies, times --tile-mm. The grid comes from the
+topology.json of the run or from num_rows of the network.
+
+The technology constants are coarse 45nm figures meant for comparing
+configurations; --tech takes a JSON file with other values:
+
+    PYTHONPATH=configs python -m network.power_area m5out
+    PYTHONPATH=configs python -m network.power_area --root output/sweeps \\
+        --tile-mm 2 --output power.csv --jobs 8
+"""
+
+import argparse
+import configparser
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from topologies.longrange_planner import wire_lengths
+from topologies.traffic_matrix import grid_coordinates
+
+try:
+    from m5.ext.pystats import textloader
+except ImportError:
+    sys.path.append(
+        os.path.join(
+            os.path.dirname(os.path.abspath(__file__)),
+            os.pardir,
+            os.pardir,
+            "src",
+            "python",
+        )
+    )
+    from m5.ext.pystats import textloader
+
+NETWORK = "system.ruby.network"
+
+# Energies in pJ, areas in um^2, leakage in W
+Technology = namedtuple(
+    "Technology",
+    [
+        "buffer_bit_area",  # per buffered bit
+        "buffer_read_energy",  # per bit
+        "buffer_write_energy",  # per bit
+        "crossbar_pitch",  # um per crossbar wire
+        "crossbar_energy",  # per bit and crossbar port
+        "arbiter_gate_area",  # per arbiter request line
+        "arbiter_energy",  # per arbitration and request line
+        "wire_pitch",  # um per link wire
+        "wire_energy",  # per bit and mm
+        "router_leakage",  # per um^2 of router
+        "wire_leakage",  # per bit and mm
+    ],
+)
+
+TECHNOLOGIES = {
+    "45nm": Technology(
+        buffer_bit_area=3.0,
+        buffer_read_energy=0.009,
+        buffer_write_energy=0.012,
+        crossbar_pitch=0.4,
+        crossbar_energy=0.006,
+        arbiter_gate_area=6.0,
+        arbiter_energy=0.02,
+        wire_pitch=0.28,
+        wire_energy=0.12,
+        router_leakage=1e-7,
+        wire_leakage=1e-6,
+    ),
+}
+
+# Router statistics, in the order of the router events
+ROUTER_STATS = (
+    "buffer_reads",
+    "buffer_writes",
+    "crossbar_activity",
+    "sw_input_arbiter_activity",
+    "sw_output_arbiter_activity",
+)
+
+# Routers and links of one network: the stat names of the routers, their
+# number of ports, the source and destination router of every internal
+# link, its wire in tiles and in mm, and the router of every external link.
+NetworkModel = namedtuple(
+    "NetworkModel",
+    "routers ports vcs depth width src dst tiles length ext_router "
+    "ext_length",
+)
+
+
+def read_technology(name):
+    """A Technology by name, or from a JSON file of its fields."""
+    if name in TECHNOLOGIES:
+        return TECHNOLOGIES[name]
+    with open(name, "r") as f:
+        values = json.load(f)
+    return TECHNOLOGIES["45nm"]._replace(**values)
+
+
+def _json_value(value):
+    if isinstance(value, dict):
+        return value.get("path", "")
+    if isinstance(value, list):
+        return " ".join(_json_value(v) for v in value)
+    return str(value)
+
+
+def _json_sections(node, sections):
+    if isinstance(node, list):
+        for child in node:
+            _json_sections(child, sections)
+    elif isinstance(node, dict):
+        if "path" in node:
+            sections[node["path"]] = {
+                key: _json_value(value) for key, value in node.items()
+            }
+        for value in node.values():
+            _json_sections(value, sections)
+    return sections
+
+
+def read_sections(path):
+    """The SimObjects of a config.ini or config.json as a dict of path to
+    parameter dict, with the parameters as strings like in config.ini.
+    """
+    if path.endswith(".json"):
+        with open(path, "r") as f:
+            return _json_sections(json.load(f), {})
+    config = configparser.ConfigParser(interpolation=None)
+    if not config.read(path):
+        raise FileNotFoundError(path)
+    return {name: dict(config[name]) for name in config.sections()}
+
+
+def find_config(outdir):
+    """The config.json or config.ini of an output directory."""
+    for name in ("config.json", "config.ini"):
+        path = os.path.join(outdir, name)
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(f"No config.json or config.ini in {outdir}")
+
+
+def network_dims(sections, num_routers, manifest=None):
+    """Grid of the routers: the dims of a topology.json, else a mesh of
+    num_rows rows, or a cube if the routers have Up links.
+    """
+    if manifest and os.path.exists(manifest):
+        with open(manifest, "r") as f:
+            return tuple(json.load(f)["dims"])
+    rows = int(sections[NETWORK].get("num_rows", 0))
+    if rows <= 0:
+        raise ValueError(f"{NETWORK}.num_rows is not set")
+    links = sections[NETWORK]["int_links"].split()
+    if any(sections[link].get("src_outport") == "Up" for link in links):
+        return (rows, rows, rows)
+    return (num_routers // rows, rows)
+
+
+def read_network(config, tile_mm=1.0, ext_tiles=0.5, manifest=None):
+    """The NetworkModel of a config.ini or config.json.
+
+    ``manifest`` is the topology.json of the run, if any; ``ext_tiles`` is
+    the length of the links between the network interfaces and their
+    router, in tiles.
+    """
+    sections = read_sections(config)
+    network = sections[NETWORK]
+    routers = network["routers"].split()
+    router_ids = {name: int(sections[name]["router_id"]) for name in routers}
+    order = [name for _, name in sorted((i, n) for n, i in router_ids.items())]
+    index = {name: i for i, name in enumerate(order)}
+    int_links = network["int_links"].split()
+    src = np.array(
+        [index[sections[link]["src_node"]] for link in int_links],
+        dtype=np.int64,
+    )
+    dst = np.array(
+        [index[sections[link]["dst_node"]] for link in int_links],
+        dtype=np.int64,
+    )
+    ext_router = np.array(
+        [
+            index[sections[link]["int_node"]]
+            for link in network["ext_links"].split()
+        ],
+        dtype=np.int64,
+    )
+    num_routers = len(order)
+    # Every internal link is an output of its source and an input of its
+    # destination router, every external link both.
+    ports = np.bincount(src, minlength=num_routers) + np.bincount(
+        ext_router, minlength=num_routers
+    )
+    coords = grid_coordinates(network_dims(sections, num_routers, manifest))
+    if len(coords) != num_routers:
+        raise ValueError(
+            f"{config}: {num_routers} routers do not fill the grid of "
+            f"{len(coords)}"
+        )
+    tiles = wire_lengths(coords)[src, dst] if len(src) else np.zeros(0)
+    vcs = int(network["vcs_per_vnet"]) * int(
+        network["number_of_virtual_networks"]
+    )
+    return NetworkModel(
+        routers=order,
+        ports=ports,
+        vcs=vcs,
+        depth=int(network["buffers_per_data_vc"]),
+        width=8 * int(network["ni_flit_size"]),
+        src=src,
+        dst=dst,
+        tiles=tiles,
+        length=tiles * tile_mm,
+        ext_router=ext_router,
+        ext_length=ext_tiles * tile_mm,
+    )
+
+
+def router_area(model, tech):
+    """Area of every router in um^2: (buffers, crossbar, allocators)."""
+    ports = model.ports.astype(np.float64)
+    buffers = ports * model.vcs * model.depth * model.width
+    buffers = buffers * tech.buffer_bit_area
+    crossbar = (ports * model.width * tech.crossbar_pitch) ** 2
+    # A VC arbiter per input VC over the VCs of the port, a switch
+    # arbiter per output over the input ports
+    requests = ports * model.vcs * model.vcs + ports * ports
+    allocators = requests * tech.arbiter_gate_area
+    return buffers, crossbar, allocators
+
+
+def link_area(model, tech):
+    """Wire area of every internal link in um^2."""
+    return model.width * tech.wire_pitch * model.length * 1e3
+
+
+def static_power(model, tech):
+    """Leakage of the routers and of the internal links in W."""
+    area = sum(router_area(model, tech))
+    wires = model.width * model.length * tech.wire_leakage
+    return float(area.sum() * tech.router_leakage), float(wires.sum())
+
+
+def event_energy(model, tech):
+    """Energy in pJ of one event of every ROUTER_STATS, per router."""
+    ports = model.ports.astype(np.float64)
+    width = model.width
+    return np.stack(
+        [
+            np.full(len(ports), width * tech.buffer_read_energy),
+            np.full(len(ports), width * tech.buffer_write_energy),
+            width * ports * tech.crossbar_energy,
+            np.full(len(ports), model.vcs * tech.arbiter_energy),
+            ports * tech.arbiter_energy,
+        ],
+        axis=1,
+    )
+
+
+def dynamic_energy(model, tech, router_events, link_flits, ext_flits):
+    """Dynamic energy in J of runs on the same network.
+
+    ``router_events`` is (runs, routers, len(ROUTER_STATS)), ``link_flits``
+    (runs, internal links) and ``ext_flits`` (runs,) the flits that
+    crossed the external links in either direction. Returns the router and
+    link energy of every run.
+    """
+    routers = np.einsum("srk,rk->s", router_events, event_energy(model, tech))
+    per_flit = model.width * tech.wire_energy
+    links = link_flits @ (model.length * per_flit)
+    links = links + ext_flits * model.ext_length * per_flit
+    return routers * 1e-12, links * 1e-12
+
+
+def run_activity(table, model, dump=-1):
+    """Router events, link flits, external flits, packets and seconds of
+    the stats of one run (a table of textloader.load).
+    """
+    dumps = np.unique(table["dump"])
+    if len(dumps) == 0:
+        raise ValueError("no statistics")
+    table = table[table["dump"] == dumps[dump]]
+    values = {
+        (stat, index): value
+        for stat, index, value in zip(
+            table["stat"], table["index"], table["value"]
+        )
+    }
+
+    def get(stat, index=""):
+        return values.get((stat, index), 0.0)
+
+    events = np.array(
+        [[get(f"{r}.{s}") for s in ROUTER_STATS] for r in model.routers]
+    )
+    flits = np.array(
+        [
+            get(f"{NETWORK}.int_link_flits", str(i))
+            for i in range(len(model.src))
+        ]
+    )
+    ext_flits = get(f"{NETWORK}.ext_in_link_utilization") + get(
+        f"{NETWORK}.ext_out_link_utilization"
+    )
+    packets = get(f"{NETWORK}.packets_received", "total")
+    seconds = get("simSeconds") or get("sim_seconds")
+    events = events.reshape(-1, len(ROUTER_STATS))
+    return events, flits, ext_flits, packets, seconds
+
+
+def evaluate(model, tech, activities):
+    """Power and area rows of runs on the same network.
+
+    ``activities`` are the run_activity() of every run.
+    """
+    buffers, crossbar, allocators = router_area(model, tech)
+    links = link_area(model, tech)
+    router_leakage, wire_leakage = static_power(model, tech)
+    router_energy, link_energy = dynamic_energy(
+        model,
+        tech,
+        np.stack([a[0] for a in activities]),
+        np.stack([a[1] for a in activities]),
+        np.array([a[2] for a in activities], dtype=np.float64),
+    )
+    rows = []
+    for k, (_, _, _, packets, seconds) in enumerate(activities):
+        static_energy = (router_leakage + wire_leakage) * seconds
+        energy = router_energy[k] + link_energy[k] + static_energy
+        rows.append(
+            {
+                "routers": len(model.routers),
+                "int_links": len(model.src),
+                "long_links": int((model.tiles > 1).sum()),
+                "wire_mm": float(model.length.sum()),
+                "router_area_mm2": float(
+                    (buffers + crossbar + allocators).sum() * 1e-6
+                ),
+                "link_area_mm2": float(links.sum() * 1e-6),
+                "static_power_w": router_leakage + wire_leakage,
+                "dynamic_power_w": (
+                    (router_energy[k] + link_energy[k]) / seconds
+                    if seconds
+                    else float("nan")
+                ),
+                "router_energy_j": float(router_energy[k]),
+                "link_energy_j": float(link_energy[k]),
+                "energy_j": float(energy),
+                "packets": packets,
+                "energy_per_packet_nj": (
+                    energy / packets * 1e9 if packets else float("nan")
+                ),
+            }
+        )
+    return rows
+
+
+def _digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def evaluate_runs(
+    outdirs, tech, tile_mm=1.0, ext_tiles=0.5, jobs=None, dump=-1
+):
+    """Power and area rows of many output directories, in their order.
+
+    The stats are loaded in parallel and the runs that share a network
+    (the same config file) are evaluated together.
+    """
+    outdirs = list(outdirs)
+    tables = textloader.load_runs(
+        outdirs,
+        stats=[f"{NETWORK}.*", "simSeconds", "sim_seconds"],
+        jobs=jobs,
+    )
+    groups = {}
+    for outdir in outdirs:
+        config = find_config(outdir)
+        manifest = os.path.join(outdir, "topology.json")
+        key = (_digest(config), os.path.exists(manifest) and _digest(manifest))
+        groups.setdefault(key, (config, manifest, []))[2].append(outdir)
+    # load_runs() keeps the rows of every run together
+    starts = np.flatnonzero(tables["run"][1:] != tables["run"][:-1]) + 1
+    starts = np.concatenate([[0], starts, [len(tables)]])
+    runs = {
+        tables["run"][start]: tables[start:end]
+        for start, end in zip(starts[:-1], starts[1:])
+        if end > start
+    }
+    rows = {}
+    for config, manifest, members in groups.values():
+        model = read_network(config, tile_mm, ext_tiles, manifest)
+        activities = []
+        for outdir in members:
+            if outdir not in runs:
+                raise ValueError(f"No network statistics in {outdir}")
+            activities.append(run_activity(runs[outdir], model, dump))
+        for outdir, row in zip(members, evaluate(model, tech, activities)):
+            rows[outdir] = dict(outdir=outdir, **row)
+    return [rows[outdir] for outdir in outdirs]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "outdirs", nargs="*", help="Output directories of gem5 runs"
+    )
+    parser.add_argument(
+        "--root",
+        default=None,
+        help="Also evaluate every output directory below this one",
+    )
+    parser.add_argument(
+        "--tech",
+        default="45nm",
+        help=f"One of {', '.join(TECHNOLOGIES)} or a JSON file of "
+        "technology constants",
+    )
+    parser.add_argument(
+        "--tile-mm",
+        type=float,
+        default=1.0,
+        help="Distance between neighbouring routers in mm",
+    )
+    parser.add_argument(
+        "--ext-tiles",
+        type=float,
+        default=0.5,
+        help="Length of the links to the network interfaces in tiles",
+    )
+    parser.add_argument(
+        "--dump",
+        type=int,
+        default=-1,
+        help="Index of the stats dump to evaluate (default: the last)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count(),
+        help="Number of stats files loaded in parallel",
+    )
+    parser.add_argument(
+        "--output", default="-", help="CSV file for the results"
+    )
+    args = parser.parse_args(argv)
+
+    outdirs = list(args.outdirs)
+    if args.root:
+        outdirs += textloader.find_runs(args.root)
+    if not outdirs:
+        parser.error("no output directories")
+    begin = time.perf_counter()
+    rows = evaluate_runs(
+        outdirs,
+        read_technology(args.tech),
+        args.tile_mm,
+        args.ext_tiles,
+        args.jobs,
+        args.dump,
+    )
+    out = sys.stdout if args.output == "-" else open(args.output, "w")
+    writer = csv.DictWriter(out, fieldnames=list(rows[0]))
+    writer.writeheader()
+    writer.writerows(rows)
+    if out is not sys.stdout:
+        out.close()
+    print(
+        f"Evaluated {len(rows)} runs in {time.perf_counter() - begin:.2f}s",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Steady-state detection for synthetic traffic runs.
+
+garnet_synth_traffic.py --steady-state simulates in windows of
+--sample-cycles after the warm-up and feeds the running packet totals of
+the network to SteadyState after each window. Every window is one batch
+mean of the packet latency; the run stops once the 95% confidence
+interval of their average is narrower than --steady-state-ci of the
+average, or as soon as the network saturates: a window latency above
+--saturation-latency, or a backlog of packets in flight that keeps growing
+for several windows.
+"""
+
+import math
+
+# Two-sided 95% quantiles of Student's t, by degrees of freedom
+# fmt: off
+_T95 = [
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+]
+# fmt: on
+
+
+def t95(dof):
+    """95% quantile of Student's t, normal beyond 30 degrees of freedom."""
+    return _T95[dof - 1] if dof <= len(_T95) else 1.96
+
+
+class SteadyState(object):
+    """Batch means of the packet latency of consecutive windows.
+
+    ``add()`` takes the totals since the start of the measurement (the
+    stats reset after the warm-up); windows without received packets are
+    merged into the next one.
+    """
+
+    def __init__(
+        self,
+        ci=0.02,
+        min_windows=5,
+        saturation_latency=1000.0,
+        backlog_windows=3,
+    ):
+        self.ci = ci
+        self.min_windows = min_windows
+        self.saturation_latency = saturation_latency
+        self.backlog_windows = backlog_windows
+        self.latencies = []
+        self.backlogs = []
+        self._last = (0.0, 0.0, 0.0)
+
+    def add(self, injected, received, latency):
+        """Record the window ending at these running totals."""
+        last_injected, last_received, last_latency = self._last
+        if received <= last_received:
+            return
+        self.latencies.append(
+            (latency - last_latency) / (received - last_received)
+        )
+        self.backlogs.append((injected - received, injected - last_injected))
+        self._last = (injected, received, latency)
+
+    def mean(self):
+        return sum(self.latencies) / len(self.latencies)
+
+    def half_width(self):
+        """Half width of the 95% confidence interval of mean()."""
+        n = len(self.latencies)
+        if n < 2:
+            return math.inf
+        mean = self.mean()
+        var = sum((x - mean) ** 2 for x in self.latencies) / (n - 1)
+        return t95(n - 1) * math.sqrt(var / n)
+
+    def converged(self):
+        return (
+            len(self.latencies) >= self.min_windows
+            and self.half_width() <= self.ci * self.mean()
+        )
+
+    def saturated(self):
+        if not self.latencies:
+            return False
+        if self.latencies[-1] > self.saturation_latency:
+            return True
+        # The packets in flight grew by more than a tenth of the window's
+        # injections in each of the last windows.
+        recent = self.backlogs[-self.backlog_windows - 1 :]
+        if len(recent) <= self.backlog_windows:
+            return False
+        return all(
+            b - a > 0.1 * injected
+            for (a, _), (b, injected) in zip(recent, recent[1:])
+        )
+
+    def status(self):
+        """Why the measurement can stop, None while it has to go on."""
+        if self.saturated():
+            return "network saturated"
+        if self.converged():
+            return "steady state reached"
+        return None
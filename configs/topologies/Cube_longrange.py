@@ -27,11 +27,11 @@
 
 from m5.params import *
 from m5.objects import *
-import random
 
 from common import FileSystemConfig
 
 from topologies.BaseTopology import SimpleTopology
+from topologies.longrange_planner import plan_long_range_links
 
 # Creates a generic Mesh assuming an equal number of cache
 # and directory controllers.
@@ -45,145 +45,6 @@ class Cube_longrange(SimpleTopology):
     def __init__(self, controllers):
         self.nodes = controllers
 
-    # Makes a generic mesh
-    # assuming an equal number of cache and directory cntrls
-    def initTrafficFreqFromSyntheticType(self, options, num_w, num_h, num_d):
-        synthetic = options.synthetic
-        num_routers = num_w * num_h * num_d
-        traffic_matrix = [[0 for i in range(num_routers)] for j in range(num_routers)]
-        if options.single_dest_id != -1:
-            for i in range(num_routers):
-                traffic_matrix[i][options.single_dest_id] = 1
-        elif synthetic == "uniform_random":
-            for i in range(num_routers):
-                for j in range(num_routers):
-                    traffic_matrix[i][j] = 1
-        elif synthetic == "transpose":
-            for i in range(num_w):
-                for j in range(num_h):
-                    for k in range(num_d):
-                        # # (i, j, k) -> (j, k, i)
-                        # src = i + j * num_w + k * num_w * num_h
-                        # dst = j + k * num_h + i * num_w * num_h
-                        # # (i, j, k) -> (k, i, j)
-                        # src = i + j * num_w + k * num_w * num_h
-                        # dst = k + i * num_h + j * num_w * num_h
-
-                        # # (i, j, k) -> (j, i, k)
-                        src = i + j * num_w + k * num_w * num_h
-                        dst = j + i * num_h + k * num_w * num_h
-                        traffic_matrix[src][dst] = 1
-        elif synthetic == "hotspot":
-            for i in range(num_routers):
-                for j in range(num_routers):
-                    traffic_matrix[i][j] = 1
-            for i in options.hotspots:
-                for j in range(num_routers):
-                    traffic_matrix[j][i] += options.hotspot_factor / 100.0
-        else:
-            print("Error: Traffic type not supported")
-            exit(1)
-        if options.single_sender_id != -1:
-            for i in range(num_routers):
-                if i != options.single_sender_id:
-                    for j in range(num_routers):
-                        traffic_matrix[i][j] = 0
-        sum_traffic = 0
-        for i in range(num_routers):
-            for j in range(num_routers):
-                sum_traffic += traffic_matrix[i][j]
-        for i in range(num_routers):
-            for j in range(num_routers):
-                traffic_matrix[i][j] /= sum_traffic
-        return traffic_matrix
-    def caculateBenifit(self, options, Links, To, num_w, num_h, num_d):
-        num_routers = num_w * num_h * num_d
-        sum_d = 0
-        sum_rd = 0
-        for i in range(num_routers):
-            for j in range(num_routers):
-                i_x = i % num_w
-                i_y = i // num_w % num_h
-                i_z = i // num_w // num_h
-                j_x = j % num_w
-                j_y = j // num_w % num_h
-                j_z = j // num_w // num_h
-                to_i_x = To[i] % num_w
-                to_i_y = To[i] // num_w % num_h
-                to_i_z = To[i] // num_w // num_h
-                sum_d += options.traffic_matrix[i][j] * (abs(i_x - j_x) + abs(i_y - j_y) + abs(i_z - j_z))
-                if To[i] != -1:
-                    sum_rd += options.traffic_matrix[i][j] * min(abs(i_x - j_x) + abs(i_y - j_y), 1 + abs(j_x - to_i_x) + abs(j_y - to_i_y) + abs(j_z - to_i_z))
-                else:
-                    sum_rd += options.traffic_matrix[i][j] * (abs(i_x - j_x) + abs(i_y - j_y) + abs(i_z - j_z))
-        print(sum_d, sum_rd, 1 - sum_rd / sum_d)
-    def caculateLongRangeLinks(self, options, num_w, num_h, num_d):       
-        num_routers = num_w * num_h * num_d
-        Links = []
-        To = [-1] * num_routers
-        while options.budget > 0:
-            max_i = -1
-            max_j = -1
-            max_d = 0
-            for i in range(num_routers):
-                for j in range(i + 1, num_routers):
-                    i_x = i % num_w
-                    i_y = i // num_w % num_h
-                    i_z = i // num_w // num_h
-                    j_x = j % num_w
-                    j_y = j // num_w % num_h
-                    j_z = j // num_w // num_h
-
-                    dst = ((i_x - j_x)**2 + (i_y - j_y)**2 + (i_z - j_z)**2)**0.5
-                    if To[i] == -1 and To[j] == -1 and options.budget >= dst:
-                        cnt = 0
-                        for k in range(num_routers):
-                            k_x = k % num_w
-                            k_y = k // num_w % num_h
-                            k_z = k // num_w // num_h
-                            cnt += options.traffic_matrix[j][k] * max(0, abs(k_x - j_x) + abs(k_y - j_y) + abs(k_z - j_z) - abs(k_x - i_x) - abs(k_y - i_y) - abs(k_z - i_z) - 1)
-                            cnt += options.traffic_matrix[i][k] * max(0, abs(k_x - i_x) + abs(k_y - i_y) + abs(k_z - i_z) - abs(k_x - j_x) - abs(k_y - j_y) - abs(k_z - j_z) - 1)
-                        if cnt / dst > max_d:
-                            max_d = cnt / dst
-                            max_i = i
-                            max_j = j
-            if max_i == -1:
-                break
-            Links.append((max_i, max_j))
-            To[max_i] = max_j
-            To[max_j] = max_i
-            options.budget -= ((max_i % num_w - max_j % num_w)**2 + (max_i // num_w % num_h - max_j // num_w % num_h)**2 + (max_i // num_w // num_h - max_j // num_w // num_h)**2)**0.5
-        print(Links)
-        self.caculateBenifit(options, Links, To, num_w, num_h, num_d)
-        return Links
-    def randomAddLongRangeLinks(self, options, num_w, num_h, num_d):
-        num_routers = num_w * num_h * num_d
-        Links = []
-        To = [-1] * num_routers
-        cnt = 0
-
-        while cnt < 10:
-            i = random.randint(0, num_routers - 1)
-            j = random.randint(0, num_routers - 1)
-            i_x = i % num_w
-            i_y = i // num_w % num_h
-            i_z = i // num_w // num_h
-            j_x = j % num_w
-            j_y = j // num_w % num_h
-            j_z = j // num_w // num_h
-            dst = ((i_x - j_x)**2 + (i_y - j_y)**2 + (i_z - j_z)**2)**0.5
-            if dst <= 1:
-                continue
-            if To[i] == -1 and To[j] == -1 and options.budget >= dst:
-                Links.append((i, j))
-                To[i] = j
-                To[j] = i
-                options.budget -= dst
-            cnt += 1
-        print(Links)
-        self.caculateBenifit(options, Links, To, num_w, num_h, num_d)
-        return Links
-    
     def getWeight(self, i_x, j_x, i_y, j_y, i_z, j_z):
         res = []
         dirn = ''
@@ -231,11 +92,9 @@ class Cube_longrange(SimpleTopology):
         num_h = options.mesh_rows
         num_d = options.mesh_rows
         assert(num_w * num_h * num_d == num_routers)
-        options.traffic_matrix = self.initTrafficFreqFromSyntheticType(options, num_w, num_h, num_d) 
-        if options.best_effort:
-            Links = self.caculateLongRangeLinks(options, num_w, num_h, num_d)
-        else:
-            Links = self.randomAddLongRangeLinks(options, num_w, num_h, num_d)
+        Links = plan_long_range_links(
+            options, (num_w, num_h, num_d), topology=self.description
+        )
         longLinkId = [-1] * num_routers
         for (i, j) in Links:
             longLinkId[i] = j
@@ -4,6 +4,7 @@ from m5.objects import *
 from common import FileSystemConfig
 
 from topologies.BaseTopology import SimpleTopology
+from topologies.longrange_planner import plan_long_range_links
 
 
 class Mesh_longrange_HiRy(SimpleTopology):
@@ -11,123 +12,6 @@ class Mesh_longrange_HiRy(SimpleTopology):
 
     def __init__(self, controllers):
         self.nodes = controllers
-    def initTrafficFreqFromSyntheticType(self, options, num_rows, num_columns):
-        synthetic = options.synthetic
-        num_routers = num_rows * num_columns
-        traffic_matrix = [[0 for i in range(num_routers)] for j in range(num_routers)]
-        if options.single_dest_id != -1:
-            for i in range(num_routers):
-                traffic_matrix[i][options.single_dest_id] = 1
-        elif synthetic == "uniform_random":
-            for i in range(num_routers):
-                for j in range(num_routers):
-                    traffic_matrix[i][j] = 1
-        elif synthetic == "tornado":
-            for i in range(num_rows):
-                for j in range(num_columns):
-                    k = (i + num_rows // 2) % num_rows
-                    traffic_matrix[i + j * num_columns][k + j * num_columns] = 1
-        elif synthetic == "bit_complement":
-            for i in range(num_rows):
-                for j in range(num_columns):
-                    k = num_rows - 1 - i
-                    l = num_columns - 1 - j
-                    traffic_matrix[i + j * num_columns][k + l * num_columns] = 1
-        elif synthetic == "bit_reverse":
-            for i in range(num_rows):
-                for j in range(num_columns):
-                    k = (i ^ (num_rows - 1))
-                    l = (j ^ (num_columns - 1))
-                    traffic_matrix[i + j * num_columns][k + l * num_columns] = 1
-        elif synthetic == "bit_rotation":
-            for i in range(num_routers):
-                traffic_matrix[i][(i/2) + (i%2) * (num_routers/2)] = 1
-        elif synthetic == "neighbor":
-            for i in range(num_rows):
-                for j in range(num_columns):
-                    k = (i + 1) % num_rows
-                    traffic_matrix[i + j * num_columns][k + j * num_columns] = 1
-        elif synthetic == "shuffle":
-            for i in range(num_routers):
-                if i * 2 < num_routers:
-                    traffic_matrix[i][i * 2] = 1
-                else:
-                    traffic_matrix[i][i * 2 - num_routers + 1] = 1
-        elif synthetic == "transpose":
-            for i in range(num_rows):
-                for j in range(num_columns):
-                    traffic_matrix[i + j * num_columns][j + i * num_columns] = 1
-        elif synthetic == "hotspot":
-            for i in range(num_routers):
-                for j in range(num_routers):
-                    traffic_matrix[i][j] = 1
-            for i in options.hotspots:
-                for j in range(num_routers):
-                    traffic_matrix[i][j] += options.hotspot_factor
-
-        if options.single_sender_id != -1:
-            for i in range(num_routers):
-                if i != options.single_sender_id:
-                    for j in range(num_routers):
-                        traffic_matrix[i][j] = 0
-        sum_traffic = 0
-        for i in range(num_routers):
-            for j in range(num_routers):
-                sum_traffic += traffic_matrix[i][j]
-        for i in range(num_routers):
-            for j in range(num_routers):
-                traffic_matrix[i][j] /= sum_traffic
-        return traffic_matrix
-    def caculateLongRangeLinks(self, options, num_rows, num_columns):
-        num_routers = num_rows * num_columns
-        Links = []
-        To = [-1] * num_routers
-        while options.budget > 0:
-            max_i = -1
-            max_j = -1
-            max_d = 0
-            for i in range(num_routers):
-                for j in range(i + 1, num_routers):
-                    i_x = i % num_columns
-                    i_y = i // num_columns
-                    j_x = j % num_columns
-                    j_y = j // num_columns
-                    dst = ((i_x - j_x)**2 + (i_y - j_y)**2)**0.5
-                    if To[i] == -1 and To[j] == -1 and options.budget >= dst:
-                        cnt = 0
-                        for k in range(num_routers):
-                            k_x = k % num_columns
-                            k_y = k // num_columns
-                            cnt += options.traffic_matrix[j][k] * max(0, abs(k_x - j_x) + abs(k_y - j_y) - abs(k_x - i_x) - abs(k_y - i_y) - 1)
-                            cnt += options.traffic_matrix[i][k] * max(0, abs(k_x - i_x) + abs(k_y - i_y) - abs(k_x - j_x) - abs(k_y - j_y) - 1)
-                        if cnt / dst > max_d:
-                            max_d = cnt / dst
-                            max_i = i
-                            max_j = j
-            if max_i == -1:
-                break
-            print(max_i, max_j, max_d)
-            Links.append((max_i, max_j))
-            To[max_i] = max_j
-            To[max_j] = max_i
-            options.budget -= ((max_i % num_columns - max_j % num_columns)**2 + abs(max_i // num_columns - max_j // num_columns)**2)**0.5
-        sum_d = 0
-        sum_rd = 0
-        for i in range(num_routers):
-            for j in range(num_routers):
-                i_x = i % num_columns
-                i_y = i // num_columns
-                j_x = j % num_columns
-                j_y = j // num_columns
-                sum_d += options.traffic_matrix[i][j] * (abs(i_x - j_x) + abs(i_y - j_y))
-                if To[i] != -1:
-                    sum_rd += options.traffic_matrix[i][j] * min(abs(i_x - j_x) + abs(i_y - j_y), 1 + abs(j_x - To[i] % num_columns) + abs(j_y - To[i] // num_columns))
-                else:
-                    sum_rd += options.traffic_matrix[i][j] * (abs(i_x - j_x) + abs(i_y - j_y))
-        print(Links)
-        print(sum_d, sum_rd, 1 - sum_rd/sum_d)
-        return Links
-
     def getWeight(self, dirn):
         res = []
         if dirn == "SameWest" or dirn[:5] == "North":
@@ -154,12 +38,12 @@ class Mesh_longrange_HiRy(SimpleTopology):
         assert num_rows > 0 and num_rows <= num_routers
         num_columns = int(num_routers / num_rows)
         assert num_columns * num_rows == num_routers
-
-        if options.traffic_matrix == None:
-            options.traffic_matrix = self.initTrafficFreqFromSyntheticType(options, num_rows, num_columns)
-        else: # read from file
-            options.traffic_matrix = [[float(j) for j in i.split()] for i in open(options.traffic_matrix).read().split('\n') if i != '']
-        Links = self.caculateLongRangeLinks(options, num_rows, num_columns)
+        Links = plan_long_range_links(
+            options,
+            (num_columns, num_rows),
+            best_effort=True,
+            topology=self.description,
+        )
         # Create the routers in the mesh
         longLinkId = [-1] * num_routers
         for (i, j) in Links:
@@ -0,0 +1,303 @@
+"""Analytical evaluation of mesh/cube topologies with long-range links.
+
+Computes the expected hop count, the load of every channel and the
+critical injection rate (lambda_c) of a topology under a traffic pattern
+without starting gem5. Packets follow the same model as the long-range
+planner: a packet takes the long-range link of its source router when
+that is strictly shorter than its minimal route, and otherwise (and after
+the long-range hop) uses dimension-order routing (XY for meshes, XYZ for
+cubes).
+
+Loads are expressed per unit of injection rate: at an average injection
+rate of lambda packets/node/cycle a channel carries lambda * load flits per
+cycle, so the network saturates at lambda_c = 1 / max(load). Injection and
+ejection ports are accounted for as channels as well.
+
+The zero-load latency T_0 follows garnet's pipeline: a packet of h router
+hops crosses the injection and ejection links, h + 1 routers and h
+internal links, all of the given --router-latency and --link-latency.
+
+Every combination of the given topologies, synthetic patterns, traffic
+matrices and budgets is evaluated and written as one CSV row, e.g.
+
+    PYTHONPATH=configs python -m topologies.analyze \\
+        --topology Mesh_XY Mesh_longrange --num-cpus=16 --mesh-rows=4 \\
+        --synthetic uniform_random transpose --budget 0 12 24 \\
+        --best-effort --output output/analyze.csv
+"""
+
+import argparse
+import csv
+import itertools
+import sys
+import time
+
+import numpy as np
+
+from topologies.longrange_planner import (
+    PLANNERS,
+    check_planner,
+    grid_coordinates,
+    hop_distances,
+    link_planner,
+    mesh_channel_loads,
+    plan_links,
+    route_starts,
+    synthetic_traffic,
+)
+
+TOPOLOGIES = {
+    "Mesh_XY": False,
+    "Mesh_longrange": True,
+    "Mesh_longrange_HiRy": True,
+    "Cube_XYZ": False,
+    "Cube_longrange": True,
+}
+
+# Topologies that always plan their links with --best-effort
+BEST_EFFORT = {"Mesh_longrange_HiRy"}
+
+# --routing-algorithm of the topologies when none is given: dimension-order
+# routing as in the model, and HiRy for Mesh_longrange_HiRy
+ROUTING = {
+    "Mesh_XY": 1,
+    "Mesh_longrange": 1,
+    "Mesh_longrange_HiRy": 7,
+    "Cube_XYZ": 6,
+    "Cube_longrange": 6,
+}
+
+
+def topology_dims(topology, num_cpus, mesh_rows):
+    """Grid dimensions (first coordinate fastest) of a topology."""
+    if topology.startswith("Cube"):
+        assert mesh_rows**3 == num_cpus
+        return (mesh_rows, mesh_rows, mesh_rows)
+    num_columns = num_cpus // mesh_rows
+    assert num_columns * mesh_rows == num_cpus
+    return (num_columns, mesh_rows)
+
+
+def channel_loads(traffic, dims, links, hops=None):
+    """Per-unit-injection-rate loads of a grid with long-range links.
+
+    Returns (mesh, express, injection, ejection): the mesh channel loads
+    of mesh_channel_loads(), a list of (src, dst, load) for both directions
+    of every long-range link, and the load of every injection and ejection
+    port.
+    """
+    traffic = np.asarray(traffic, dtype=np.float64)
+    num_routers = traffic.shape[0]
+    flow = traffic * num_routers
+    if hops is None:
+        hops = hop_distances(grid_coordinates(dims))
+    start, express = route_starts(hops, links)
+    mesh = mesh_channel_loads(flow, start, dims)
+    express_loads = []
+    for i, j in links:
+        express_loads.append((i, j, float(flow[i, express[i]].sum())))
+        express_loads.append((j, i, float(flow[j, express[j]].sum())))
+    return mesh, express_loads, flow.sum(axis=1), flow.sum(axis=0)
+
+
+def zero_load_latency(traffic, routed, router_latency=1, link_latency=1):
+    """Average latency in cycles of packets that never wait.
+
+    ``routed[s, d]`` is the number of router-to-router hops from s to d.
+    """
+    traffic = np.asarray(traffic, dtype=np.float64)
+    latency = (
+        2 * link_latency
+        + router_latency
+        + np.asarray(routed) * (router_latency + link_latency)
+    )
+    return float((traffic * latency).sum() / traffic.sum())
+
+
+def link_load_rows(dims, mesh, express):
+    """Flatten channel loads to (src, dst, kind, load) tuples."""
+    strides = np.cumprod([1] + list(dims[:-1]))
+    coords = grid_coordinates(dims)
+    rows = []
+    for k in range(len(dims)):
+        for r in np.nonzero(coords[:, k] < dims[k] - 1)[0].tolist():
+            n = r + int(strides[k])
+            rows.append((r, n, "mesh", float(mesh[k, 0, r])))
+            rows.append((n, r, "mesh", float(mesh[k, 1, r])))
+    for src, dst, load in express:
+        rows.append((src, dst, "express", load))
+    return rows
+
+
+def evaluate(topology, dims, options, traffic=None, hops=None):
+    """Plan and evaluate one configuration; returns (row, link rows).
+
+    ``traffic`` and ``hops`` may be passed in when several budgets are
+    evaluated for the same workload.
+    """
+    if traffic is None:
+        traffic = synthetic_traffic(options, dims)
+    coords = grid_coordinates(dims)
+    if hops is None:
+        hops = hop_distances(coords)
+    budget = options.budget
+    links = []
+    best_effort = topology in BEST_EFFORT or bool(options.best_effort)
+    planner = link_planner(options, best_effort)
+    if TOPOLOGIES[topology]:
+        routing = getattr(options, "routing_algorithm", None)
+        if routing is None:
+            routing = ROUTING[topology]
+        check_planner(planner, routing)
+        links, budget = plan_links(options, traffic, coords, planner)
+    start, express = route_starts(hops, links)
+    routed = np.where(express, 1 + hops[start, np.arange(len(coords))], hops)
+    mesh, express_loads, injection, ejection = channel_loads(
+        traffic, dims, links, hops
+    )
+    link_rows = link_load_rows(dims, mesh, express_loads)
+    bottleneck = max(link_rows, key=lambda r: r[3])
+    max_terminal = max(injection.max(), ejection.max())
+    max_load = max(bottleneck[3], max_terminal)
+    sum_d = float((traffic * hops).sum())
+    sum_rd = float((traffic * routed).sum())
+    row = {
+        "topology": topology,
+        "dims": "x".join(str(d) for d in dims),
+        "synthetic": options.synthetic,
+        "traffic_matrix": options.traffic_matrix or "",
+        "budget": options.budget,
+        "best_effort": int(best_effort),
+        "link_planner": planner,
+        "num_links": len(links),
+        "links": " ".join(f"{i}-{j}" for i, j in links),
+        "wire_used": options.budget - budget,
+        "mesh_hops": sum_d,
+        "expected_hops": sum_rd,
+        "hop_reduction": 1 - sum_rd / sum_d,
+        "max_channel_load": bottleneck[3],
+        "bottleneck": f"{bottleneck[0]}->{bottleneck[1]}",
+        "max_terminal_load": float(max_terminal),
+        "lambda_c": 1 / max_load if max_load > 0 else float("inf"),
+        "zero_load_latency": zero_load_latency(
+            traffic,
+            routed,
+            getattr(options, "router_latency", 1),
+            getattr(options, "link_latency", 1),
+        ),
+    }
+    return row, link_rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--topology",
+        nargs="+",
+        default=["Mesh_longrange"],
+        choices=sorted(TOPOLOGIES),
+    )
+    parser.add_argument("--num-cpus", type=int, default=16)
+    parser.add_argument("--mesh-rows", type=int, default=4)
+    parser.add_argument("--synthetic", nargs="+", default=["uniform_random"])
+    parser.add_argument(
+        "--traffic-matrix",
+        nargs="+",
+        default=[None],
+        help="Traffic matrix files, used with --synthetic=real_traffic",
+    )
+    parser.add_argument("--budget", nargs="+", type=float, default=[12])
+    parser.add_argument("--best-effort", action="store_true")
+    parser.add_argument(
+        "--link-planner",
+        choices=PLANNERS,
+        default=None,
+        help="Long-range link planner (default: greedy with "
+        "--best-effort, random otherwise)",
+    )
+    parser.add_argument(
+        "--routing-algorithm",
+        type=int,
+        default=None,
+        help="Routing of the simulated network, --link-planner=load needs "
+        "dimension-order routing (default: XY or XYZ, HiRy for "
+        "Mesh_longrange_HiRy)",
+    )
+    parser.add_argument("--topology-seed", type=int, default=None)
+    parser.add_argument(
+        "--planner-time",
+        type=float,
+        default=10.0,
+        help="Time limit of --link-planner=anneal in seconds",
+    )
+    parser.add_argument(
+        "--planner-moves",
+        type=int,
+        default=200000,
+        help="Number of moves of --link-planner=anneal",
+    )
+    parser.add_argument("--hotspots", nargs="+", type=int, default=[])
+    parser.add_argument("--hotspot-factor", type=int, default=20)
+    parser.add_argument("--single-sender-id", type=int, default=-1)
+    parser.add_argument("--single-dest-id", type=int, default=-1)
+    parser.add_argument("--router-latency", type=int, default=1)
+    parser.add_argument("--link-latency", type=int, default=1)
+    parser.add_argument(
+        "--output", default="-", help="CSV file for the results"
+    )
+    parser.add_argument(
+        "--link-loads", default=None, help="CSV file for per-link loads"
+    )
+    args = parser.parse_args(argv)
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w")
+    writer = None
+    link_writer = None
+    if args.link_loads:
+        link_file = open(args.link_loads, "w")
+        link_writer = csv.writer(link_file)
+        link_writer.writerow(["config", "src", "dst", "kind", "load"])
+
+    begin = time.perf_counter()
+    count = 0
+    for topology, synthetic in itertools.product(
+        args.topology, args.synthetic
+    ):
+        dims = topology_dims(topology, args.num_cpus, args.mesh_rows)
+        hops = hop_distances(grid_coordinates(dims))
+        matrices = args.traffic_matrix
+        if synthetic != "real_traffic":
+            matrices = [None]
+        for matrix in matrices:
+            options = argparse.Namespace(**vars(args))
+            options.synthetic = synthetic
+            options.traffic_matrix = matrix
+            traffic = synthetic_traffic(options, dims)
+            for budget in args.budget:
+                options.budget = budget
+                row, link_rows = evaluate(
+                    topology, dims, options, traffic, hops
+                )
+                if writer is None:
+                    writer = csv.DictWriter(
+                        out, fieldnames=["config"] + list(row)
+                    )
+                    writer.writeheader()
+                writer.writerow(dict(row, config=count))
+                if link_writer is not None:
+                    for link_row in link_rows:
+                        link_writer.writerow((count,) + link_row)
+                count += 1
+    elapsed = time.perf_counter() - begin
+    if out is not sys.stdout:
+        out.close()
+    if link_writer is not None:
+        link_file.close()
+    print(
+        f"Evaluated {count} configurations in {elapsed:.3f}s",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
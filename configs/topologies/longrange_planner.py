@@ -0,0 +1,880 @@
+"""Long-range (express) link planning shared by the *_longrange topologies.
+
+Routers are identified by their index and placed on an N-dimensional grid
+whose first coordinate varies fastest, i.e. router i of a grid with dims
+(w, h, d) sits at (i % w, i // w % h, i // (w * h)). Everything below works
+on the (N, dims) NumPy array of these coordinates, so a 4D or 5D grid costs
+the same per link as a 2D mesh.
+
+The greedy planner repeatedly picks the free router pair (i, j) with the
+largest expected hop saving per unit of wire length that still fits in the
+remaining budget. The hop saving of a pair does not depend on links that
+were already placed, so the full gain matrix is computed once with NumPy.
+After a link is accepted only the rows and columns of its two end points
+are retired.
+
+Scores of symmetric pairs are frequently equal, and the original
+pure-Python loop breaks such ties by keeping the first pair in (i, j)
+order. To return exactly the same links, the pairs whose vectorized score
+is within rounding distance of the maximum are re-scored with the original
+scalar accumulation before one of them is picked.
+
+Since every router takes at most one long-range link and a packet only
+takes the link of its source router, the expected hop count with a set of
+links is the mesh hop count minus the sum of the gains of its links. The
+annealing planner (--link-planner=anneal) starts from the greedy links
+and searches for a set with a larger total gain within the same wire
+budget. Its moves add, remove, replace or re-attach one link or swap the
+end points of two links, and each is evaluated from the gain matrix in
+constant time, so even 16x16 meshes explore over a hundred thousand
+moves per second of --planner-time.
+
+Neither objective looks at where the traffic concentrates, and a link
+that saves many hops may add its packets to the bottleneck channel that
+sets lambda_c. The load planner (--link-planner=load) greedily adds the
+link that leaves the lowest maximum channel load under the routing model
+of topologies.analyze, falling back to the hop saving per unit of wire
+length between links that do not change it.
+"""
+
+import json
+import math
+import random
+import time
+
+import numpy as np
+
+from topologies.topology_cache import (
+    TopologyCache,
+    make_key,
+    traffic_digest,
+)
+from topologies.traffic_matrix import (
+    TrafficMatrix,
+    grid_coordinates,
+    grid_index,
+)
+
+# Relative tolerance used to collect candidate ties before they are
+# re-scored exactly. Vectorized and scalar sums only differ in the last
+# few bits, so this is many orders of magnitude larger than needed.
+_TIE_RTOL = 1e-9
+
+# Upper bound on the number of elements of the temporary (block, N, N)
+# array used while computing the gain matrix.
+_GAIN_BLOCK_ELEMS = 1 << 23
+
+
+def mesh_coordinates(num_rows, num_columns):
+    """Return the (x, y) coordinates of every router of a 2D mesh.
+
+    Router i sits at x = i % num_columns, y = i // num_columns.
+    """
+    return grid_coordinates((num_columns, num_rows))
+
+
+def hop_distances(coords):
+    """All-pairs Manhattan distance matrix of the given coordinates."""
+    coords = np.asarray(coords, dtype=np.int64)
+    return np.abs(coords[:, None, :] - coords[None, :, :]).sum(axis=2)
+
+
+def wire_lengths(coords):
+    """All-pairs Euclidean distance matrix of the given coordinates.
+
+    Every entry is computed as ``d2 ** 0.5`` on a Python float so that it is
+    bit-identical to the wire length charged against the budget.
+    """
+    coords = np.asarray(coords, dtype=np.int64)
+    d2 = ((coords[:, None, :] - coords[None, :, :]) ** 2).sum(axis=2)
+    values, inverse = np.unique(d2, return_inverse=True)
+    roots = np.array([float(v) ** 0.5 for v in values.tolist()])
+    return roots[inverse].reshape(d2.shape)
+
+
+def hop_savings(traffic, hops):
+    """Expected hop saving of a long-range link for every router pair.
+
+    Entry (i, j) is the traffic-weighted number of hops saved by packets
+    injected at i or j when a link between i and j is added:
+
+        sum_k T[i][k] * max(0, D[i][k] - D[j][k] - 1)
+          + T[j][k] * max(0, D[j][k] - D[i][k] - 1)
+    """
+    traffic = np.asarray(traffic, dtype=np.float64)
+    hops = np.asarray(hops)
+    num_routers = hops.shape[0]
+    one_sided = np.empty((num_routers, num_routers))
+    block = max(1, _GAIN_BLOCK_ELEMS // (num_routers * num_routers))
+    for start in range(0, num_routers, block):
+        stop = min(start + block, num_routers)
+        # saved[b, j, k] = max(0, D[start + b][k] - D[j][k] - 1)
+        saved = hops[start:stop, None, :] - hops[None, :, :] - 1
+        np.maximum(saved, 0, out=saved)
+        one_sided[start:stop] = np.einsum(
+            "bk,bjk->bj", traffic[start:stop], saved
+        )
+    return one_sided + one_sided.T
+
+
+class GreedyLinkPlanner(object):
+    """Incremental state of the greedy long-range link insertion.
+
+    ``traffic`` is the normalized N x N traffic matrix and ``coords`` the
+    (N, dims) integer coordinates of the routers. Call best_link() to get
+    the next pair to connect and accept() once it has been placed.
+    """
+
+    def __init__(self, traffic, coords):
+        self.traffic = np.asarray(traffic, dtype=np.float64)
+        self.coords = np.asarray(coords, dtype=np.int64)
+        self.hops = hop_distances(self.coords)
+        self.wire = wire_lengths(self.coords)
+        self.gain = hop_savings(self.traffic, self.hops)
+
+        num_routers = self.hops.shape[0]
+        upper = np.triu(np.ones((num_routers, num_routers), dtype=bool), 1)
+        self._score = np.full((num_routers, num_routers), -np.inf)
+        np.divide(self.gain, self.wire, out=self._score, where=upper)
+        self._score[~upper] = -np.inf
+
+        # Plain Python copies for the exact scalar re-scoring of ties.
+        self._rows = self.traffic.tolist()
+        self._hop_rows = self.hops.tolist()
+
+    def wire_length(self, i, j):
+        """Wire length of a link between routers i and j."""
+        return float(self.wire[i, j])
+
+    def exact_score(self, i, j):
+        """Score of pair (i, j) accumulated in the legacy scalar order."""
+        row_i = self._rows[i]
+        row_j = self._rows[j]
+        hops_i = self._hop_rows[i]
+        hops_j = self._hop_rows[j]
+        cnt = 0
+        for k in range(len(row_i)):
+            cnt += row_j[k] * max(0, hops_j[k] - hops_i[k] - 1)
+            cnt += row_i[k] * max(0, hops_i[k] - hops_j[k] - 1)
+        return cnt / self.wire_length(i, j)
+
+    def best_link(self, budget):
+        """Return (i, j, score) of the best affordable pair, or None.
+
+        Only pairs whose end points are both free and whose wire length
+        does not exceed ``budget`` are considered, and the score must be
+        strictly positive.
+        """
+        score = np.where(self.wire <= budget, self._score, -np.inf)
+        best = score.max()
+        if not best > 0:
+            return None
+        ties_i, ties_j = np.nonzero(score >= best * (1 - _TIE_RTOL))
+        max_i, max_j, max_d = -1, -1, 0
+        for i, j in zip(ties_i.tolist(), ties_j.tolist()):
+            d = self.exact_score(i, j)
+            if d > max_d:
+                max_i, max_j, max_d = i, j, d
+        if max_i == -1:
+            return None
+        return max_i, max_j, max_d
+
+    def accept(self, i, j):
+        """Retire routers i and j; each router takes one long-range link."""
+        for k in (i, j):
+            self._score[k, :] = -np.inf
+            self._score[:, k] = -np.inf
+
+
+def synthetic_traffic(options, dims):
+    """Normalized traffic matrix of the pattern selected by the options.
+
+    See TrafficMatrix.from_options() for the options it honours.
+    """
+    return TrafficMatrix.from_options(options, dims).normalized()
+
+
+def expected_hops(traffic, hops, links):
+    """Expected hop count without and with the given long-range links.
+
+    A packet may take the long-range link of its source router when that
+    is shorter than its minimal mesh route. Returns (sum_d, sum_rd).
+    """
+    traffic = np.asarray(traffic, dtype=np.float64)
+    hops = np.asarray(hops)
+    routed = hops.copy()
+    for i, j in links:
+        routed[i] = np.minimum(hops[i], 1 + hops[j])
+        routed[j] = np.minimum(hops[j], 1 + hops[i])
+    return float((traffic * hops).sum()), float((traffic * routed).sum())
+
+
+def route_starts(hops, links):
+    """Where dimension-order routing starts for every (src, dst) pair.
+
+    Returns (start, express): start[s, d] is s, or the far end of the
+    long-range link of s if the packet takes it, which express[s, d] flags.
+    """
+    num_routers = hops.shape[0]
+    start = np.repeat(np.arange(num_routers)[:, None], num_routers, axis=1)
+    express = np.zeros((num_routers, num_routers), dtype=bool)
+    for i, j in links:
+        for src, far in ((i, j), (j, i)):
+            express[src] = 1 + hops[far] < hops[src]
+            start[src, express[src]] = far
+    return start, express
+
+
+def mesh_channel_loads(flow, start, dims, per_row=False):
+    """Load of every mesh channel under dimension-order routing.
+
+    ``flow[r, d]`` is routed from ``start[r, d]`` to d. Returns an array of
+    shape (len(dims), 2, num_routers): entry [k, 0, r] is the load of the
+    channel from router r to its +1 neighbour along dimension k and entry
+    [k, 1, r] the load of the opposite channel. Entries of routers on the
+    last position along k are always zero. With ``per_row`` the loads of
+    every row of ``flow`` are returned separately, stacked along a new
+    first axis.
+    """
+    dims = list(dims)
+    num_rows, num_routers = flow.shape
+    groups = num_rows if per_row else 1
+    offset = np.zeros((num_rows, 1), dtype=np.int64)
+    if per_row:
+        offset = np.arange(num_rows)[:, None] * num_routers
+    offset = np.broadcast_to(offset, flow.shape)
+    coords = grid_coordinates(dims)
+    src = coords[start]
+    dst = np.broadcast_to(coords[None, :, :], src.shape)
+    shape = [groups] + dims[::-1]
+    loads = np.zeros((groups, len(dims), 2, num_routers))
+    for k in range(len(dims)):
+        # Line of dimension k the packet travels on: already corrected
+        # coordinates below k, source coordinates above k.
+        lo = np.concatenate([dst[..., :k], src[..., k:]], axis=-1)
+        hi = np.concatenate([dst[..., : k + 1], src[..., k + 1 :]], axis=-1)
+        lo = grid_index(lo, dims) + offset
+        hi = grid_index(hi, dims) + offset
+        axis = len(dims) - k
+        for direction, mask in enumerate(
+            (src[..., k] < dst[..., k], src[..., k] > dst[..., k])
+        ):
+            # Difference array: +flow where the segment starts (lower
+            # router), -flow where it ends, then a prefix sum along k.
+            first, last = (lo, hi) if direction == 0 else (hi, lo)
+            weights = flow[mask]
+            size = groups * num_routers
+            delta = np.bincount(
+                first[mask], weights, minlength=size
+            ) - np.bincount(last[mask], weights, minlength=size)
+            loads[:, k, direction] = np.cumsum(
+                delta.reshape(shape), axis=axis
+            ).reshape(groups, num_routers)
+    return loads if per_row else loads[0]
+
+
+def greedy_links(traffic, coords, budget, verbose=False):
+    """Greedily insert long-range links until the budget is exhausted.
+
+    Returns the list of (i, j) links and the remaining budget. With
+    ``verbose`` the score of every accepted link is printed.
+    """
+    planner = GreedyLinkPlanner(traffic, coords)
+    links = []
+    while budget > 0:
+        best = planner.best_link(budget)
+        if best is None:
+            break
+        max_i, max_j, max_d = best
+        links.append((max_i, max_j))
+        planner.accept(max_i, max_j)
+        budget -= planner.wire_length(max_i, max_j)
+        if verbose:
+            print(max_d, max_i, max_j)
+    return links, budget
+
+
+def random_links(coords, budget, attempts=10, rng=None):
+    """Add long-range links between random free router pairs.
+
+    Pairs closer than two units are redrawn; ``attempts`` further draws are
+    made, each placing a link if both routers are free and it is affordable.
+    Pairs are drawn from ``rng``, the unseeded ``random`` module by default.
+    Returns the list of (i, j) links and the remaining budget.
+    """
+    if rng is None:
+        rng = random
+    coords = np.asarray(coords).tolist()
+    num_routers = len(coords)
+    links = []
+    to = [-1] * num_routers
+    cnt = 0
+    while cnt < attempts:
+        i = rng.randint(0, num_routers - 1)
+        j = rng.randint(0, num_routers - 1)
+        dst = sum((a - b) ** 2 for a, b in zip(coords[i], coords[j])) ** 0.5
+        if dst <= 1:
+            continue
+        if to[i] == -1 and to[j] == -1 and budget >= dst:
+            links.append((i, j))
+            to[i] = j
+            to[j] = i
+            budget -= dst
+        cnt += 1
+    return links, budget
+
+
+class AnnealLinkPlanner(object):
+    """Local search over the long-range links that fit in a wire budget.
+
+    The state is the partner of every router (-1 without a link), the
+    links and their total gain, i.e. the expected hops they save. run()
+    draws random moves and accepts them with the Metropolis rule at a
+    temperature that falls linearly to zero over the moves.
+    """
+
+    # Starting temperature, as a fraction of the average gain of the
+    # initial links.
+    temperature = 0.01
+
+    # Cumulative probabilities of the add, remove, replace and re-attach
+    # moves; the remaining draws swap the end points of two links.
+    _MOVES = (0.2, 0.3, 0.6, 0.85)
+
+    def __init__(self, traffic, coords, budget, links=()):
+        coords = np.asarray(coords, dtype=np.int64)
+        gain = hop_savings(traffic, hop_distances(coords))
+        self.gain = gain.tolist()
+        self.wire = wire_lengths(coords).tolist()
+        self.budget = budget
+        # Pairs drawn by the add and replace moves: all that save hops.
+        ends = np.nonzero(np.triu(gain > 0, 1))
+        self.pairs = list(zip(ends[0].tolist(), ends[1].tolist()))
+        self.partner = [-1] * len(self.gain)
+        self.links = []
+        self._slot = [-1] * len(self.gain)
+        self.used = 0.0
+        self.total = 0.0
+        self.moves = 0
+        for i, j in links:
+            self._add(i, j)
+
+    def _add(self, i, j):
+        self.partner[i] = j
+        self.partner[j] = i
+        self._slot[i] = self._slot[j] = len(self.links)
+        self.links.append((i, j))
+        self.used += self.wire[i][j]
+        self.total += self.gain[i][j]
+
+    def _remove(self, i, j):
+        slot = self._slot[i]
+        last = self.links.pop()
+        if slot < len(self.links):
+            self.links[slot] = last
+            self._slot[last[0]] = self._slot[last[1]] = slot
+        self.partner[i] = self.partner[j] = -1
+        self.used -= self.wire[i][j]
+        self.total -= self.gain[i][j]
+
+    def _fits(self, removed, added):
+        wire = self.wire
+        used = self.used - sum(wire[i][j] for i, j in removed)
+        return used + sum(wire[i][j] for i, j in added) <= self.budget + 1e-9
+
+    def propose(self, rng):
+        """A random move as (delta, removed links, added links), or None.
+
+        None is returned when the drawn move is not feasible.
+        """
+        gain, partner, links = self.gain, self.partner, self.links
+        kind = rng.random()
+        if not links or kind < self._MOVES[0]:
+            i, j = rng.choice(self.pairs)
+            removed = []
+            if partner[i] != -1 or partner[j] != -1:
+                return None
+            delta = gain[i][j]
+            added = [(i, j)]
+        else:
+            a, b = links[rng.randrange(len(links))]
+            removed = [(a, b)]
+            delta = -gain[a][b]
+            if kind < self._MOVES[1]:
+                added = []
+            elif kind < self._MOVES[2]:
+                i, j = rng.choice(self.pairs)
+                if (partner[i] != -1 and i not in (a, b)) or (
+                    partner[j] != -1 and j not in (a, b)
+                ):
+                    return None
+                delta += gain[i][j]
+                added = [(i, j)]
+            elif kind < self._MOVES[3]:
+                if rng.random() < 0.5:
+                    a, b = b, a
+                c = rng.randrange(len(partner))
+                if partner[c] != -1 or c == a:
+                    return None
+                delta += gain[a][c]
+                added = [(min(a, c), max(a, c))]
+            else:
+                c, d = links[rng.randrange(len(links))]
+                if c == a:
+                    return None
+                if rng.random() < 0.5:
+                    c, d = d, c
+                removed.append((min(c, d), max(c, d)))
+                delta += gain[a][c] + gain[b][d] - gain[c][d]
+                added = [(min(a, c), max(a, c)), (min(b, d), max(b, d))]
+        if not self._fits(removed, added):
+            return None
+        return delta, removed, added
+
+    def apply(self, removed, added):
+        for i, j in removed:
+            self._remove(i, j)
+        for i, j in added:
+            self._add(i, j)
+
+    def run(self, rng, time_limit=10.0, max_moves=200000):
+        """Anneal for max_moves moves or until time_limit seconds passed.
+
+        Returns the best links found, sorted, and their total gain. The
+        temperature only depends on the number of moves, so a seeded
+        ``rng`` gives the same links unless the time limit ends the search.
+        """
+        best_total, best_links = self.total, list(self.links)
+        if not self.pairs:
+            return sorted(best_links), best_total
+        gains = [self.gain[i][j] for i, j in self.links or self.pairs]
+        start = self.temperature * sum(gains) / len(gains)
+        deadline = time.monotonic() + time_limit
+        self.moves = 0
+        while self.moves < max_moves:
+            if self.moves & 255 == 0 and time.monotonic() >= deadline:
+                break
+            temperature = start * (1 - self.moves / max_moves)
+            self.moves += 1
+            move = self.propose(rng)
+            if move is None:
+                continue
+            delta, removed, added = move
+            if delta < 0 and rng.random() >= math.exp(delta / temperature):
+                continue
+            self.apply(removed, added)
+            if self.total > best_total + 1e-12:
+                best_total, best_links = self.total, list(self.links)
+        return sorted(best_links), best_total
+
+
+def anneal_links(
+    traffic,
+    coords,
+    budget,
+    seed=0,
+    time_limit=10.0,
+    max_moves=200000,
+    verbose=False,
+):
+    """Improve the greedy links by simulated annealing.
+
+    The links never save fewer hops than those of greedy_links() for the
+    same budget. Returns the list of (i, j) links and the remaining budget.
+    With ``verbose`` the moves and the hop saving are printed.
+    """
+    links, _ = greedy_links(traffic, coords, budget)
+    planner = AnnealLinkPlanner(traffic, coords, budget, links)
+    greedy_total = planner.total
+    begin = time.monotonic()
+    links, total = planner.run(random.Random(seed), time_limit, max_moves)
+    if verbose:
+        print(
+            f"anneal: {planner.moves} moves in "
+            f"{time.monotonic() - begin:.2f}s, hop saving "
+            f"{greedy_total:.6f} -> {total:.6f}"
+        )
+    for i, j in links:
+        budget -= planner.wire[i][j]
+    return links, budget
+
+
+class LoadLinkPlanner(object):
+    """Greedy long-range link insertion that minimizes the channel load.
+
+    Channel loads follow the model of topologies.analyze: a packet takes
+    the long-range link of its source when that is shorter and otherwise
+    (and after it) dimension-order routing, at one packet per node and
+    cycle. Networks that route otherwise cannot use this planner, see
+    check_planner(). A link (a, b) only re-routes the packets of rows a
+    and b, so the loads after it are the current loads minus the rows' own
+    routes plus their routes through the link. best_link() evaluates this
+    for all pairs with one far end at once and picks the pair with the
+    lowest maximum load, then the fewest channels at that load and then the
+    largest hop saving per unit of wire length.
+    """
+
+    def __init__(self, traffic, coords):
+        self.coords = np.asarray(coords, dtype=np.int64)
+        self.dims = (self.coords.max(axis=0) + 1).tolist()
+        self.hops = hop_distances(self.coords)
+        self.wire = wire_lengths(self.coords)
+        num_routers = self.hops.shape[0]
+        self.flow = np.asarray(traffic, dtype=np.float64) * num_routers
+        self.score = hop_savings(self.flow, self.hops) / np.where(
+            self.wire > 0, self.wire, np.inf
+        )
+        identity = np.repeat(
+            np.arange(num_routers)[:, None], num_routers, axis=1
+        )
+        self.rows = self._row_loads(self.flow, identity)
+        self.loads = self.rows.sum(axis=0)
+        self.express = []
+        self.terminal = max(
+            self.flow.sum(axis=1).max(), self.flow.sum(axis=0).max()
+        )
+        self.free = np.ones(num_routers, dtype=bool)
+
+    def _row_loads(self, flow, start):
+        loads = mesh_channel_loads(flow, start, self.dims, per_row=True)
+        return loads.reshape(len(flow), -1)
+
+    def _via(self, src, far):
+        """Loads of rows ``src`` routed through links to ``far``.
+
+        Returns the mesh channel loads of every row and the load of its
+        long-range channel.
+        """
+        src, far = np.broadcast_arrays(src, far)
+        flow = self.flow[src]
+        express = 1 + self.hops[far] < self.hops[src]
+        start = np.where(express, far[:, None], src[:, None])
+        return self._row_loads(flow, start), (flow * express).sum(axis=1)
+
+    def state(self):
+        """(maximum load, channels at that load) of the current links."""
+        peak, count = self._key(self.loads[None], np.zeros((1, 0)))
+        return float(peak[0]), int(count[0])
+
+    def _key(self, loads, express):
+        peak = np.maximum(loads.max(axis=1), express.max(axis=1, initial=0))
+        peak = np.maximum(peak, max(self.express + [self.terminal]))
+        near = peak * (1 - _TIE_RTOL)
+        count = (loads >= near[:, None]).sum(axis=1)
+        count += (express >= near[:, None]).sum(axis=1)
+        count += (np.array(self.express)[None, :] >= near[:, None]).sum(axis=1)
+        return peak, count
+
+    def best_link(self, budget):
+        """Return (i, j, maximum load) of the best affordable pair, or None.
+
+        Pairs must have free end points, fit in ``budget``, save hops and
+        not raise the maximum load or its number of channels.
+        """
+        best = None
+        peak, count = self.state()
+        for a in np.nonzero(self.free)[0].tolist():
+            b = np.nonzero(
+                self.free
+                & (np.arange(len(self.free)) > a)
+                & (self.wire[a] <= budget)
+                & (self.score[a] > 0)
+            )[0]
+            if not len(b):
+                continue
+            to_a, x_to_a = self._via(b, a)
+            from_a, x_from_a = self._via(a, b)
+            loads = self.loads - self.rows[a] - self.rows[b] + to_a + from_a
+            peaks, counts = self._key(
+                loads, np.stack([x_to_a, x_from_a], axis=1)
+            )
+            better = (peaks < peak * (1 - _TIE_RTOL)) | (
+                (peaks <= peak * (1 + _TIE_RTOL)) & (counts <= count)
+            )
+            better = np.nonzero(better)[0]
+            if not len(better):
+                continue
+            # Peaks are rounded so that ties fall through to the count
+            # and the hop saving instead of the last bits of the sums.
+            order = np.lexsort(
+                (
+                    -self.score[a, b[better]],
+                    counts[better],
+                    np.round(peaks[better], 9),
+                )
+            )
+            k = better[order[0]]
+            key = (
+                round(float(peaks[k]), 9),
+                int(counts[k]),
+                -float(self.score[a, b[k]]),
+            )
+            if best is None or key < best[0]:
+                best = (key, a, int(b[k]))
+        if best is None:
+            return None
+        (peak, _, _), i, j = best
+        return i, j, float(peak)
+
+    def accept(self, i, j):
+        """Re-route rows i and j through the link and retire both."""
+        to_j, x_to_j = self._via([i], [j])
+        to_i, x_to_i = self._via([j], [i])
+        self.loads = self.loads - self.rows[i] - self.rows[j]
+        self.loads += to_j[0] + to_i[0]
+        self.express += [float(x_to_j[0]), float(x_to_i[0])]
+        self.free[[i, j]] = False
+
+    def wire_length(self, i, j):
+        return float(self.wire[i, j])
+
+
+def load_links(traffic, coords, budget, verbose=False):
+    """Insert the long-range links that lower the channel load the most.
+
+    Returns the list of (i, j) links and the remaining budget. With
+    ``verbose`` the maximum channel load after every link is printed.
+    """
+    planner = LoadLinkPlanner(traffic, coords)
+    links = []
+    while budget > 0:
+        best = planner.best_link(budget)
+        if best is None:
+            break
+        i, j, peak = best
+        links.append((i, j))
+        planner.accept(i, j)
+        budget -= planner.wire_length(i, j)
+        if verbose:
+            print(peak, i, j)
+    return links, budget
+
+
+PLANNERS = ("greedy", "anneal", "load", "random")
+
+# --routing-algorithm values whose routes the channel loads of the load
+# planner model: XY_ and XYZ_. Turn-model, HiRy and adaptive routing send
+# packets over other channels.
+DOR_ROUTING = {1, 6}
+
+
+def check_planner(planner, routing_algorithm):
+    """Raise ValueError if ``planner`` cannot plan the links of a network
+    routed by ``routing_algorithm``."""
+    if planner == "load" and routing_algorithm not in DOR_ROUTING:
+        raise ValueError(
+            "--link-planner=load models dimension-order routing "
+            "(--routing-algorithm=1 or 6) only, not "
+            f"--routing-algorithm={routing_algorithm}"
+        )
+
+
+def link_planner(options, best_effort=None):
+    """The --link-planner of the options, by default greedy with
+    --best-effort (or ``best_effort``) and random otherwise."""
+    planner = getattr(options, "link_planner", None)
+    if planner:
+        return planner
+    if best_effort is None:
+        best_effort = options.best_effort
+    return "greedy" if best_effort else "random"
+
+
+def topology_seed(options):
+    """--topology-seed of the options, None if not given."""
+    return getattr(options, "topology_seed", None)
+
+
+def plan_links(options, traffic, coords, planner, verbose=False):
+    """Place links with ``planner`` within options.budget.
+
+    Random placement draws from --topology-seed and is unseeded without
+    it, annealing starts from seed 0 then. Returns the list of (i, j)
+    links and the remaining budget.
+    """
+    seed = topology_seed(options)
+    if planner == "greedy":
+        return greedy_links(traffic, coords, options.budget, verbose)
+    if planner == "anneal":
+        return anneal_links(
+            traffic,
+            coords,
+            options.budget,
+            seed=seed or 0,
+            time_limit=getattr(options, "planner_time", 10.0),
+            max_moves=getattr(options, "planner_moves", 200000),
+            verbose=verbose,
+        )
+    if planner == "load":
+        return load_links(traffic, coords, options.budget, verbose)
+    rng = None if seed is None else random.Random(seed)
+    return random_links(coords, options.budget, rng=rng)
+
+
+# Version of the manifest format, raise when its fields change meaning.
+MANIFEST_VERSION = 1
+
+
+def read_manifest(path, topology, dims, budget=None):
+    """Load a topology manifest and check that it fits ``dims``.
+
+    Every link must join two distinct routers of ``dims`` that have no
+    other long-range link, and the wire of the links must fit both the
+    budget of the manifest and ``budget`` when given.
+    """
+    with open(path, "r") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise ValueError(
+            f"{path}: unsupported manifest version {manifest.get('version')}"
+        )
+    if manifest["dims"] != [int(d) for d in dims]:
+        raise ValueError(
+            f"{path} plans a {'x'.join(map(str, manifest['dims']))} "
+            f"{manifest['topology']}, not {'x'.join(map(str, dims))}"
+        )
+    coords = grid_coordinates(dims)
+    linked = set()
+    for link in manifest["links"]:
+        if len(link) != 2 or link[0] == link[1]:
+            raise ValueError(f"{path}: {link} is not a link of two routers")
+        for node in link:
+            if not 0 <= node < len(coords):
+                raise ValueError(f"{path}: {link} leaves the routers")
+            if node in linked:
+                raise ValueError(
+                    f"{path}: router {node} has more than one long-range link"
+                )
+            linked.add(node)
+    wire = sum(_wire(coords, i, j) for i, j in manifest["links"])
+    for limit, name in ((manifest["budget"], "its"), (budget, "the")):
+        if limit is not None and wire > limit + 1e-9:
+            raise ValueError(
+                f"{path}: the links take {wire:g} of wire, more than "
+                f"{name} budget of {limit:g}"
+            )
+    if topology and manifest["topology"] != topology:
+        print(
+            f"warning: replaying the links of {manifest['topology']} "
+            f"on {topology}"
+        )
+    return manifest
+
+
+def write_manifest(path, manifest):
+    """Write a manifest built by plan_long_range_links() to ``path``."""
+    with open(path, "w") as f:
+        json.dump(manifest, f, indent=1)
+        f.write("\n")
+
+
+def plan_long_range_links(options, dims, best_effort=None, topology=""):
+    """Plan the long-range links of a grid topology from its options.
+
+    Builds the traffic matrix into options.traffic_matrix, places links
+    with the planner of link_planner() within options.budget, charges
+    the wire length to options.budget and reports the expected hop count
+    before and after. Returns the list of (i, j) links.
+
+    Greedy, annealed and load plans are looked up in and stored to the
+    --topology-cache directory, keyed by ``topology``, the dims, the
+    traffic matrix, the budget and the planner settings. With
+    --topology-from the links of a manifest are replayed instead. Either
+    way, the manifest of the plan (links, wire, budget and expected hop
+    counts) is left in options.topology_manifest for write_manifest().
+    """
+    planner = link_planner(options, best_effort)
+    seed = topology_seed(options)
+    coords = grid_coordinates(dims)
+    options.traffic_matrix = synthetic_traffic(options, dims)
+    digest = traffic_digest(options.traffic_matrix)
+    budget = options.budget
+
+    cache = None
+    entry = None
+    cache_dir = getattr(options, "topology_cache", None)
+    source = getattr(options, "topology_from", None)
+    if not source:
+        check_planner(planner, getattr(options, "routing_algorithm", None))
+    if source:
+        replayed = read_manifest(source, topology, dims, options.budget)
+        planner, seed = replayed["planner"], replayed["seed"]
+        if replayed["traffic_hash"] != digest:
+            print(
+                f"warning: {source} was planned for other traffic, "
+                "its links are replayed unchanged"
+            )
+        links = [tuple(link) for link in replayed["links"]]
+        for i, j in links:
+            options.budget -= _wire(coords, i, j)
+    elif planner != "random" and cache_dir:
+        cache = TopologyCache(
+            cache_dir, getattr(options, "topology_cache_size", 64) << 20
+        )
+        settings = None
+        if planner == "load":
+            settings = {"planner": planner}
+        elif planner == "anneal":
+            settings = {
+                "planner": planner,
+                "seed": seed or 0,
+                "time": getattr(options, "planner_time", 10.0),
+                "moves": getattr(options, "planner_moves", 200000),
+            }
+        key = make_key(
+            topology,
+            dims,
+            options.synthetic,
+            digest,
+            options.budget,
+            True,
+            planner=settings,
+        )
+        entry = cache.get(key)
+        if entry is not None:
+            links = [tuple(link) for link in entry["links"]]
+            options.budget = entry["remaining_budget"]
+
+    if not source and entry is None:
+        links, options.budget = plan_links(
+            options, options.traffic_matrix, coords, planner, verbose=True
+        )
+    print(links)
+    sum_d, sum_rd = expected_hops(
+        options.traffic_matrix, hop_distances(coords), links
+    )
+    print(sum_d, sum_rd, 1 - sum_rd / sum_d)
+    if cache is not None and entry is None:
+        cache.put(
+            key,
+            links=links,
+            remaining_budget=options.budget,
+            sum_d=sum_d,
+            sum_rd=sum_rd,
+            improvement=1 - sum_rd / sum_d,
+        )
+    options.topology_manifest = {
+        "version": MANIFEST_VERSION,
+        "topology": topology,
+        "dims": [int(d) for d in dims],
+        "synthetic": options.synthetic,
+        "traffic_hash": digest,
+        "planner": planner,
+        "seed": seed,
+        "replayed_from": source or None,
+        "budget": budget,
+        "wire_used": budget - options.budget,
+        "remaining_budget": options.budget,
+        "links": [[int(i), int(j)] for i, j in links],
+        "wire": [_wire(coords, i, j) for i, j in links],
+        "sum_d": sum_d,
+        "sum_rd": sum_rd,
+        "improvement": 1 - sum_rd / sum_d,
+    }
+    return links
+
+
+def _wire(coords, i, j):
+    """Wire length of one link, as charged by the planners."""
+    d2 = sum((int(a) - int(b)) ** 2 for a, b in zip(coords[i], coords[j]))
+    return float(d2) ** 0.5
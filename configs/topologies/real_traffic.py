@@ -0,0 +1,305 @@
+"""Traffic matrices of the .rtp application graphs in real_traffic/.
+
+Every .rtp file describes one application mapped onto a mesh: after a
+free-form header comes a line with the number of tasks and of edges, one
+line per task with the (x, y) core it is mapped to, and one line per edge
+with its source and destination task and its traffic volumes. The files
+are sorted by mesh in ``mesh_<R>x<C>`` directories.
+
+read_rtp() streams a file line by line and keeps only the task positions
+and the edge arrays, so it does not depend on the length of the header.
+The volume of an edge is the sum of its fractional fields times 100, cut
+to an integer, and the task at (x, y) runs on router x + y * R like in
+the original extract_traffic.py. Edges between tasks on the same pair of
+routers add up; ``combine="last"`` keeps only the last one instead, which
+reproduces the *_traffic.txt files of the repository.
+
+remap_cores() optionally relabels the routers to shorten the traffic: it
+swaps the positions of router pairs for as long as a swap lowers the
+traffic-weighted hop distance.
+
+The command line extracts every graph below a directory in parallel and
+writes the text or binary formats of traffic_matrix.py next to them:
+
+    PYTHONPATH=configs python -m topologies.real_traffic real_traffic \\
+        --format csr
+    PYTHONPATH=configs python -m topologies.real_traffic real_traffic \\
+        --remap --meshes mesh_8x8 mesh_16x16 --jobs 8
+"""
+
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from topologies.longrange_planner import hop_distances
+from topologies.traffic_matrix import LAYOUTS, TrafficMatrix, grid_coordinates
+
+_COUNTS = re.compile(r"\s*(\d+)\s+(\d+)\s*$")
+_TASK = re.compile(r"\s*\d+\s+\(\s*(\d+)\s*,\s*(\d+)\s*\)")
+_EDGE = re.compile(r"\s*\d+\s+(\d+)\s+(\d+)\s")
+_MESH = re.compile(r"mesh_(\d+)x(\d+)$")
+
+# Task positions (num_tasks, 2) and the source task, destination task and
+# volume of every edge.
+RtpGraph = namedtuple("RtpGraph", "positions src dst volume")
+
+
+def _volume(fields):
+    volume = 0
+    for field in fields:
+        if "." in field:
+            volume += float(field) * 100
+    return int(volume)
+
+
+def parse_rtp(lines, name="<rtp>"):
+    """Parse the lines of a .rtp file into an RtpGraph.
+
+    The counts are the last line of two integers before the first task.
+    """
+    counts = None
+    positions = []
+    src, dst, volume = [], [], []
+    num_tasks = num_edges = None
+    for line in lines:
+        if num_tasks is None or len(positions) < num_tasks:
+            match = _TASK.match(line)
+            if match is None:
+                if num_tasks is None:
+                    counts = _COUNTS.match(line) or counts
+                continue
+            if num_tasks is None:
+                if counts is None:
+                    raise ValueError(f"{name}: task before the task count")
+                num_tasks, num_edges = int(counts[1]), int(counts[2])
+            positions.append((int(match[1]), int(match[2])))
+            continue
+        if len(src) == num_edges:
+            break
+        match = _EDGE.match(line)
+        if match is None:
+            continue
+        src.append(int(match[1]))
+        dst.append(int(match[2]))
+        volume.append(_volume(line.split("\t")[3:]))
+    if num_tasks is None:
+        raise ValueError(f"{name}: no tasks found")
+    if len(positions) < num_tasks or len(src) < num_edges:
+        raise ValueError(
+            f"{name}: expected {num_tasks} tasks and {num_edges} edges, "
+            f"found {len(positions)} and {len(src)}"
+        )
+    return RtpGraph(
+        np.array(positions, dtype=np.int64).reshape(-1, 2),
+        np.array(src, dtype=np.int64),
+        np.array(dst, dtype=np.int64),
+        np.array(volume, dtype=np.int64),
+    )
+
+
+def read_rtp(path):
+    """Stream a .rtp file into an RtpGraph."""
+    with open(path, "r") as f:
+        return parse_rtp(f, path)
+
+
+def mesh_dims(path):
+    """(R, C) of the mesh_<R>x<C> directory of a .rtp file."""
+    match = _MESH.search(os.path.basename(os.path.dirname(path)))
+    if match is None:
+        raise ValueError(f"{path} is not in a mesh_<R>x<C> directory")
+    return int(match[1]), int(match[2])
+
+
+def traffic_weights(graph, dims, combine="sum"):
+    """Router-to-router traffic of a graph on a ``dims`` mesh.
+
+    ``combine`` is "sum" to add the edges between the same routers or
+    "last" to keep the last of them.
+    """
+    num_routers = int(np.prod(dims))
+    cores = graph.positions[:, 0] + graph.positions[:, 1] * dims[0]
+    flat = cores[graph.src] * num_routers + cores[graph.dst]
+    weights = np.zeros(num_routers * num_routers, dtype=np.int64)
+    if combine == "sum":
+        np.add.at(weights, flat, graph.volume)
+    else:
+        last = len(flat) - 1 - np.unique(flat[::-1], return_index=True)[1]
+        weights[flat[last]] = graph.volume[last]
+    return weights.reshape(num_routers, num_routers)
+
+
+def weighted_hops(weights, hops):
+    """Sum of the traffic weights times the hops they travel."""
+    return float((np.asarray(weights, dtype=np.float64) * hops).sum())
+
+
+def remap_cores(weights, dims, max_passes=100):
+    """Relabel routers to lower the traffic-weighted hop distance.
+
+    Repeatedly takes, for every router a, the swap with another router
+    that lowers the cost the most, until a pass improves nothing. Returns
+    (place, remapped weights): router r of the input runs on router
+    place[r] and remapped[place[a], place[b]] = weights[a, b].
+    """
+    hops = hop_distances(grid_coordinates(dims)).astype(np.float64)
+    sym = np.asarray(weights, dtype=np.float64)
+    sym = sym + sym.T
+    num_routers = len(sym)
+    place = np.arange(num_routers)
+    # dist[a, b]: hops between the routers that a and b are placed on
+    dist = hops.copy()
+    diag = np.diag(sym)
+    # Cost of every router's traffic at its place
+    rowdot = (sym * dist).sum(axis=1)
+    for _ in range(max_passes):
+        improved = False
+        for a in range(num_routers):
+            # Cost change of swapping the places of a and every b: the
+            # traffic of a and b to every other router k changes sides,
+            # sum_k (sym[a, k] - sym[b, k]) * (dist[b, k] - dist[a, k]),
+            # less the terms of k = a and k = b.
+            sa, da = sym[a], dist[a]
+            delta = dist @ sa - sa @ da - rowdot + sym @ da
+            delta -= (sa[a] - sa) * da
+            delta += (sa - diag) * da
+            delta[a] = 0
+            b = int(delta.argmin())
+            if delta[b] < -1e-9 * max(1.0, abs(rowdot).max()):
+                place[[a, b]] = place[[b, a]]
+                dist[[a, b]] = dist[[b, a]]
+                dist[:, [a, b]] = dist[:, [b, a]]
+                rowdot = (sym * dist).sum(axis=1)
+                improved = True
+        if not improved:
+            break
+    remapped = np.zeros_like(np.asarray(weights))
+    remapped[place[:, None], place[None, :]] = weights
+    return place, remapped
+
+
+def output_path(path, fmt, remap=False, output_dir=None):
+    """Where the matrix of a .rtp file is written."""
+    base = os.path.splitext(os.path.basename(path))[0]
+    if remap:
+        base += "_remapped"
+    suffix = ".txt" if fmt == "text" else ".tmb"
+    directory = output_dir or os.path.dirname(path)
+    return os.path.join(directory, base + "_traffic" + suffix)
+
+
+def extract(path, fmt="text", combine="sum", remap=False, output_dir=None):
+    """Write the traffic matrix of one .rtp file.
+
+    Returns (output path, weighted hops before and after remapping).
+    """
+    dims = mesh_dims(path)
+    weights = traffic_weights(read_rtp(path), dims, combine)
+    hops = hop_distances(grid_coordinates(dims))
+    before = after = weighted_hops(weights, hops)
+    if remap:
+        _, weights = remap_cores(weights, dims)
+        after = weighted_hops(weights, hops)
+    matrix = TrafficMatrix(weights, dims)
+    output = output_path(path, fmt, remap, output_dir)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    if fmt == "text":
+        matrix.write(output)
+    else:
+        matrix.write_binary(output, None if fmt == "binary" else fmt)
+    return output, before, after
+
+
+def _extract(job):
+    return extract(*job)
+
+
+def find_rtp(root, meshes=None):
+    """The .rtp files in the mesh_<R>x<C> directories below ``root``."""
+    paths = []
+    for directory in sorted(glob.glob(os.path.join(root, "mesh_*x*"))):
+        if meshes and os.path.basename(directory) not in meshes:
+            continue
+        paths += sorted(glob.glob(os.path.join(directory, "*.rtp")))
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Extract the traffic matrices of .rtp application graphs"
+    )
+    parser.add_argument(
+        "root", help="Directory with the mesh_<R>x<C> directories"
+    )
+    parser.add_argument(
+        "--meshes",
+        nargs="+",
+        default=None,
+        help="Only these mesh_<R>x<C> directories",
+    )
+    parser.add_argument(
+        "--format", choices=["text", "binary"] + LAYOUTS, default="text"
+    )
+    parser.add_argument(
+        "--combine",
+        choices=["sum", "last"],
+        default="sum",
+        help="Add the edges between the same routers, or keep the last one "
+        "like the original extract_traffic.py",
+    )
+    parser.add_argument(
+        "--remap",
+        action="store_true",
+        help="Relabel the routers to lower the weighted hop distance, "
+        "written as *_remapped_traffic.*",
+    )
+    parser.add_argument(
+        "--output-dir",
+        default=None,
+        help="Directory for the matrices (default: next to every graph)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count(),
+        help="Number of graphs extracted in parallel",
+    )
+    args = parser.parse_args(argv)
+
+    paths = find_rtp(args.root, args.meshes)
+    if not paths:
+        sys.exit(f"No .rtp files in {args.root}/mesh_*x*")
+    jobs = [
+        (path, args.format, args.combine, args.remap, args.output_dir)
+        for path in paths
+    ]
+    begin = time.perf_counter()
+    if args.jobs > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            results = list(pool.map(_extract, jobs, chunksize=4))
+    else:
+        results = [_extract(job) for job in jobs]
+    for output, before, after in results:
+        line = output
+        if args.remap and before > 0:
+            line += f"  weighted hops {before:.0f} -> {after:.0f}"
+            line += f" ({1 - after / before:.1%} less)"
+        print(line)
+    print(
+        f"Extracted {len(results)} graphs in "
+        f"{time.perf_counter() - begin:.2f}s",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""Content-addressed on-disk cache of planned long-range topologies.
+
+Planning the long-range links of a topology only depends on the topology
+name, its dimensions, the traffic matrix, the wire budget and the planner
+mode, so the result of a sweep point can be reused by every other point
+that shares them. Each entry is a small JSON file named after the SHA-256
+of that key. Reading an entry refreshes its modification time, and the
+least recently used entries are evicted once the directory grows beyond
+its size limit.
+
+The greedy (--best-effort), annealed and load planner plans are cached;
+random placement is re-drawn on every run as before.
+
+The cache can be inspected from the command line:
+
+    python configs/topologies/topology_cache.py --dir DIR list
+    python configs/topologies/topology_cache.py --dir DIR prune --max-mb 16
+    python configs/topologies/topology_cache.py --dir DIR clear
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+DEFAULT_MAX_BYTES = 64 << 20
+
+_SUFFIX = ".json"
+
+
+def traffic_digest(traffic_matrix):
+    """SHA-256 of the raw bytes of a NumPy traffic matrix."""
+    return hashlib.sha256(
+        traffic_matrix.astype("<f8", copy=False).tobytes()
+    ).hexdigest()
+
+
+def make_key(
+    topology, dims, synthetic, traffic_hash, budget, best_effort, planner=None
+):
+    """Build the dictionary that identifies a planned topology.
+
+    ``planner`` holds the settings of planners other than greedy.
+    """
+    key = {
+        "topology": topology,
+        "dims": [int(d) for d in dims],
+        "synthetic": synthetic,
+        "traffic_hash": traffic_hash,
+        "budget": budget,
+        "best_effort": bool(best_effort),
+    }
+    if planner is not None:
+        key["planner"] = planner
+    return key
+
+
+def _digest(key):
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+
+class TopologyCache(object):
+    """Size-bounded LRU cache of planned topologies in ``directory``."""
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def _path(self, key):
+        return os.path.join(self.directory, _digest(key) + _SUFFIX)
+
+    def get(self, key):
+        """Return the cached entry for ``key``, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("key") != key:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def put(self, key, **values):
+        """Store ``values`` for ``key`` and evict old entries if needed."""
+        os.makedirs(self.directory, exist_ok=True)
+        entry = dict(values, key=key, created=time.time())
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp, self._path(key))
+        self.prune(self.max_bytes)
+
+    def entries(self):
+        """List (path, size, last use) of all entries, oldest first."""
+        result = []
+        if not os.path.isdir(self.directory):
+            return result
+        for name in os.listdir(self.directory):
+            if not name.endswith(_SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            result.append((path, st.st_size, st.st_mtime))
+        result.sort(key=lambda e: e[2])
+        return result
+
+    def prune(self, max_bytes):
+        """Evict least recently used entries until under ``max_bytes``."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for path, size, _ in entries:
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self):
+        """Remove every entry; returns the number of entries removed."""
+        return self.prune(-1)
+
+
+def _list(cache):
+    entries = cache.entries()
+    for path, size, mtime in reversed(entries):
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            continue
+        key = entry["key"]
+        print(
+            time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(mtime)),
+            f"{size:>7}",
+            key["topology"],
+            "x".join(str(d) for d in key["dims"]),
+            key["synthetic"],
+            f"budget={key['budget']}",
+            f"links={len(entry['links'])}",
+            os.path.basename(path)[:12],
+        )
+    total = sum(size for _, size, _ in entries)
+    print(f"{len(entries)} entries, {total} bytes in {cache.directory}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Inspect the long-range topology cache"
+    )
+    parser.add_argument(
+        "--dir",
+        default=os.environ.get("GEM5_TOPOLOGY_CACHE"),
+        required="GEM5_TOPOLOGY_CACHE" not in os.environ,
+        help="Cache directory (defaults to $GEM5_TOPOLOGY_CACHE)",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="List cached topologies, newest first")
+    sub.add_parser("clear", help="Remove every cached topology")
+    prune = sub.add_parser("prune", help="Evict least recently used entries")
+    prune.add_argument("--max-mb", type=float, required=True)
+    args = parser.parse_args()
+
+    cache = TopologyCache(args.dir)
+    if args.command == "list":
+        _list(cache)
+    elif args.command == "clear":
+        print(f"Removed {cache.clear()} entries")
+    else:
+        removed = cache.prune(int(args.max_mb * (1 << 20)))
+        print(f"Removed {removed} entries")
+
+
+if __name__ == "__main__":
+    main()
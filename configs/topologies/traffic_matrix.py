@@ -0,0 +1,383 @@
+"""Traffic matrices of the synthetic patterns of garnet_synth_traffic.py.
+
+A TrafficMatrix holds the relative packet rate from every router (row) to
+every router (column) of a grid as a float32 NumPy array (float64 for
+hotspot, see below). It is built for
+any --synthetic pattern on 2D, 3D or higher dimensional grids, where the
+first coordinate varies fastest, and is shared by the long-range planner
+of the *_longrange topologies and by the traffic generator: written with
+write(), it is the integer text format that GarnetSyntheticTraffic reads
+for --synthetic=real_traffic (one line per source router, space separated
+weights), so --shared-traffic-matrix makes the tester inject exactly the
+traffic the topology was planned for.
+
+Patterns that move a single coordinate (tornado, neighbor) act on the
+first one, transpose swaps the first two and hotspot adds
+--hotspot-factor percent to the weight of every hotspot destination. The
+hotspot weights 1 and 1 + factor / 100 are kept in float64, so that the
+planner sees the same normalized matrix, and plans the same links, as the
+original scalar code.
+
+Large matrices are better stored in the binary format of write_binary(),
+which both read() and the tester memory-map instead of parsing text. It is
+a 64 byte little-endian header (magic "GARNETTM", version, layout, NumPy
+dtype string of the weights, number of dims, number of non-zero weights
+and up to six dims) followed by the uint64 sum of every row and either
+
+  dense: the N x N weights, row-major, or
+  csr:   the uint64 row pointers (N + 1), the uint32 column of every
+         non-zero weight (padded to a multiple of 8 bytes) and its weight.
+
+A matrix can also be written, or a text matrix converted, from the
+command line:
+
+    python configs/topologies/traffic_matrix.py --synthetic transpose \\
+        --dims 8 8 --output transpose_8x8.txt
+    python configs/topologies/traffic_matrix.py --synthetic real_traffic \\
+        --traffic-matrix app_mesh_32x32_traffic.txt --dims 32 32 \\
+        --format csr --output app_mesh_32x32_traffic.tmb
+"""
+
+import argparse
+from collections import namedtuple
+
+import numpy as np
+
+PATTERNS = [
+    "uniform_random",
+    "tornado",
+    "bit_complement",
+    "bit_reverse",
+    "bit_rotation",
+    "neighbor",
+    "shuffle",
+    "transpose",
+    "hotspot",
+    "real_traffic",
+]
+
+# Largest integer weight written for matrices with fractional weights
+_MAX_WEIGHT = 1 << 20
+
+MAGIC = b"GARNETTM"
+VERSION = 1
+LAYOUTS = ["dense", "csr"]
+MAX_DIMS = 6
+
+HEADER = np.dtype(
+    [
+        ("magic", "S8"),
+        ("version", "<u4"),
+        ("layout", "<u4"),
+        ("dtype", "S8"),
+        ("ndim", "<u4"),
+        ("reserved", "<u4"),
+        ("nnz", "<u8"),
+        ("dims", "<u4", (MAX_DIMS,)),
+    ]
+)
+
+# Memory-mapped arrays of a binary matrix; indptr and indices are None for
+# the dense layout, whose data is N x N.
+MappedMatrix = namedtuple(
+    "MappedMatrix", "dims layout row_sums indptr indices data"
+)
+
+
+def _padded(nbytes):
+    return (nbytes + 7) // 8 * 8
+
+
+def _map(path, dtype, offset, shape):
+    if int(np.prod(shape)) == 0:
+        return np.zeros(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape)
+
+
+def is_binary(path):
+    """Whether ``path`` is a binary traffic matrix."""
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def map_binary(path):
+    """Memory-map the arrays of a binary traffic matrix."""
+    header = np.fromfile(path, dtype=HEADER, count=1)
+    if len(header) == 0 or header[0]["magic"] != MAGIC:
+        raise ValueError(f"{path} is not a binary traffic matrix")
+    header = header[0]
+    if header["version"] != VERSION:
+        raise ValueError(
+            f"{path} has version {header['version']}, expected {VERSION}"
+        )
+    dims = tuple(header["dims"][: header["ndim"]].tolist())
+    layout = LAYOUTS[header["layout"]]
+    dtype = np.dtype(header["dtype"].decode())
+    num_routers = int(np.prod(dims))
+    nnz = int(header["nnz"])
+
+    offset = HEADER.itemsize
+    row_sums = _map(path, "<u8", offset, (num_routers,))
+    offset += 8 * num_routers
+    if layout == "dense":
+        data = _map(path, dtype, offset, (num_routers, num_routers))
+        return MappedMatrix(dims, layout, row_sums, None, None, data)
+    indptr = _map(path, "<u8", offset, (num_routers + 1,))
+    offset += 8 * (num_routers + 1)
+    indices = _map(path, "<u4", offset, (nnz,))
+    offset += _padded(4 * nnz)
+    data = _map(path, dtype, offset, (nnz,))
+    return MappedMatrix(dims, layout, row_sums, indptr, indices, data)
+
+
+def grid_coordinates(dims):
+    """Return the (N, len(dims)) coordinates of every router of a grid."""
+    ids = np.arange(int(np.prod(dims)))
+    coords = []
+    for extent in dims:
+        coords.append(ids % extent)
+        ids = ids // extent
+    return np.stack(coords, axis=1)
+
+
+def grid_index(coords, dims):
+    """Inverse of grid_coordinates()."""
+    strides = np.cumprod([1] + list(dims[:-1]))
+    return np.asarray(coords) @ strides
+
+
+def _destinations(pattern, dims):
+    """Destination of every source of a permutation pattern."""
+    num_routers = int(np.prod(dims))
+    coords = grid_coordinates(dims)
+    ids = np.arange(num_routers)
+    if pattern == "tornado":
+        dest = coords.copy()
+        dest[:, 0] = (coords[:, 0] + dims[0] // 2) % dims[0]
+    elif pattern == "bit_complement":
+        dest = np.array(dims) - 1 - coords
+    elif pattern == "bit_reverse":
+        dest = coords ^ (np.array(dims) - 1)
+    elif pattern == "bit_rotation":
+        return ids // 2 + (ids % 2) * (num_routers // 2)
+    elif pattern == "neighbor":
+        dest = coords.copy()
+        dest[:, 0] = (coords[:, 0] + 1) % dims[0]
+    elif pattern == "shuffle":
+        return np.where(
+            ids * 2 < num_routers, ids * 2, ids * 2 - num_routers + 1
+        )
+    elif pattern == "transpose":
+        if len(dims) < 2 or dims[0] != dims[1]:
+            raise ValueError(f"transpose needs a square grid, not {dims}")
+        dest = coords.copy()
+        dest[:, [0, 1]] = coords[:, [1, 0]]
+    else:
+        raise ValueError(f"Traffic type {pattern} not supported")
+    return grid_index(dest, dims)
+
+
+class TrafficMatrix(object):
+    """Relative traffic between the routers of a ``dims`` grid."""
+
+    def __init__(self, weights, dims, dtype=np.float32):
+        self.dims = tuple(int(d) for d in dims)
+        self.weights = np.asarray(weights, dtype=dtype)
+        num_routers = int(np.prod(self.dims))
+        if self.weights.shape != (num_routers, num_routers):
+            raise ValueError(
+                f"Traffic matrix of shape {self.weights.shape} does not "
+                f"match a {'x'.join(map(str, self.dims))} grid"
+            )
+
+    @property
+    def num_routers(self):
+        return self.weights.shape[0]
+
+    @classmethod
+    def from_pattern(
+        cls,
+        pattern,
+        dims,
+        hotspots=(),
+        hotspot_factor=0,
+        single_sender=-1,
+        single_dest=-1,
+        path=None,
+    ):
+        """Build the matrix of a --synthetic pattern.
+
+        ``path`` is the traffic matrix file of real_traffic.
+        """
+        dims = tuple(dims)
+        num_routers = int(np.prod(dims))
+        if single_dest != -1:
+            weights = np.zeros((num_routers, num_routers), dtype=np.float32)
+            weights[:, single_dest] = 1
+        elif pattern == "uniform_random":
+            weights = np.ones((num_routers, num_routers), dtype=np.float32)
+        elif pattern == "hotspot":
+            weights = np.ones((num_routers, num_routers), dtype=np.float64)
+            for i in hotspots:
+                weights[:, i] += hotspot_factor / 100.0
+        elif pattern == "real_traffic":
+            weights = cls.read(path, dims).weights
+        else:
+            weights = np.zeros((num_routers, num_routers), dtype=np.float32)
+            weights[np.arange(num_routers), _destinations(pattern, dims)] = 1
+        if single_sender != -1:
+            sender = weights[single_sender].copy()
+            weights = np.zeros_like(weights)
+            weights[single_sender] = sender
+        return cls(weights, dims, weights.dtype)
+
+    @classmethod
+    def from_options(cls, options, dims):
+        """Build the matrix selected by garnet_synth_traffic.py options.
+
+        Honours --synthetic, --single-dest-id, --single-sender-id,
+        --hotspots, --hotspot-factor and --traffic-matrix.
+        """
+        return cls.from_pattern(
+            options.synthetic,
+            dims,
+            hotspots=options.hotspots,
+            hotspot_factor=options.hotspot_factor,
+            single_sender=options.single_sender_id,
+            single_dest=options.single_dest_id,
+            path=options.traffic_matrix,
+        )
+
+    @classmethod
+    def read(cls, path, dims):
+        """Read a binary or text traffic matrix.
+
+        Text matrices are written by extract_traffic.py or write(). Only
+        the first num_routers weights of the first num_routers rows are
+        used.
+        """
+        num_routers = int(np.prod(dims))
+        if is_binary(path):
+            mapped = map_binary(path)
+            if len(mapped.row_sums) < num_routers:
+                raise ValueError(
+                    f"{path} has {len(mapped.row_sums)} rows, "
+                    f"expected {num_routers}"
+                )
+            if mapped.layout == "dense":
+                weights = mapped.data[:num_routers, :num_routers]
+                return cls(weights, dims)
+            weights = np.zeros((num_routers, num_routers), dtype=np.float32)
+            indptr = mapped.indptr[: num_routers + 1].astype(np.int64)
+            stop = indptr[-1]
+            rows = np.repeat(np.arange(num_routers), np.diff(indptr))
+            columns = mapped.indices[:stop]
+            keep = columns < num_routers
+            weights[rows[keep], columns[keep]] = mapped.data[:stop][keep]
+            return cls(weights, dims)
+        with open(path, "r") as f:
+            lines = f.readlines()
+        weights = np.array(
+            [line.split()[:num_routers] for line in lines[:num_routers]],
+            dtype=np.float64,
+        )
+        return cls(weights, dims)
+
+    def normalized(self):
+        """float64 matrix that sums to one.
+
+        Accumulated in row-major order like the original scalar loops of
+        the topologies, so that the planner breaks ties between symmetric
+        pairs the same way.
+        """
+        weights = self.weights.astype(np.float64)
+        return weights / weights.cumsum()[-1]
+
+    def integer_weights(self):
+        """Integer weights with the ratios of the matrix.
+
+        Integral matrices (extracted traces, synthetic patterns) are kept
+        as they are; others are scaled so that the largest weight is 2^20.
+        Non-zero weights never round to zero.
+        """
+        weights = self.weights.astype(np.float64)
+        peak = weights.max()
+        if peak <= 0:
+            return np.zeros(weights.shape, dtype=np.uint64)
+        scale = 1.0
+        if not np.array_equal(weights, np.rint(weights)):
+            scale = _MAX_WEIGHT / peak
+        ints = np.rint(weights * scale).astype(np.uint64)
+        return np.maximum(ints, weights > 0)
+
+    def write(self, path):
+        """Write the matrix in the text format of GarnetSyntheticTraffic."""
+        with open(path, "w") as f:
+            for row in self.integer_weights().tolist():
+                f.write(" ".join(map(str, row)) + " \n")
+
+    def write_binary(self, path, layout=None):
+        """Write the matrix in the binary format, see the module docstring.
+
+        ``layout`` is "dense" or "csr"; by default the smaller one is used.
+        Weights are stored as uint32 if they fit, else as uint64.
+        """
+        ints = self.integer_weights()
+        num_routers = self.num_routers
+        dtype = np.dtype("<u4" if ints.max() < 1 << 32 else "<u8")
+        rows, columns = np.nonzero(ints)
+        nnz = len(rows)
+        if layout is None:
+            dense = dtype.itemsize * num_routers * num_routers
+            csr = 8 * (num_routers + 1) + _padded(4 * nnz)
+            csr += dtype.itemsize * nnz
+            layout = "csr" if csr < dense else "dense"
+
+        header = np.zeros(1, dtype=HEADER)
+        header["magic"] = MAGIC
+        header["version"] = VERSION
+        header["layout"] = LAYOUTS.index(layout)
+        header["dtype"] = dtype.str.encode()
+        header["ndim"] = len(self.dims)
+        header["nnz"] = nnz
+        header["dims"][0, : len(self.dims)] = self.dims
+        with open(path, "wb") as f:
+            f.write(header.tobytes())
+            f.write(ints.sum(axis=1, dtype=np.uint64).astype("<u8").tobytes())
+            if layout == "dense":
+                f.write(ints.astype(dtype).tobytes())
+                return
+            indptr = np.zeros(num_routers + 1, dtype="<u8")
+            np.cumsum(np.bincount(rows, minlength=num_routers), out=indptr[1:])
+            f.write(indptr.tobytes())
+            f.write(columns.astype("<u4").tobytes())
+            f.write(b"\0" * (_padded(4 * nnz) - 4 * nnz))
+            f.write(ints[rows, columns].astype(dtype).tobytes())
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Write the traffic matrix of a synthetic pattern"
+    )
+    parser.add_argument("--synthetic", choices=PATTERNS, required=True)
+    parser.add_argument("--dims", nargs="+", type=int, required=True)
+    parser.add_argument("--hotspots", nargs="+", type=int, default=[])
+    parser.add_argument("--hotspot-factor", type=int, default=20)
+    parser.add_argument("--single-sender-id", type=int, default=-1)
+    parser.add_argument("--single-dest-id", type=int, default=-1)
+    parser.add_argument("--traffic-matrix", default=None)
+    parser.add_argument(
+        "--format", choices=["text", "binary"] + LAYOUTS, default="text"
+    )
+    parser.add_argument("--output", required=True)
+    args = parser.parse_args()
+    matrix = TrafficMatrix.from_options(args, args.dims)
+    if args.format == "text":
+        matrix.write(args.output)
+    else:
+        layout = None if args.format == "binary" else args.format
+        matrix.write_binary(args.output, layout)
+
+
+if __name__ == "__main__":
+    main()
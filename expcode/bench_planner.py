@@ -0,0 +1,125 @@
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(
+    0,
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "configs"),
+)
+
+from topologies.longrange_planner import GreedyLinkPlanner, mesh_coordinates
+
+
+def load_traffic(path, num_routers):
+    with open(path, "r") as f:
+        lines = f.readlines()
+    traffic_matrix = [
+        [int(x) for x in lines[i].split(" ")[:num_routers]]
+        for i in range(num_routers)
+    ]
+    sum_traffic = sum(sum(row) for row in traffic_matrix)
+    return [[x / sum_traffic for x in row] for row in traffic_matrix]
+
+
+def legacy_plan(traffic_matrix, num_rows, num_columns, budget):
+    # Pure-Python greedy insertion as originally found in Mesh_longrange.
+    num_routers = num_rows * num_columns
+    Links = []
+    To = [-1] * num_routers
+    while budget > 0:
+        max_i = -1
+        max_j = -1
+        max_d = 0
+        for i in range(num_routers):
+            for j in range(i + 1, num_routers):
+                i_x = i % num_columns
+                i_y = i // num_columns
+                j_x = j % num_columns
+                j_y = j // num_columns
+                dst = ((i_x - j_x) ** 2 + (i_y - j_y) ** 2) ** 0.5
+                if To[i] == -1 and To[j] == -1 and budget >= dst:
+                    cnt = 0
+                    for k in range(num_routers):
+                        k_x = k % num_columns
+                        k_y = k // num_columns
+                        to_i = abs(k_x - i_x) + abs(k_y - i_y)
+                        to_j = abs(k_x - j_x) + abs(k_y - j_y)
+                        cnt += traffic_matrix[j][k] * max(0, to_j - to_i - 1)
+                        cnt += traffic_matrix[i][k] * max(0, to_i - to_j - 1)
+                    if cnt / dst > max_d:
+                        max_d = cnt / dst
+                        max_i = i
+                        max_j = j
+        if max_i == -1:
+            break
+        Links.append((max_i, max_j))
+        To[max_i] = max_j
+        To[max_j] = max_i
+        d_x = max_i % num_columns - max_j % num_columns
+        d_y = max_i // num_columns - max_j // num_columns
+        budget -= (d_x**2 + d_y**2) ** 0.5
+    return Links
+
+
+def plan(traffic_matrix, num_rows, num_columns, budget):
+    Links = []
+    planner = GreedyLinkPlanner(
+        traffic_matrix, mesh_coordinates(num_rows, num_columns)
+    )
+    while budget > 0:
+        best = planner.best_link(budget)
+        if best is None:
+            break
+        max_i, max_j, _ = best
+        Links.append((max_i, max_j))
+        planner.accept(max_i, max_j)
+        budget -= planner.wire_length(max_i, max_j)
+    return Links
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--legacy-max-routers",
+        type=int,
+        default=64,
+        help="Also time and cross-check the pure-Python planner on "
+        "meshes with at most this many routers",
+    )
+    args = parser.parse_args()
+
+    sizes = []
+    for path in glob.glob("real_traffic/mesh_*"):
+        rows, cols = os.path.basename(path).split("_")[1].split("x")
+        sizes.append((int(rows) * int(cols), int(rows), int(cols), path))
+
+    print(
+        f"{'mesh':>8} {'file':>28} {'links':>5} "
+        f"{'numpy(s)':>9} {'legacy(s)':>9}"
+    )
+    for num_routers, rows, cols, path in sorted(sizes):
+        traffic_file = sorted(glob.glob(f"{path}/*_traffic.txt"))[0]
+        traffic_matrix = load_traffic(traffic_file, num_routers)
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            Links = plan(traffic_matrix, rows, cols, args.budget)
+        elapsed = (time.perf_counter() - start) / args.repeat
+        legacy = "-"
+        if num_routers <= args.legacy_max_routers:
+            start = time.perf_counter()
+            expected = legacy_plan(traffic_matrix, rows, cols, args.budget)
+            legacy = f"{time.perf_counter() - start:9.3f}"
+            assert Links == expected, (Links, expected)
+        name = os.path.basename(traffic_file).split("_mesh")[0]
+        print(
+            f"{rows:>3}x{cols:<4} {name:>28} {len(Links):>5} "
+            f"{elapsed:9.3f} {legacy:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
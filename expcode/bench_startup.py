@@ -0,0 +1,119 @@
+"""Startup time of garnet networks across mesh and cube sizes.
+
+Runs garnet_synth_traffic.py for a handful of cycles on every topology and
+size, so that the wall time is dominated by building the network (routing
+tables of Topology::createLinks, long-range link planning). Pass a gem5
+binary built from an older tree with --baseline to compare the two:
+
+    python expcode/bench_startup.py --mesh-rows 4 8 16 --cube-rows 4 6
+    python expcode/bench_startup.py --baseline ../old/build/NULL/gem5.opt
+"""
+
+import argparse
+import os
+import subprocess
+import tempfile
+import time
+
+from sweep import CONFIG, GEM5
+
+TOPOLOGIES = {
+    "Mesh_XY": ["--routing-algorithm=1"],
+    "Mesh_longrange": [
+        "--routing-algorithm=5",
+        "--adaptive-routing",
+        "--best-effort",
+    ],
+    "Cube_XYZ": ["--routing-algorithm=6"],
+    "Cube_longrange": [
+        "--routing-algorithm=7",
+        "--adaptive-routing",
+        "--hiry",
+        "--compete-algorithm=1",
+        "--best-effort",
+    ],
+}
+
+
+def startup_args(topology, rows, budget):
+    """garnet_synth_traffic.py options of one benchmark point."""
+    num_cpus = rows**3 if topology.startswith("Cube") else rows * rows
+    args = [
+        "--network=garnet",
+        f"--topology={topology}",
+        f"--num-cpus={num_cpus}",
+        f"--num-dirs={num_cpus}",
+        f"--mesh-rows={rows}",
+        "--wormhole",
+        "--vcs-per-vnet=2",
+        "--inj-vnet=0",
+        "--sim-cycles=10",
+        "--injectionrate=0.01",
+    ]
+    if topology.endswith("longrange"):
+        args.append(f"--budget={budget}")
+    return args + TOPOLOGIES[topology]
+
+
+def time_gem5(gem5, args):
+    """Wall time of one gem5 run in seconds, None if it failed."""
+    with tempfile.TemporaryDirectory() as outdir:
+        start = time.perf_counter()
+        result = subprocess.run(
+            [gem5, f"--outdir={outdir}", CONFIG] + args,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        elapsed = time.perf_counter() - start
+    return elapsed if result.returncode == 0 else None
+
+
+def _seconds(value):
+    return f"{value:9.2f}" if value is not None else f"{'failed':>9}"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--gem5", default=GEM5)
+    parser.add_argument(
+        "--baseline",
+        default=None,
+        help="Also time this gem5 binary, e.g. one built before a change",
+    )
+    parser.add_argument(
+        "--topology", nargs="+", default=list(TOPOLOGIES), choices=TOPOLOGIES
+    )
+    parser.add_argument("--mesh-rows", nargs="+", type=int, default=[4, 8, 16])
+    parser.add_argument("--cube-rows", nargs="+", type=int, default=[4, 6])
+    parser.add_argument("--budget", type=int, default=24)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    print(
+        f"{'topology':>15} {'size':>8} {'routers':>7} {'gem5(s)':>9}"
+        + (f" {'baseline(s)':>11}" if args.baseline else "")
+    )
+    for topology in args.topology:
+        cube = topology.startswith("Cube")
+        for rows in args.cube_rows if cube else args.mesh_rows:
+            size = f"{rows}x{rows}" + (f"x{rows}" if cube else "")
+            run_args = startup_args(topology, rows, args.budget)
+            times = [
+                time_gem5(args.gem5, run_args) for _ in range(args.repeat)
+            ]
+            line = (
+                f"{topology:>15} {size:>8} {rows**(3 if cube else 2):>7} "
+                f"{_seconds(None if None in times else min(times))}"
+            )
+            if args.baseline:
+                times = [
+                    time_gem5(args.baseline, run_args)
+                    for _ in range(args.repeat)
+                ]
+                best = None if None in times else min(times)
+                line += f"   {_seconds(best)}"
+            print(line, flush=True)
+
+
+if __name__ == "__main__":
+    main()
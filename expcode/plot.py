@@ -4,6 +4,8 @@ import math
 import argparse
 from mpl_toolkits.axes_grid1.inset_locator import inset_axes, mark_inset
 
+from results import runs_frame
+
 routing_algorithms_id2name = {
     0: "Table",
     1: "XY",
@@ -16,6 +18,21 @@ routing_algorithms_id2name = {
     8: "EscapeVC"
 }
 
+# Result store columns and their names in the plots
+COLUMNS = {
+    "synthetic": "Synthetic Type",
+    "rate": "Injection Rate",
+    "average_packet_latency": "Latency",
+    "packets_received::total": "Throughput",
+    "average_hops": "HopCount",
+    "routing": "RoutingAlgorithm",
+    "experiment": "Experiment",
+    "topology": "Topology",
+    "reception_rate": "ReceptionRate",
+    "sensor": "Sensor",
+    "buffer": "Buffer",
+}
+
 def latency_throughput(df, name, synthetic_type):
     fig, axes = plt.subplots(1, 3, figsize=(15, 5), constrained_layout=True) 
     colors = ['g', 'b', 'c', 'r', 'm', 'y', 'k']
@@ -96,43 +113,12 @@ def latency_throughput(df, name, synthetic_type):
     plt.close()
 
 if __name__ == '__main__':
-    data = []
-
     parser = argparse.ArgumentParser()
     parser.add_argument("--name", type=str, help="File to parse")
     args = parser.parse_args()
     name = args.name
 
-    with open(f"output/{name}.txt", "r") as file:
-        for line in file:
-            if line.startswith("Running"):
-                parts = line.split(", ")
-                for part in parts:
-                    if "rate" in part:
-                        rate = float(part.split(" = ")[1])
-                    if "synthetic" in part:
-                        synthetic_type = part.split(" = ")[1]
-                    if "topology" in part:
-                        topology = part.split(" = ")[1]
-                    if "routing" in part and "escape" not in part:
-                        routing_algorithm = part.split(" = ")[1]
-                    if "experiment" in part:
-                        experiment = part.split(" = ")[1]
-                    if "sensor" in part:
-                        sensor = part.split(" = ")[1]
-                    if "buffer" in part:
-                        buffer = part.split(" = ")[1]
-            elif "average_packet_latency" in line:
-                latency = float(line.strip().split(" = ")[1].split("(")[0])
-            elif "packets_received" in line:
-                throughput = float(line.strip().split(" = ")[1].split("(")[0])
-            elif "average_hops" in line:
-                hopcount = float(line.strip().split(" = ")[1].split("(")[0])
-            elif "reception_rate" in line:
-                reception_rate = float(line.strip().split(" = ")[1].split("(")[0])
-                data.append((synthetic_type, rate, latency, throughput, hopcount, routing_algorithm, experiment, topology, reception_rate, sensor, buffer))
-
-    df = pd.DataFrame(data, columns=["Synthetic Type", "Injection Rate", "Latency", "Throughput", "HopCount", "RoutingAlgorithm", "Experiment", "Topology", "ReceptionRate", "Sensor", "Buffer"])
+    df = runs_frame(name, list(COLUMNS)).rename(columns=COLUMNS)
     if "synth" in name:
         latency_throughput(df, name, "uniform_random")
         latency_throughput(df, name, "transpose")
@@ -1,39 +1,146 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import math
+"""Simulated throughput against the analytical bounds of a topology.
+
+For every injection rate of a sweep, plots the throughput that Little's
+law allows with the average number of packets in the network N_ave, at
+the zero-load latency T_0 (N_ave/T_0) and at the simulated latency
+(N_ave/T_ave). T_0 and the channel-load bound lambda_c come from
+topologies.analyze for the topology, size, traffic, long-range links and
+router/link latencies on the command line of the runs, so the bound sits
+where it belongs for any network without a saturation sweep:
+
+    python expcode/plot_bound.py --name bound_mesh
+    python expcode/plot_bound.py --name bound_cube
+"""
+
 import argparse
+import os
+import re
+import shlex
+import sys
+
+import matplotlib.pyplot as plt
+import pandas as pd
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "configs")
+)
+
+from topologies.analyze import evaluate, topology_dims
+from results import runs_frame
 
+# garnet_synth_traffic.py sets the tick to 500ps
+TICK = 500e-12
+_UNITS = {"GHz": 1e9, "MHz": 1e6, "kHz": 1e3, "Hz": 1}
 
-def visualize(df, name):
-    plt.plot(df["Injection Rate"], df["VAL1"], marker='o', label=f"N_ave/T_0")
-    plt.plot(df["Injection Rate"], df["VAL2"], marker='o', label=f"N_ave/T_ave")
-    plt.plot(df["Injection Rate"], df["Injection Rate"], label=f"injection rate", linestyle='--')
+
+def clock_ticks(clock):
+    """Ticks per cycle of a clock such as "2GHz"."""
+    value, unit = re.fullmatch(r"([\d.]+)\s*([kMG]?Hz)", clock).groups()
+    return 1 / (float(value) * _UNITS[unit]) / TICK
+
+
+def run_options(command, name):
+    """The options of garnet_synth_traffic.py that set the bounds.
+
+    ``command`` is the command line of a run, or None for text records,
+    whose options default to the bound sweeps of ``name``.
+    """
+    cube = "cube" in name
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument(
+        "--topology", default="Cube_XYZ" if cube else "Mesh_XY"
+    )
+    parser.add_argument("--num-cpus", type=int, default=64)
+    parser.add_argument("--mesh-rows", type=int, default=4 if cube else 8)
+    parser.add_argument("--synthetic", default="uniform_random")
+    parser.add_argument("--traffic-matrix", default=None)
+    parser.add_argument("--budget", type=float, default=12)
+    parser.add_argument("--best-effort", action="store_true")
+    parser.add_argument("--link-planner", default=None)
+    parser.add_argument("--topology-seed", type=int, default=None)
+    parser.add_argument("--planner-time", type=float, default=10.0)
+    parser.add_argument("--planner-moves", type=int, default=200000)
+    parser.add_argument("--hotspots", nargs="+", type=int, default=[])
+    parser.add_argument("--hotspot-factor", type=int, default=20)
+    parser.add_argument("--single-sender-id", type=int, default=-1)
+    parser.add_argument("--single-dest-id", type=int, default=-1)
+    parser.add_argument("--router-latency", type=int, default=1)
+    parser.add_argument("--link-latency", type=int, default=1)
+    parser.add_argument("--sim-cycles", type=int, default=200000)
+    parser.add_argument("--sys-clock", default="1GHz")
+    parser.add_argument("--ruby-clock", default="2GHz")
+    options, _ = parser.parse_known_args(shlex.split(command or ""))
+    return options
+
+
+def bounds(options):
+    """(T_0 in network cycles, lambda_c in packets/node/tester cycle)."""
+    dims = topology_dims(
+        options.topology, options.num_cpus, options.mesh_rows
+    )
+    row, _ = evaluate(options.topology, dims, options)
+    # analyze counts network cycles, the testers inject per system cycle
+    cycles = clock_ticks(options.sys_clock) / clock_ticks(options.ruby_clock)
+    return row["zero_load_latency"], row["lambda_c"] * cycles
+
+
+def visualize(df, name, lambda_c):
+    plt.plot(df["Injection Rate"], df["VAL1"], marker="o", label="N_ave/T_0")
+    plt.plot(
+        df["Injection Rate"], df["VAL2"], marker="o", label="N_ave/T_ave"
+    )
+    plt.plot(
+        df["Injection Rate"],
+        df["Injection Rate"],
+        label="injection rate",
+        linestyle="--",
+    )
+    plt.axvline(
+        lambda_c, color="gray", linestyle=":", label=f"λc = {lambda_c:.3f}"
+    )
     plt.xlabel("Injection Rate(packets/node/cycle)", fontsize=14)
-    plt.legend(prop={'size': 12})  # 设置图例字体大小
-    plt.savefig(f"plots/{name}.png", dpi = 300)
+    plt.legend(prop={"size": 12})  # 设置图例字体大小
+    plt.savefig(f"plots/{name}.png", dpi=300)
+
 
-if __name__ == '__main__':
+if __name__ == "__main__":
     data = []
     parser = argparse.ArgumentParser()
     parser.add_argument("--name", type=str, default="bound_cube")
+    parser.add_argument(
+        "--max-rate",
+        type=float,
+        default=None,
+        help="Leave out the injection rates above this one",
+    )
     args = parser.parse_args()
-    with open(f"output/{args.name}.txt", "r") as file:
-        for line in file:
-            if line.startswith("Running"):
-                parts = line.strip().split(", ")
-                rate = float(parts[0].split(" = ")[1])
-            elif "average_packet_network_latency" in line:
-                latency = float(line.strip().split(" = ")[1].split("(")[0])
-            elif "packets_in_network_per_cpu" in line:
-                network_latency_per_cpu = float(line.strip().split(" = ")[1])
-                if "cube" in args.name:
-                    val1 = network_latency_per_cpu / 100000 / (3 + 3.75 * 2)
-                    val2 = network_latency_per_cpu / 100000 / latency
-                else:
-                    val1 = network_latency_per_cpu / 100000 / (3 + 5.25 * 2)
-                    val2 = network_latency_per_cpu / 100000 / latency
-                if rate < 0.72 or "cube" in args.name:
-                    data.append((rate, val1, val2))
+    runs = runs_frame(
+        args.name,
+        [
+            "rate",
+            "average_packet_network_latency",
+            "packets_in_network_per_cpu",
+            "command",
+        ],
+    )
+    commands = runs["command"].dropna()
+    options = run_options(
+        commands.iloc[0] if len(commands) else None, args.name
+    )
+    zero_load, lambda_c = bounds(options)
+    # packets_in_network sums the ticks every packet spent in the network
+    sim_ticks = options.sim_cycles
+    sys_ticks = clock_ticks(options.sys_clock)
+    zero_load_ticks = zero_load * clock_ticks(options.ruby_clock)
+    print(
+        f"{options.topology} {options.num_cpus} routers: T_0 = "
+        f"{zero_load:.3f} cycles, lambda_c = {lambda_c:.3f}"
+    )
+    for rate, latency, in_network, _ in runs.values:
+        if args.max_rate is not None and rate > args.max_rate:
+            continue
+        packets = in_network / sim_ticks * sys_ticks
+        data.append((rate, packets / zero_load_ticks, packets / latency))
 
     df = pd.DataFrame(data, columns=["Injection Rate", "VAL1", "VAL2"])
-    visualize(df, args.name)
\ No newline at end of file
+    visualize(df, args.name, lambda_c)
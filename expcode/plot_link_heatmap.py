@@ -0,0 +1,254 @@
+"""Link and router heatmaps of one gem5 run, drawn from its outdir.
+
+Garnet writes the flits that crossed every internal link
+(``int_link_flits``, indexed like ``int_links`` in config.ini) and the
+fraction of time the input VCs of every router held a packet
+(``router_vc_occupancy``) to stats.txt. This script maps them back onto
+the mesh or cube of the run, like vis.py does for the analytic XY loads:
+neighbour links are drawn as straight segments with the flits of both
+directions, long-range links as arcs and routers are coloured by their VC
+occupancy. Cubes get one panel per layer; links between layers are drawn
+in the panel of their lower end.
+
+    python expcode/plot_link_heatmap.py m5out --output plots/links.png
+    python expcode/plot_link_heatmap.py sweeps/mesh_synth_16/3 --top 10
+"""
+
+import argparse
+import configparser
+import os
+import sys
+
+import matplotlib.colors as mcolors
+import matplotlib.pyplot as plt
+import numpy as np
+
+sys.path.insert(
+    0,
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "configs"),
+)
+
+from topologies.traffic_matrix import grid_coordinates
+from results import NETWORK, read_dumps, stat_values
+
+SECTION = NETWORK.rstrip(".")
+
+
+def read_links(path):
+    """(src router, dst router) of every int link and the number of routers.
+
+    Links are in the order of ``int_links`` in config.ini, which is the
+    index of ``int_link_flits``.
+    """
+    config = configparser.ConfigParser(interpolation=None, strict=False)
+    config.read(path)
+    network = config[SECTION]
+    router_ids = {
+        name: config.getint(name, "router_id")
+        for name in network["routers"].split()
+    }
+    links = [
+        (
+            router_ids[config.get(name, "src_node")],
+            router_ids[config.get(name, "dst_node")],
+        )
+        for name in network["int_links"].split()
+    ]
+    return links, len(router_ids), network.getint("num_rows")
+
+
+def grid_dims(num_routers, num_rows):
+    """Dimensions of the grid, a cube if it has num_rows**3 routers."""
+    if num_rows**3 == num_routers:
+        return (num_rows, num_rows, num_rows)
+    return (num_routers // num_rows, num_rows)
+
+
+def read_run(outdir, dump=-1):
+    """Links, their flits, router occupancy and dims of one outdir.
+
+    ``dump`` indexes the dumps of stats.txt. The last one covers the
+    measurement after the warm-up, or its last window with
+    --stats-interval.
+    """
+    links, num_routers, num_rows = read_links(
+        os.path.join(outdir, "config.ini")
+    )
+    dumps = read_dumps(os.path.join(outdir, "stats.txt"))
+    if not dumps:
+        sys.exit(f"No stats dump in {outdir}/stats.txt")
+    values = stat_values(dumps[dump])
+    flits = np.array(
+        [values.get(f"int_link_flits::{i}", 0.0) for i in range(len(links))]
+    )
+    occupancy = np.array(
+        [
+            values.get(f"router_vc_occupancy::{i}", 0.0)
+            for i in range(num_routers)
+        ]
+    )
+    if len(links) == 1:
+        flits[0] = values.get("int_link_flits", 0.0)
+    if num_routers == 1:
+        occupancy[0] = values.get("router_vc_occupancy", 0.0)
+    return links, flits, occupancy, grid_dims(num_routers, num_rows)
+
+
+def undirected_loads(links, flits):
+    """Sum the flits of both directions of every router pair."""
+    loads = {}
+    for (src, dst), value in zip(links, flits):
+        key = (min(src, dst), max(src, dst))
+        loads[key] = loads.get(key, 0.0) + value
+    return loads
+
+
+def plot(links, flits, occupancy, dims, output, title=None):
+    coords = grid_coordinates(dims)
+    layers = dims[2] if len(dims) == 3 else 1
+    fig, axes = plt.subplots(1, layers, figsize=(6 * layers, 6), squeeze=False)
+    axes = axes[0]
+    loads = undirected_loads(links, flits)
+    norm = mcolors.Normalize(vmin=0, vmax=max(list(loads.values()) + [1]))
+    cmap = plt.get_cmap("Reds")
+    node_norm = mcolors.Normalize(vmin=0, vmax=max(occupancy.max(), 1e-9))
+    node_cmap = plt.get_cmap("Blues")
+
+    for z, ax in enumerate(axes):
+        ax.set_xticks(np.arange(0, dims[0], 1))
+        ax.set_yticks(np.arange(0, dims[1], 1))
+        ax.set_xticklabels([])
+        ax.set_yticklabels([])
+        for spine in ax.spines.values():
+            spine.set_visible(False)
+        if layers > 1:
+            ax.set_title(f"z = {z}")
+        ax.invert_yaxis()
+
+    for (a, b), value in loads.items():
+        (xa, ya), (xb, yb) = coords[a][:2], coords[b][:2]
+        za = coords[a][2] if layers > 1 else 0
+        zb = coords[b][2] if layers > 1 else 0
+        ax = axes[min(za, zb)]
+        color = cmap(norm(value))
+        neighbour = np.abs(coords[a] - coords[b]).sum() == 1
+        if neighbour and za == zb:
+            ax.plot([xa, xb], [ya, yb], color=color, linewidth=2)
+            ax.text(
+                (xa + xb) / 2,
+                (ya + yb) / 2,
+                f"{value:.0f}",
+                ha="center",
+                va="center",
+                color="black",
+                fontsize=7,
+            )
+            continue
+        # Long-range and inter-layer links: an arc bent away from the line
+        # between its ends, labelled at its top.
+        mid = np.array([(xa + xb) / 2, (ya + yb) / 2])
+        normal = np.array([yb - ya, xa - xb], dtype=float)
+        length = np.hypot(*normal)
+        normal = normal / length * 0.25 if length else np.array([0.3, 0.3])
+        t = np.linspace(0, 1, 20)[:, None]
+        start, end = np.array([xa, ya]), np.array([xb, yb])
+        control = mid + normal
+        curve = (1 - t) ** 2 * start + 2 * t * (1 - t) * control + t**2 * end
+        ax.plot(
+            curve[:, 0],
+            curve[:, 1],
+            color=color,
+            linewidth=2,
+            linestyle="-" if za == zb else "--",
+        )
+        label = f"{value:.0f}"
+        if za != zb:
+            label += f" z{max(za, zb)}"
+        ax.text(
+            *(mid + normal / 2),
+            label,
+            ha="center",
+            va="center",
+            color="darkred",
+            fontsize=7,
+        )
+
+    for router, (x, y) in enumerate(coords[:, :2]):
+        z = coords[router][2] if layers > 1 else 0
+        axes[z].scatter(
+            x,
+            y,
+            s=120,
+            color=node_cmap(node_norm(occupancy[router])),
+            edgecolors="black",
+            zorder=3,
+        )
+
+    fig.colorbar(
+        plt.cm.ScalarMappable(norm=norm, cmap=cmap),
+        ax=list(axes),
+        label="flits",
+        shrink=0.8,
+    )
+    fig.colorbar(
+        plt.cm.ScalarMappable(norm=node_norm, cmap=node_cmap),
+        ax=list(axes),
+        label="VC occupancy",
+        shrink=0.8,
+    )
+    if title:
+        fig.suptitle(title)
+    plt.savefig(output)
+    plt.close(fig)
+
+
+def _position(coords):
+    return "(" + ",".join(str(int(c)) for c in coords) + ")"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("outdir", help="gem5 outdir with stats.txt")
+    parser.add_argument(
+        "--dims",
+        nargs="+",
+        type=int,
+        default=None,
+        help="Grid dimensions, fastest first (default: from num_rows)",
+    )
+    parser.add_argument(
+        "--dump",
+        type=int,
+        default=-1,
+        help="Index of the stats dump to plot (default: the last)",
+    )
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    links, flits, occupancy, dims = read_run(args.outdir, args.dump)
+    if args.dims:
+        dims = tuple(args.dims)
+    if int(np.prod(dims)) != len(occupancy):
+        sys.exit(f"{len(occupancy)} routers do not fit dims {dims}")
+
+    coords = grid_coordinates(dims)
+    print(f"{'link':>5} {'src':>12} {'dst':>12} {'flits':>10}")
+    for i in np.argsort(-flits, kind="stable")[: args.top]:
+        src, dst = links[i]
+        print(
+            f"{i:>5} {_position(coords[src]):>12} "
+            f"{_position(coords[dst]):>12} {flits[i]:>10.0f}"
+        )
+    busiest = occupancy.argmax()
+    print(
+        f"busiest router {busiest} {_position(coords[busiest])}: "
+        f"VC occupancy {occupancy[busiest]:.3f}"
+    )
+
+    output = args.output or os.path.join(args.outdir, "link_heatmap.png")
+    plot(links, flits, occupancy, dims, output, title=args.outdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,25 @@ import matplotlib.pyplot as plt
 import math
 import argparse
 from mpl_toolkits.axes_grid1.inset_locator import inset_axes, mark_inset
+
+from results import runs_frame
+
+# Result store columns and their names in the plots
+COLUMNS = {
+    "synthetic": "Synthetic Type",
+    "rate": "Injection Rate",
+    "average_packet_latency": "Latency",
+    "packets_received::total": "Throughput",
+    "average_hops": "HopCount",
+    "routing": "RoutingAlgorithm",
+    "experiment": "Experiment",
+    "topology": "Topology",
+    "matrix": "TrafficMatrix",
+    "reception_rate": "ReceptionRate",
+    "sensor": "Sensor",
+    "buffer": "Buffer",
+}
+
 routing_algorithms_id2name = {
     0: "Table",
     1: "XY",
@@ -89,45 +108,13 @@ def latency_throughput(df, name, traffic_key="Sparse"):
 
 
 if __name__ == '__main__':
-    data = []
-# Running experiment with the following parameters: injection rate = $rate, synthetic type = $synthetic, topology = $topology, routing algorithm = $routing, adaptive = $adaptive, wormhole = $wormhole, vcs per vnet = $vcs, buffer per ctrl vc = $buffer, matrix = $traffic_matrix, experiment = $experiment
     parser = argparse.ArgumentParser()
     parser.add_argument("--name", type=str, help="File to parse")
     args = parser.parse_args()
     name = args.name
 
-    with open(f"output/{name}.txt", "r") as file:
-        for line in file:
-            if line.startswith("Running"):
-                parts = line.strip().split(", ")
-                for part in parts:
-                    if "rate" in part:
-                        rate = float(part.split(" = ")[1])
-                    if "synthetic" in part:
-                        synthetic_type = part.split(" = ")[1]
-                    if "topology" in part:
-                        topology = part.split(" = ")[1]
-                    if "routing" in part and "escape" not in part:
-                        routing_algorithm = part.split(" = ")[1]
-                    if "trix" in part:
-                        traffic_matrix = part.split(" = ")[1].split("/")[-1].split('_mesh')[0]
-                    if "experiment" in part:
-                        experiment = part.split(" = ")[1]
-                    if "sensor" in part:
-                        sensor = part.split(" = ")[1]
-                    if "buffer" in part:
-                        buffer = part.split(" = ")[1]
-            elif "average_packet_latency" in line:
-                latency = float(line.strip().split(" = ")[1].split("(")[0])
-            elif "packets_received" in line:
-                throughput = float(line.strip().split(" = ")[1].split("(")[0])
-            elif "average_hops" in line:
-                hopcount = float(line.strip().split(" = ")[1].split("(")[0])
-            elif "reception_rate" in line:
-                reception_rate = float(line.strip().split(" = ")[1].split("(")[0])
-                data.append((synthetic_type, rate, latency, throughput, hopcount, routing_algorithm, experiment, topology, traffic_matrix, reception_rate, sensor, buffer))
-
-    df = pd.DataFrame(data, columns=["Synthetic Type", "Injection Rate", "Latency", "Throughput", "HopCount", "RoutingAlgorithm", "Experiment", "Topology", "TrafficMatrix", "ReceptionRate", "Sensor", "Buffer"])
+    df = runs_frame(name, list(COLUMNS)).rename(columns=COLUMNS)
+    df["TrafficMatrix"] = df["TrafficMatrix"].map(lambda m: m.split("/")[-1].split('_mesh')[0])
     traffic_keys = ["Fpppp", "H264-720p", "H264-1080p", "Sparse", "Robot", "RS-32_28_8_dec", "RS-32_28_8_enc"]
     for traffic_key in traffic_keys:
         latency_throughput(df, name, traffic_key)
@@ -0,0 +1,384 @@
+"""SQLite store of sweep results, one row per gem5 run.
+
+The ``runs`` table holds the parameters of every run (sweep, series,
+injection rate, synthetic pattern, topology, routing, VC and sensor
+settings, traffic matrix, experiment, command line and outdir), the
+reception rate, and one column per ``system.ruby.network.<stat>`` scalar or
+vector element of its stats.txt, e.g. ``average_packet_latency`` or
+``packets_injected::vnet-0``. New statistics add new columns. Per
+component statistics below the network (``routers00.buffer_reads``,
+``int_links05.network_link.link_utilization``, ...) and the per-link and
+per-router vectors of the network (``int_link_flits::5``,
+``router_vc_occupancy::3``) are far too many to be columns and go to
+``component_stats(run, stat, value)`` instead.
+
+expcode/sweep.py adds the runs of a sweep when it is complete and the
+plot scripts read them back with runs_frame(), which falls back to the
+text records in output/<name>.txt for results that predate the store:
+
+    python expcode/results.py list
+    python expcode/results.py import output/mesh_synth_16.txt
+"""
+
+import argparse
+import os
+import sqlite3
+import time
+
+DEFAULT_PATH = "output/results.sqlite"
+NETWORK = "system.ruby.network."
+# Network vectors with one element per link or router
+COMPONENT_VECTORS = {"int_link_flits", "router_vc_occupancy"}
+
+PARAMS = [
+    ("name", "TEXT"),
+    ("sweep", "TEXT"),
+    ("series", "INTEGER"),
+    ("rate", "REAL"),
+    ("synthetic", "TEXT"),
+    ("topology", "TEXT"),
+    ("routing", "INTEGER"),
+    ("adaptive", "INTEGER"),
+    ("wormhole", "INTEGER"),
+    ("vcs", "INTEGER"),
+    ("buffer", "INTEGER"),
+    ("sensor", "INTEGER"),
+    ("escape_routing", "INTEGER"),
+    ("matrix", "TEXT"),
+    ("budget", "REAL"),
+    ("experiment", "INTEGER"),
+    ("command", "TEXT"),
+    ("outdir", "TEXT"),
+    ("created", "REAL"),
+    ("reception_rate", "REAL"),
+]
+
+# Header fields and stat lines of the text records written by the sweeps
+_TEXT_FIELDS = {
+    "injection rate": "rate",
+    "synthetic type": "synthetic",
+    "topology": "topology",
+    "routing algorithm": "routing",
+    "adaptive": "adaptive",
+    "wormhole": "wormhole",
+    "vcs per vnet": "vcs",
+    "buffer per ctrl vc": "buffer",
+    "sensor": "sensor",
+    "escape-routing": "escape_routing",
+    "matrix": "matrix",
+    "maxtrix": "matrix",
+    "experiment": "experiment",
+}
+_TEXT_STATS = {
+    "packets_injected": "packets_injected::total",
+    "packets_received": "packets_received::total",
+}
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _number(token):
+    try:
+        return float(token)
+    except ValueError:
+        return None
+
+
+def read_dumps(path):
+    """Every dump of stats.txt as a dict of statistic name to line.
+
+    The value is the rest of the line after the name, e.g.
+    "15786                       (Unspecified)".
+    """
+    dumps = []
+    stats = None
+    with open(path, "r") as f:
+        for line in f:
+            if line.startswith("---------- Begin"):
+                stats = {}
+            elif line.startswith("---------- End"):
+                if stats is not None:
+                    dumps.append(stats)
+                stats = None
+            elif stats is not None:
+                parts = line.rstrip("\n").split(None, 1)
+                if len(parts) == 2:
+                    stats.setdefault(parts[0], parts[1])
+    return dumps
+
+
+def read_stats(path):
+    """Map every statistic of the first dump in stats.txt to its line."""
+    stats = {}
+    with open(path, "r") as f:
+        for line in f:
+            if line.startswith("---------- End"):
+                break
+            parts = line.rstrip("\n").split(None, 1)
+            if len(parts) == 2 and not line.startswith("-"):
+                stats.setdefault(parts[0], parts[1])
+    return stats
+
+
+def window_trace(dumps):
+    """(final tick, packets received, packet latency) of every dump.
+
+    garnet_synth_traffic.py --stats-interval resets the statistics after
+    every dump, so each dump is one window of the run. The last row sums
+    all windows, with the latency averaged over their packets.
+    """
+    rows = []
+    for stats in dumps:
+        values = stat_values(stats, prefix="")
+        network = stat_values(stats)
+        received = network.get("packets_received::total", 0.0)
+        latency = sum(
+            v
+            for k, v in network.items()
+            if k.split("::")[0]
+            in ("packet_network_latency", "packet_queueing_latency")
+        )
+        rows.append((values.get("finalTick", 0.0), received, latency))
+    total = (
+        rows[-1][0] if rows else 0.0,
+        sum(r[1] for r in rows),
+        sum(r[2] for r in rows),
+    )
+    return [
+        (tick, received, latency / received if received else None)
+        for tick, received, latency in rows + [total]
+    ]
+
+
+def stat_values(stats, prefix=NETWORK):
+    """Numeric values of the statistics below ``prefix``.
+
+    Statistics printed on one line (vectors with the oneline flag) are
+    split into ``name::0``, ``name::1``, ... Names lose the prefix.
+    """
+    values = {}
+    for name, text in stats.items():
+        if not name.startswith(prefix):
+            continue
+        name = name[len(prefix) :]
+        numbers = []
+        for token in text.split("#")[0].split():
+            if token.startswith("("):
+                break
+            if token.endswith("%"):
+                continue
+            # Elements of oneline vectors are printed as " |<value>"
+            value = _number(token.lstrip("|"))
+            if value is not None:
+                numbers.append(value)
+        if len(numbers) == 1:
+            values[name] = numbers[0]
+        else:
+            for i, value in enumerate(numbers):
+                values[f"{name}::{i}"] = value
+    return values
+
+
+class ResultStore(object):
+    """One row per run in the ``runs`` table of an SQLite database."""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db = sqlite3.connect(path)
+        columns = ", ".join(f"{n} {t}" for n, t in PARAMS)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS runs "
+            f"(id INTEGER PRIMARY KEY, {columns})"
+        )
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS component_stats "
+            "(run INTEGER, stat TEXT, value REAL, PRIMARY KEY (run, stat))"
+            " WITHOUT ROWID"
+        )
+        self.db.execute(
+            "CREATE INDEX IF NOT EXISTS runs_name ON runs (name, series, rate)"
+        )
+        self._columns = self._table_columns()
+
+    def _table_columns(self):
+        return [row[1] for row in self.db.execute("PRAGMA table_info(runs)")]
+
+    def columns(self):
+        """Names of the columns of the runs table."""
+        return list(self._columns)
+
+    def add(self, params, values):
+        """Insert one run; ``values`` are the stat_values() of its stats.
+
+        Returns the id of the new row. Call commit() when done adding.
+        """
+        row = {n: params.get(n) for n, _ in PARAMS}
+        if row["created"] is None:
+            row["created"] = time.time()
+        components = []
+        for name, value in values.items():
+            stat = name.split("::")[0]
+            if "." in stat or stat in COMPONENT_VECTORS:
+                components.append((name, value))
+                continue
+            if name not in self._columns:
+                self.db.execute(f"ALTER TABLE runs ADD COLUMN {_quote(name)}")
+                self._columns.append(name)
+            row[name] = value
+        names = list(row)
+        cursor = self.db.execute(
+            f"INSERT INTO runs ({', '.join(map(_quote, names))}) "
+            f"VALUES ({', '.join('?' * len(names))})",
+            [row[n] for n in names],
+        )
+        run = cursor.lastrowid
+        self.db.executemany(
+            "INSERT INTO component_stats VALUES (?, ?, ?)",
+            [(run, name, value) for name, value in components],
+        )
+        return run
+
+    def commit(self):
+        self.db.commit()
+
+    def delete(self, name):
+        """Remove every run of the output ``name``."""
+        self.db.execute(
+            "DELETE FROM component_stats WHERE run IN "
+            "(SELECT id FROM runs WHERE name = ?)",
+            (name,),
+        )
+        self.db.execute("DELETE FROM runs WHERE name = ?", (name,))
+
+    def query(self, name, columns=None):
+        """(column names, rows) of the runs of output ``name``.
+
+        Missing ``columns`` come back as NULL.
+        """
+        columns = columns or self._columns
+        select = ", ".join(
+            _quote(c) if c in self._columns else f"NULL AS {_quote(c)}"
+            for c in columns
+        )
+        rows = self.db.execute(
+            f"SELECT {select} FROM runs WHERE name = ? ORDER BY id", (name,)
+        ).fetchall()
+        return list(columns), rows
+
+    def names(self):
+        """(name, number of runs) of every output in the store."""
+        return self.db.execute(
+            "SELECT name, COUNT(*) FROM runs GROUP BY name ORDER BY name"
+        ).fetchall()
+
+    def close(self):
+        self.db.close()
+
+
+def _field(value):
+    if value == "None":
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return _number(value) if _number(value) is not None else value
+
+
+def parse_text(path):
+    """Runs of the text records that the sweeps append to output/*.txt."""
+    runs = []
+    run = None
+    with open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("Running experiment"):
+                run = {}
+                header = line.split(": ", 1)[1]
+                for part in header.split(", "):
+                    key, _, value = part.partition(" = ")
+                    if key in _TEXT_FIELDS:
+                        run[_TEXT_FIELDS[key]] = _field(value)
+            elif line.startswith("---"):
+                if run is not None:
+                    runs.append(run)
+                run = None
+            elif run is not None and " = " in line:
+                key, value = line.split(" = ", 1)
+                value = _number(value.split("(")[0])
+                if value is not None:
+                    run[_TEXT_STATS.get(key, key)] = value
+    return runs
+
+
+def runs_frame(name, columns, path=DEFAULT_PATH):
+    """DataFrame of the runs of output ``name`` with the given columns.
+
+    Reads the result store, or output/<name>.txt if the store holds no
+    run of ``name``.
+    """
+    import pandas as pd
+
+    if os.path.exists(path):
+        store = ResultStore(path)
+        names, rows = store.query(name, columns)
+        store.close()
+        if rows:
+            return pd.DataFrame(rows, columns=names)
+    runs = parse_text(f"output/{name}.txt")
+    return pd.DataFrame(
+        [[run.get(c) for c in columns] for run in runs], columns=columns
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the result store")
+    parser.add_argument("--db", default=DEFAULT_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="Number of runs of every output")
+    text = sub.add_parser(
+        "import", help="Add the runs of text records to the store"
+    )
+    text.add_argument("files", nargs="+")
+    trace = sub.add_parser(
+        "trace", help="Packet latency of every window of a stats.txt"
+    )
+    trace.add_argument("stats")
+    args = parser.parse_args()
+
+    if args.command == "trace":
+        rows = window_trace(read_dumps(args.stats))
+        print(
+            f"{'window':>6} {'final tick':>14} {'packets':>10} "
+            f"{'latency':>9}"
+        )
+        for i, (tick, received, latency) in enumerate(rows):
+            window = str(i) if i < len(rows) - 1 else "all"
+            latency = f"{latency:9.2f}" if latency is not None else " " * 9
+            print(f"{window:>6} {tick:>14.0f} {received:>10.0f} {latency}")
+        return
+
+    store = ResultStore(args.db)
+    if args.command == "list":
+        for name, count in store.names():
+            print(f"{name:<28} {count:>7}")
+    else:
+        for path in args.files:
+            name = os.path.splitext(os.path.basename(path))[0]
+            store.delete(name)
+            runs = parse_text(path)
+            for run in runs:
+                params = {k: v for k, v in run.items() if k in dict(PARAMS)}
+                stats = {k: v for k, v in run.items() if k not in params}
+                store.add(dict(params, name=name), stats)
+            store.commit()
+            print(f"{name}: imported {len(runs)} runs")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
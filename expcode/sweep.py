@@ -0,0 +1,816 @@
+"""Parallel driver for the simulation sweeps of the report.
+
+Every sweep expands the parameter grid of one experiment (injection rates,
+synthetic patterns, traffic matrices and the per-experiment topology,
+routing, VC and sensor arrays) into gem5 runs. The runs are spread over a
+pool of ``--jobs`` concurrent gem5 processes, each writing to its own
+``--outdir`` below ``--workdir``.
+
+A series (one experiment with one pattern or matrix) sweeps its injection
+rates in increasing order and stops at the first rate whose
+average_packet_latency exceeds 1000 cycles. Points of a saturated series
+at higher rates are not started, and those already running are killed.
+With ``--search`` a series does not walk every rate below saturation:
+the first saturated rate is searched on the rate grid (see search_rates())
+and only the few rates right below it are simulated densely, which needs
+far fewer runs per curve when lambda_c is not one of the lowest rates.
+
+Finished points are appended to ``<workdir>/<sweep>/progress.jsonl``, so an
+interrupted sweep resumes where it stopped when it is started again. Once
+every point of a sweep is done its records are appended to its
+``output/*.txt`` file in the order and format that plot.py, plot_real.py,
+plot_bound.py and plot_expected_hopcount.py parse, and its runs are added
+to the result store of results.py. Run from the root of the repository:
+
+    python expcode/sweep.py mesh_synth cube_synth --jobs 32
+    python expcode/sweep.py all
+"""
+
+import argparse
+import bisect
+import json
+import os
+import subprocess
+import sys
+import threading
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from results import DEFAULT_PATH, ResultStore, read_stats, stat_values
+
+GEM5 = "./build/NULL/gem5.opt"
+CONFIG = "configs/example/garnet_synth_traffic.py"
+
+# seq 0.01 0.03 1
+RATES = [f"{0.01 + 0.03 * i:.2f}" for i in range(34)]
+SATURATION_LATENCY = 1000
+SEPARATOR = "--------------------------------"
+
+STATS = [
+    ("packets_injected", "packets_injected::total"),
+    ("packets_received", "packets_received::total"),
+    ("average_packet_queueing_latency", "average_packet_queueing_latency"),
+    ("average_packet_network_latency", "average_packet_network_latency"),
+    ("average_packet_latency", "average_packet_latency"),
+    ("average_hops", "average_hops"),
+]
+
+MESH_16 = [
+    "--network=garnet",
+    "--num-cpus=16",
+    "--num-dirs=16",
+    "--mesh-rows=4",
+    "--inj-vnet=0",
+]
+MESH_64 = [
+    "--network=garnet",
+    "--num-cpus=64",
+    "--num-dirs=64",
+    "--mesh-rows=8",
+    "--inj-vnet=0",
+]
+CUBE_64 = [
+    "--network=garnet",
+    "--num-cpus=64",
+    "--num-dirs=64",
+    "--mesh-rows=4",
+    "--inj-vnet=0",
+]
+CACHE = ["--topology-cache=.topology_cache"]
+SIM_CYCLES = ["--sim-cycles=200000"]
+HOTSPOTS = ["--hotspots", "5", "11", "12", "--hotspot-factor=100"]
+
+
+def _matrices(*names):
+    return [f"real_traffic/mesh_4x4/{n}_mesh_4x4_traffic.txt" for n in names]
+
+
+def _experiments(**columns):
+    """Zip the per-experiment arrays of a sweep into one dict each."""
+    names = list(columns)
+    return [
+        dict(zip(names, row), experiment=e)
+        for e, row in enumerate(zip(*columns.values()))
+    ]
+
+
+MESH_TM = _experiments(
+    topology=["Mesh_XY"] * 3 + ["Mesh_longrange"] * 2,
+    routing=[1, 4, 4, 5, 5],
+    adaptive=[0, 1, 1, 1, 1],
+    wormhole=[1, 1, 1, 1, 1],
+    vcs=[1, 1, 1, 1, 1],
+    buffer=[2, 2, 2, 2, 2],
+    sensor=[0, 0, 1, 0, 1],
+)
+MESH_EVC = _experiments(
+    topology=["Mesh_XY"] + ["Mesh_longrange"] * 4,
+    routing=[1, 8, 8, 5, 5],
+    escape_routing=[-1, 1, 1, -1, -1],
+    adaptive=[0, 1, 1, 1, 1],
+    wormhole=[1, 1, 1, 1, 1],
+    vcs=[2, 2, 2, 2, 2],
+    buffer=[1, 1, 1, 1, 1],
+    sensor=[0, 0, 1, 0, 1],
+)
+CUBE_HIRY = _experiments(
+    topology=["Cube_XYZ"] + ["Cube_longrange"] * 4,
+    routing=[6, 7, 7, 7, 7],
+    budget=[None, 0, 0, 24, 24],
+    adaptive=[0, 1, 1, 1, 1],
+    wormhole=[1, 1, 1, 1, 1],
+    vcs=[2, 2, 2, 2, 2],
+    buffer=[1, 1, 1, 1, 1],
+    sensor=[0, 0, 1, 0, 1],
+)
+CUBE_EVC = _experiments(
+    topology=["Cube_XYZ"] + ["Cube_longrange"] * 4,
+    routing=[6, 8, 8, 7, 7],
+    escape_routing=[-1, 6, 6, -1, -1],
+    budget=[None, 24, 24, 24, 24],
+    adaptive=[0, 1, 1, 1, 1],
+    wormhole=[1, 1, 1, 1, 1],
+    vcs=[2, 2, 2, 2, 2],
+    buffer=[1, 1, 1, 1, 1],
+    sensor=[0, 0, 1, 0, 1],
+)
+
+
+def _experiment_args(e):
+    args = [
+        f"--topology={e['topology']}",
+        f"--routing-algorithm={e['routing']}",
+        f"--vcs-per-vnet={e['vcs']}",
+        f"--buffers-per-ctrl-vc={e['buffer']}",
+        f"--congestion-sensor={e['sensor']}",
+    ]
+    if "escape_routing" in e:
+        args.append(f"--escape-routing={e['escape_routing']}")
+    if e["wormhole"]:
+        args.append("--wormhole")
+    if e["adaptive"]:
+        args.append("--adaptive-routing")
+    if e["routing"] == 7:
+        args += ["--hiry", "--compete-algorithm=1"]
+    if e.get("budget") is not None:
+        args.append(f"--budget={e['budget']}")
+    return args
+
+
+_HEADER = (
+    "injection rate = {rate}, synthetic type = {synthetic}, "
+    "topology = {topology}, routing algorithm = {routing}, "
+    "adaptive = {adaptive}, wormhole = {wormhole}, vcs per vnet = {vcs}, "
+    "buffer per ctrl vc = {buffer}, "
+)
+
+
+class Sweep(object):
+    """The grid of one experiment and the file its records go to.
+
+    ``series`` is a list of (fields, args) pairs in the order the records
+    are written; ``fields`` fill the ``header`` template of each record and
+    ``args`` are the options of garnet_synth_traffic.py besides the
+    injection rate. Without a header the record of a point is the standard
+    output of gem5 instead of its statistics.
+    """
+
+    def __init__(
+        self,
+        stats_file,
+        series,
+        header=None,
+        rates=RATES,
+        saturate=True,
+        extra_stats=(),
+    ):
+        self.stats_file = stats_file
+        self.series = series
+        self.header = header
+        self.rates = rates
+        self.saturate = saturate
+        self.extra_stats = extra_stats
+
+
+def _synth_sweep(stats_file, base, experiments, header):
+    series = []
+    for e in experiments:
+        for synthetic in ["transpose", "uniform_random"]:
+            args = base + _experiment_args(e) + [f"--synthetic={synthetic}"]
+            args += SIM_CYCLES
+            series.append((dict(e, synthetic=synthetic), args))
+    return Sweep(stats_file, series, _HEADER + header)
+
+
+def _hotspot_sweep(stats_file, experiments, header):
+    series = []
+    for e in experiments:
+        args = MESH_16 + _experiment_args(e) + ["--synthetic=hotspot"]
+        args += HOTSPOTS + ["--best-effort", "--budget=12"] + SIM_CYCLES
+        args += CACHE
+        series.append((dict(e, synthetic="hotspot"), args))
+    return Sweep(stats_file, series, _HEADER + header)
+
+
+def _real_sweep(stats_file, matrices, experiments, header):
+    series = []
+    for matrix in matrices:
+        for e in experiments:
+            args = MESH_16 + _experiment_args(e)
+            args += ["--synthetic=real_traffic", f"--traffic-matrix={matrix}"]
+            args += ["--best-effort", "--budget=12"] + SIM_CYCLES + CACHE
+            fields = dict(e, synthetic="real_traffic", matrix=matrix)
+            series.append((fields, args))
+    return Sweep(stats_file, series, _HEADER + header)
+
+
+def _bound_sweep(stats_file, base):
+    args = base + ["--synthetic=uniform_random"] + SIM_CYCLES
+    return Sweep(
+        stats_file,
+        [({}, args)],
+        "injection rate = {rate}",
+        saturate=False,
+        extra_stats=["packets_in_network_per_cpu"],
+    )
+
+
+def _hopcount_sweep(stats_file, base, synthetics, budget, matrices=()):
+    base = base + ["--routing-algorithm=1", f"--budget={budget}"] + HOTSPOTS
+    series = []
+    for synthetic in synthetics:
+        extra = [[]]
+        if synthetic == "real_traffic":
+            extra = [[f"--traffic-matrix={m}"] for m in matrices]
+        for matrix_args in extra:
+            for experiment in [1, 2]:
+                args = base + [f"--synthetic={synthetic}"]
+                if experiment == 2:
+                    args.append("--best-effort")
+                series.append(({}, args + matrix_args))
+    return Sweep(stats_file, series, rates=["0.00"], saturate=False)
+
+
+_LONGRANGE_16 = MESH_16 + ["--topology=Mesh_longrange"]
+_LONGRANGE_64 = CUBE_64 + ["--topology=Cube_longrange"]
+
+SWEEPS = {
+    "bound_mesh": _bound_sweep(
+        "output/bound_mesh.txt",
+        MESH_64 + ["--topology=Mesh_XY", "--routing-algorithm=1"],
+    ),
+    "bound_cube": _bound_sweep(
+        "output/bound_cube.txt",
+        CUBE_64 + ["--topology=Cube_XYZ", "--routing-algorithm=6"],
+    ),
+    "mesh_expected_hopcount": _hopcount_sweep(
+        "output/mesh_expected_hopcount.txt",
+        _LONGRANGE_16 + ["--sim-cycles=20"] + CACHE,
+        ["uniform_random", "transpose", "hotspot", "real_traffic"],
+        12,
+        _matrices(
+            "Fpppp",
+            "H264-720p_dec",
+            "H264-1080p_dec",
+            "Robot",
+            "RS-32_28_8_dec",
+            "RS-32_28_8_enc",
+            "Sparse",
+        ),
+    ),
+    "cube_expected_hopcount": _hopcount_sweep(
+        "output/cube_expected_hopcount.txt",
+        _LONGRANGE_64 + ["--sim-cycles=20"] + CACHE,
+        ["uniform_random", "transpose"],
+        24,
+    ),
+    "mesh_synth": _synth_sweep(
+        "output/mesh_synth_16.txt",
+        MESH_16 + ["--best-effort", "--budget=12"] + CACHE,
+        MESH_TM,
+        "sensor = {sensor}, experiment = {experiment}",
+    ),
+    "mesh_hotspot": _hotspot_sweep(
+        "output/mesh_hotspot_16.txt",
+        MESH_TM,
+        "matrix = None, sensor = {sensor}, experiment = {experiment}",
+    ),
+    "mesh_real": _real_sweep(
+        "output/mesh_real_16.txt",
+        _matrices(
+            "Sparse",
+            "Fpppp",
+            "RS-32_28_8_enc",
+            "H264-720p_dec",
+            "H264-1080p_dec",
+            "Robot",
+            "RS-32_28_8_dec",
+        ),
+        MESH_TM,
+        "matrix = {matrix}, sensor = {sensor}, experiment = {experiment}",
+    ),
+    "cube_synth": _synth_sweep(
+        "output/cube_synth_64.txt",
+        CUBE_64 + ["--best-effort"] + CACHE,
+        CUBE_HIRY,
+        "sensor = {sensor}, experiment = {experiment}",
+    ),
+    "mesh_synth_evc": _synth_sweep(
+        "output/mesh_synth_evc_16.txt",
+        MESH_16 + ["--best-effort", "--budget=12"] + CACHE,
+        MESH_EVC,
+        "sensor = {sensor}, escape-routing = {escape_routing}, "
+        "experiment = {experiment}",
+    ),
+    "mesh_hotspot_evc": _hotspot_sweep(
+        "output/mesh_hotspot_evc_16.txt",
+        MESH_EVC,
+        "escape-routing = {escape_routing}, matrix = None, "
+        "sensor = {sensor}, experiment = {experiment}",
+    ),
+    "mesh_real_evc": _real_sweep(
+        "output/mesh_real_evc_16.txt",
+        _matrices(
+            "Robot",
+            "RS-32_28_8_dec",
+            "Sparse",
+            "Fpppp",
+            "RS-32_28_8_enc",
+            "H264-720p_dec",
+            "H264-1080p_dec",
+        ),
+        MESH_EVC,
+        "sensor = {sensor}, escape-routing = {escape_routing}, "
+        "maxtrix = {matrix}, experiment = {experiment}",
+    ),
+    "cube_synth_evc": _synth_sweep(
+        "output/cube_synth_evc_64.txt",
+        CUBE_64 + ["--best-effort"] + CACHE,
+        CUBE_EVC,
+        "sensor = {sensor}, escape-routing = {escape_routing}, "
+        "experiment = {experiment}",
+    ),
+}
+
+Point = namedtuple("Point", "sweep series rate_index rate key")
+
+
+def _awk_number(value):
+    if value == int(value) and abs(value) < 2**53:
+        return str(int(value))
+    return f"{value:.6g}"
+
+
+def reception_rate(stats):
+    """Packets received per router and cycle."""
+    clk_period = float(stats["system.clk_domain.clock"].split()[0])
+    sim_ticks = float(stats["simTicks"].split()[0])
+    received = stats["system.ruby.network.received_packets_per_cpu"]
+    return float(received.split()[0]) / sim_ticks * clk_period
+
+
+# Options of garnet_synth_traffic.py recorded with every run
+_OPTION_PARAMS = {
+    "--synthetic": "synthetic",
+    "--topology": "topology",
+    "--routing-algorithm": "routing",
+    "--vcs-per-vnet": "vcs",
+    "--buffers-per-ctrl-vc": "buffer",
+    "--congestion-sensor": "sensor",
+    "--escape-routing": "escape_routing",
+    "--traffic-matrix": "matrix",
+    "--budget": "budget",
+}
+
+
+def run_params(args):
+    """Result store parameters of a run from its command line options."""
+    params = {"adaptive": 0, "wormhole": 0}
+    for arg in args:
+        option, _, value = arg.partition("=")
+        if option in _OPTION_PARAMS:
+            params[_OPTION_PARAMS[option]] = value
+        elif option == "--adaptive-routing":
+            params["adaptive"] = 1
+        elif option == "--wormhole":
+            params["wormhole"] = 1
+    return params
+
+
+def format_record(sweep, fields, stats):
+    """The record of one run, as written by the former bash sweeps.
+
+    Returns (text, average_packet_latency).
+    """
+    lines = [
+        "Running experiment with the following parameters: "
+        + sweep.header.format(**fields)
+    ]
+    net = "system.ruby.network."
+    for name, stat in STATS:
+        lines.append(f"{name} = {stats[net + stat]}")
+    lines.append(f"reception_rate = {_awk_number(reception_rate(stats))}")
+    for stat in sweep.extra_stats:
+        lines.append(f"{stat} = {stats[net + stat].split()[0]}")
+    lines.append(SEPARATOR)
+    latency = float(stats[net + "average_packet_latency"].split()[0])
+    return "\n".join(lines) + "\n", latency
+
+
+def search_rates(latencies, rates, knee=3):
+    """Rate indices to simulate next when searching the saturation rate.
+
+    ``latencies`` maps the indices of the already simulated ``rates`` to
+    their average packet latency. The first saturated rate is bracketed by
+    a secant step on 1 / latency, which is roughly linear in the injection
+    rate below saturation and crosses 1 / SATURATION_LATENCY close to
+    lambda_c. The step is capped at the bisection midpoint of the bracket,
+    so overshooting estimates on the flat part of the curve still halve it.
+    Once the bracket is closed the ``knee`` rates below the saturated one
+    are filled in.
+
+    Returns (indices, first saturated index); the indices are empty once
+    the search is over and the saturated index is len(rates) while none
+    is known.
+    """
+    num_rates = len(rates)
+    saturated = [r for r, l in latencies.items() if l > SATURATION_LATENCY]
+    hi = min(saturated) if saturated else num_rates
+    below = sorted(r for r in latencies if r < hi)
+    if hi == 0:
+        return [], hi
+    if not below:
+        return sorted({0, num_rates // 2} - set(latencies)), hi
+    lo = below[-1]
+    if hi - lo > 1:
+        mid = (lo + hi) // 2
+        if len(below) < 2:
+            return [mid], hi
+        x1, x2 = (float(rates[r]) for r in below[-2:])
+        y1, y2 = (1 / latencies[r] for r in below[-2:])
+        if y2 >= y1:
+            return [mid], hi
+        estimate = x2 + (1 / SATURATION_LATENCY - y2) * (x2 - x1) / (y2 - y1)
+        step = bisect.bisect_left([float(rate) for rate in rates], estimate)
+        return [max(lo + 1, min(step, mid))], hi
+    return [r for r in range(max(0, hi - knee), hi) if r not in latencies], hi
+
+
+class SweepRunner(object):
+    """Runs the points of several sweeps on a pool of gem5 processes."""
+
+    def __init__(
+        self,
+        names,
+        workdir,
+        gem5=GEM5,
+        jobs=1,
+        search=False,
+        knee=3,
+        results=DEFAULT_PATH,
+        extra_args=(),
+    ):
+        self.names = names
+        self.workdir = os.path.abspath(workdir)
+        self.gem5 = gem5
+        self.jobs = jobs
+        self.search = search
+        self.knee = knee
+        self.results = results
+        self.extra_args = list(extra_args)
+        self.done = {name: {} for name in names}
+        self.written = set()
+        self.failed = []
+        self._lock = threading.Lock()
+        self._procs = {}
+        self._killed = set()
+
+    def _progress_path(self, name):
+        return os.path.join(self.workdir, name, "progress.jsonl")
+
+    def outdir(self, point):
+        return os.path.join(self.workdir, point.sweep, point.key)
+
+    def command(self, point):
+        sweep = SWEEPS[point.sweep]
+        _, args = sweep.series[point.series]
+        return (
+            [self.gem5, f"--outdir={self.outdir(point)}", CONFIG]
+            + args
+            + [f"--injectionrate={point.rate}"]
+            + self.extra_args
+        )
+
+    def _point(self, name, series, rate_index):
+        rate = SWEEPS[name].rates[rate_index]
+        return Point(name, series, rate_index, rate, f"{series:03d}_{rate}")
+
+    def points(self, name):
+        sweep = SWEEPS[name]
+        return [
+            self._point(name, s, r)
+            for s in range(len(sweep.series))
+            for r in range(len(sweep.rates))
+        ]
+
+    def load(self, fresh=False):
+        """Read the progress of previous runs of the sweeps."""
+        for name in self.names:
+            path = self._progress_path(name)
+            if fresh and os.path.exists(path):
+                os.remove(path)
+            if not os.path.exists(path):
+                continue
+            with open(path, "r") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Torn last line of an interrupted sweep
+                        continue
+                    if entry.get("written"):
+                        self.written.add(name)
+                    else:
+                        self.done[name][entry["key"]] = entry
+
+    def _checkpoint(self, name, entry):
+        path = self._progress_path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+
+    def latencies(self, name, series):
+        """Average packet latency of the simulated rates of a series."""
+        sweep = SWEEPS[name]
+        latencies = {}
+        for r, rate in enumerate(sweep.rates):
+            entry = self.done[name].get(f"{series:03d}_{rate}")
+            if entry is not None and "latency" in entry:
+                latencies[r] = entry["latency"]
+        return latencies
+
+    def plan(self, name, series):
+        """Rate indices a series still needs, and its first saturated one.
+
+        The second value is len(rates) while no rate is known to saturate.
+        """
+        sweep = SWEEPS[name]
+        num_rates = len(sweep.rates)
+        if not sweep.saturate:
+            todo = [
+                r
+                for r, rate in enumerate(sweep.rates)
+                if f"{series:03d}_{rate}" not in self.done[name]
+            ]
+            return todo, num_rates
+        latencies = self.latencies(name, series)
+        if self.search:
+            return search_rates(latencies, sweep.rates, self.knee)
+        saturated = [r for r, l in latencies.items() if l > SATURATION_LATENCY]
+        first = min(saturated) if saturated else num_rates
+        return [r for r in range(first) if r not in latencies], first
+
+    def run_point(self, point):
+        """Run gem5 for one point; returns its progress entry or None."""
+        sweep = SWEEPS[point.sweep]
+        outdir = self.outdir(point)
+        os.makedirs(outdir, exist_ok=True)
+        stdout_path = os.path.join(outdir, "stdout.txt")
+        with open(stdout_path, "w") as out, open(
+            os.path.join(outdir, "stderr.txt"), "w"
+        ) as err:
+            with self._lock:
+                if point in self._killed:
+                    return None
+                proc = subprocess.Popen(
+                    self.command(point), stdout=out, stderr=err
+                )
+                self._procs[point] = proc
+            code = proc.wait()
+        with self._lock:
+            del self._procs[point]
+            if point in self._killed:
+                return None
+        if code != 0:
+            raise RuntimeError(f"gem5 exited with status {code}")
+        if sweep.header is None:
+            with open(stdout_path, "r") as f:
+                return {"key": point.key, "record": f.read()}
+        fields, _ = sweep.series[point.series]
+        record, latency = format_record(
+            sweep,
+            dict(fields, rate=point.rate),
+            read_stats(os.path.join(outdir, "stats.txt")),
+        )
+        return {"key": point.key, "record": record, "latency": latency}
+
+    def _kill_beyond(self, name, series, rate_index):
+        with self._lock:
+            for point, proc in self._procs.items():
+                if (
+                    point.sweep == name
+                    and point.series == series
+                    and point.rate_index > rate_index
+                ):
+                    self._killed.add(point)
+                    proc.terminate()
+
+    def run(self):
+        running = {}
+        finished = 0
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            while True:
+                # Lowest rates first across all series, so that saturation
+                # is detected before the higher rates of a series start.
+                queued = []
+                for name in self.names:
+                    if name in self.written:
+                        continue
+                    for s in range(len(SWEEPS[name].series)):
+                        for r in self.plan(name, s)[0]:
+                            point = self._point(name, s, r)
+                            if (
+                                point not in running.values()
+                                and point not in self.failed
+                            ):
+                                queued.append(point)
+                queued.sort(key=lambda p: (p.rate_index, p.sweep, p.series))
+                for point in queued[: self.jobs - len(running)]:
+                    running[pool.submit(self.run_point, point)] = point
+                if not running:
+                    break
+                ready, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in ready:
+                    point = running.pop(future)
+                    try:
+                        entry = future.result()
+                    except (OSError, RuntimeError, KeyError, ValueError) as e:
+                        print(f"{point.sweep} {point.key} failed: {e!r}")
+                        self.failed.append(point)
+                        continue
+                    if entry is None:
+                        continue
+                    finished += 1
+                    self.done[point.sweep][point.key] = entry
+                    self._checkpoint(point.sweep, entry)
+                    print(
+                        f"{point.sweep} {point.key} done "
+                        f"({finished} finished, {len(running)} running)"
+                    )
+                    _, saturated = self.plan(point.sweep, point.series)
+                    self._kill_beyond(point.sweep, point.series, saturated)
+
+    def points_done(self, name):
+        """Points of a sweep in the serial sweep order that make up its
+        curves, or None if some point is still missing."""
+        sweep = SWEEPS[name]
+        points = []
+        for s in range(len(sweep.series)):
+            todo, saturated = self.plan(name, s)
+            if todo:
+                return None
+            for r in range(min(saturated + 1, len(sweep.rates))):
+                point = self._point(name, s, r)
+                if point.key in self.done[name]:
+                    points.append(point)
+        return points
+
+    def store(self, store, point):
+        """Add the run of a point to the result store."""
+        sweep = SWEEPS[point.sweep]
+        fields, args = sweep.series[point.series]
+        path = os.path.join(self.outdir(point), "stats.txt")
+        if not os.path.exists(path):
+            print(f"{point.sweep} {point.key}: no {path}, not stored")
+            return
+        stats = read_stats(path)
+        params = run_params(args)
+        params.update(
+            name=os.path.splitext(os.path.basename(sweep.stats_file))[0],
+            sweep=point.sweep,
+            series=point.series,
+            rate=float(point.rate),
+            experiment=fields.get("experiment"),
+            command=" ".join(self.command(point)),
+            outdir=self.outdir(point),
+            reception_rate=reception_rate(stats),
+        )
+        store.add(params, stat_values(stats))
+
+    def write(self):
+        """Append the records of every completed sweep to its output."""
+        for name in self.names:
+            if name in self.written:
+                print(f"{name}: already written, use --fresh to rerun")
+                continue
+            points = self.points_done(name)
+            if points is None:
+                print(f"{name}: incomplete, rerun to resume")
+                continue
+            stats_file = SWEEPS[name].stats_file
+            with open(stats_file, "a") as f:
+                for point in points:
+                    f.write(self.done[name][point.key]["record"])
+            if self.results:
+                store = ResultStore(self.results)
+                for point in points:
+                    self.store(store, point)
+                store.commit()
+                store.close()
+            self._checkpoint(name, {"written": stats_file})
+            self.written.add(name)
+            print(f"{name}: {len(points)} records appended to {stats_file}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run the experiment sweeps on a pool of gem5 processes"
+    )
+    parser.add_argument(
+        "sweeps", nargs="+", choices=["all"] + list(SWEEPS), metavar="SWEEP"
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count(),
+        help="Number of concurrent gem5 processes",
+    )
+    parser.add_argument("--gem5", default=GEM5, help="gem5 binary")
+    parser.add_argument(
+        "--workdir",
+        default="sweeps",
+        help="Directory for the per-point outdirs and the progress files",
+    )
+    parser.add_argument(
+        "--fresh",
+        action="store_true",
+        help="Forget the progress of previous runs of the sweeps",
+    )
+    parser.add_argument(
+        "--results",
+        default=DEFAULT_PATH,
+        help="Result store the runs are added to, empty to disable",
+    )
+    parser.add_argument(
+        "--search",
+        action="store_true",
+        help="Search the saturation rate of every series instead of "
+        "walking all rates up to it",
+    )
+    parser.add_argument(
+        "--knee",
+        type=int,
+        default=3,
+        help="Rates below the saturation rate sampled by --search",
+    )
+    parser.add_argument(
+        "--steady-state",
+        action="store_true",
+        help="Stop every run once its latency has converged or the network "
+        "has saturated, --sim-cycles becomes the upper bound",
+    )
+    parser.add_argument(
+        "--topology-seed",
+        type=int,
+        default=None,
+        help="Seed of the random long-range links, so that every point of "
+        "a sweep runs on the same topology",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Print the gem5 command lines instead of running them",
+    )
+    args = parser.parse_args()
+
+    names = list(SWEEPS) if "all" in args.sweeps else args.sweeps
+    runner = SweepRunner(
+        names,
+        args.workdir,
+        args.gem5,
+        args.jobs,
+        args.search,
+        args.knee,
+        args.results,
+        (["--steady-state"] if args.steady_state else [])
+        + (
+            [f"--topology-seed={args.topology_seed}"]
+            if args.topology_seed is not None
+            else []
+        ),
+    )
+    if args.dry_run:
+        for name in names:
+            for point in runner.points(name):
+                print(" ".join(runner.command(point)))
+        return
+    runner.load(args.fresh)
+    runner.run()
+    runner.write()
+    if runner.failed:
+        sys.exit(f"{len(runner.failed)} points failed, rerun to retry them")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 python expcode/plot_bound.py --name bound_cube
-python expcode/plot_bound.py --name bound_mesh
+python expcode/plot_bound.py --name bound_mesh --max-rate 0.72
 python expcode/plot_expected_hopcount.py --name mesh_expected_hopcount
 python expcode/plot_expected_hopcount.py --name cube_expected_hopcount
 python expcode/plot.py --name mesh_synth_16
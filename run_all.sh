@@ -1,12 +1,4 @@
-source expcode/bound_mesh.sh
-source expcode/bound_cube.sh
-source expcode/mesh_expected_hopcount.sh
-source expcode/cube_expected_hopcount.sh
-source expcode/mesh_synth.sh
-source expcode/mesh_hotspot.sh
-source expcode/mesh_real.sh
-source expcode/cube_synth.sh
-source expcode/mesh_synth_evc.sh
-source expcode/mesh_hotspot_evc.sh
-source expcode/mesh_real_evc.sh
-source expcode/cube_synth_evc.sh
\ No newline at end of file
+python expcode/sweep.py bound_mesh bound_cube \
+    mesh_expected_hopcount cube_expected_hopcount \
+    mesh_synth mesh_hotspot mesh_real cube_synth \
+    mesh_synth_evc mesh_hotspot_evc mesh_real_evc cube_synth_evc
@@ -28,9 +28,18 @@
 
 #include "cpu/testers/garnet_synthetic_traffic/GarnetSyntheticTraffic.hh"
 
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+
+#include <algorithm>
 #include <cmath>
+#include <cstring>
+#include <fstream>
 #include <iomanip>
 #include <set>
+#include <sstream>
 #include <string>
 #include <vector>
 
@@ -50,6 +59,32 @@ namespace gem5
 
 int TESTER_NETWORK=0;
 
+namespace
+{
+
+// Header of the binary traffic matrices of
+// configs/topologies/traffic_matrix.py, all fields little-endian.
+struct TrafficMatrixHeader
+{
+    char magic[8];
+    uint32_t version;
+    uint32_t layout;
+    char dtype[8];
+    uint32_t ndim;
+    uint32_t reserved;
+    uint64_t nnz;
+    uint32_t dims[6];
+};
+static_assert(sizeof(TrafficMatrixHeader) == 64,
+              "Traffic matrix header must be 64 bytes");
+
+const char trafficMatrixMagic[8] = {'G', 'A', 'R', 'N', 'E', 'T', 'T', 'M'};
+const uint32_t trafficMatrixVersion = 1;
+const uint32_t trafficMatrixMaxDims = 6;
+enum { TRAFFIC_MATRIX_DENSE = 0, TRAFFIC_MATRIX_CSR = 1 };
+
+} // anonymous namespace
+
 bool
 GarnetSyntheticTraffic::CpuPort::recvTimingResp(PacketPtr pkt)
 {
@@ -111,29 +146,138 @@ GarnetSyntheticTraffic::GarnetSyntheticTraffic(const Params &p)
     DPRINTF(GarnetSyntheticTraffic,"Config Created: Name = %s , and id = %d\n",
             name(), id);
     max_row_sum = 0;
+    row_sum = 0;
 
-    if (traffic == REAL_TRAFFIC_) {
-        std::ifstream file(traffic_matrix_file);
-        // assert that the file can be successfully opened
-        if (!file.is_open()) {
-            fatal("Unable to open traffic matrix file: %s\n",
-                  traffic_matrix_file);
-        }
-        std::string line;
-        while (std::getline(file, line)) {
-            std::vector< uint64_t > row;
-            std::istringstream iss(line);
-            int val, sum = 0;
-            while (iss >> val) {
-                row.push_back(val);
-                sum += val;
+    if (traffic == REAL_TRAFFIC_)
+        loadTrafficMatrix();
+}
+
+void
+GarnetSyntheticTraffic::loadTrafficMatrix()
+{
+    std::ifstream file(traffic_matrix_file, std::ios::binary);
+    // assert that the file can be successfully opened
+    if (!file.is_open()) {
+        fatal("Unable to open traffic matrix file: %s\n",
+              traffic_matrix_file);
+    }
+    char magic[sizeof(trafficMatrixMagic)];
+    file.read(magic, sizeof(magic));
+    if (file.gcount() == sizeof(magic) &&
+        memcmp(magic, trafficMatrixMagic, sizeof(magic)) == 0) {
+        file.close();
+        loadBinaryTrafficMatrix();
+        return;
+    }
+    file.clear();
+    file.seekg(0);
+
+    // Keep the running sums of the non-zero weights of our row so that
+    // generatePkt() can pick a destination by binary search. Only the
+    // sums of the other rows are needed.
+    std::string line;
+    for (int row = 0; std::getline(file, line); row++) {
+        std::istringstream iss(line);
+        uint64_t val, sum = 0;
+        for (unsigned col = 0; iss >> val; col++) {
+            sum += val;
+            if (row == id && val > 0) {
+                traffic_cdf.push_back(sum);
+                traffic_dest.push_back(col);
             }
-            traffic_matrix.push_back(row);
-            traffic_matrix_row_sum.push_back(sum);
-            max_row_sum = std::max(max_row_sum, (uint64_t) sum);
         }
-        file.close();
+        if (row == id)
+            row_sum = sum;
+        max_row_sum = std::max(max_row_sum, sum);
+    }
+    file.close();
+}
+
+void
+GarnetSyntheticTraffic::loadBinaryTrafficMatrix()
+{
+    const char *path = traffic_matrix_file.c_str();
+    int fd = open(path, O_RDONLY);
+    struct stat st;
+    if (fd < 0 || fstat(fd, &st) != 0)
+        fatal("Unable to open traffic matrix file: %s\n", path);
+    size_t size = st.st_size;
+    void *map = mmap(nullptr, size, PROT_READ, MAP_PRIVATE, fd, 0);
+    close(fd);
+    if (map == MAP_FAILED)
+        fatal("Unable to map traffic matrix file: %s\n", path);
+    const char *base = (const char *) map;
+
+    TrafficMatrixHeader header;
+    if (size < sizeof(header))
+        fatal("Truncated traffic matrix file: %s\n", path);
+    memcpy(&header, base, sizeof(header));
+    if (header.version != trafficMatrixVersion)
+        fatal("Traffic matrix %s has version %d, expected %d\n", path,
+              header.version, trafficMatrixVersion);
+    if (header.ndim > trafficMatrixMaxDims)
+        fatal("Traffic matrix %s has %d dims\n", path, header.ndim);
+    size_t width;
+    if (strncmp(header.dtype, "<u4", sizeof(header.dtype)) == 0)
+        width = 4;
+    else if (strncmp(header.dtype, "<u8", sizeof(header.dtype)) == 0)
+        width = 8;
+    else
+        fatal("Traffic matrix %s has unsupported weights %.8s\n", path,
+              header.dtype);
+
+    uint64_t num_rows = 1;
+    for (uint32_t i = 0; i < header.ndim; i++)
+        num_rows *= header.dims[i];
+    size_t offset = sizeof(header);
+    const char *row_sums = base + offset;
+    offset += 8 * num_rows;
+    const char *indptr = nullptr;
+    const char *indices = nullptr;
+    if (header.layout == TRAFFIC_MATRIX_CSR) {
+        indptr = base + offset;
+        offset += 8 * (num_rows + 1);
+        indices = base + offset;
+        offset += (4 * header.nnz + 7) / 8 * 8;
+    } else if (header.layout != TRAFFIC_MATRIX_DENSE) {
+        fatal("Traffic matrix %s has unknown layout %d\n", path,
+              header.layout);
+    }
+    const char *data = base + offset;
+    offset += width * (indptr ? header.nnz : num_rows * num_rows);
+    if (size < offset)
+        fatal("Truncated traffic matrix file: %s\n", path);
+
+    // Unaligned little-endian reads of the weights, row pointers, column
+    // indices and row sums.
+    auto load = [](const char *array, uint64_t i, size_t bytes) {
+        uint64_t value = 0;
+        memcpy(&value, array + i * bytes, bytes);
+        return value;
+    };
+
+    for (uint64_t row = 0; row < num_rows; row++)
+        max_row_sum = std::max(max_row_sum, load(row_sums, row, 8));
+    if ((uint64_t) id < num_rows) {
+        row_sum = load(row_sums, id, 8);
+        uint64_t begin = id * num_rows;
+        uint64_t end = begin + num_rows;
+        if (indptr) {
+            begin = load(indptr, id, 8);
+            end = load(indptr, id + 1, 8);
+        }
+        uint64_t sum = 0;
+        for (uint64_t k = begin; k < end; k++) {
+            uint64_t val = load(data, k, width);
+            if (val == 0)
+                continue;
+            sum += val;
+            traffic_cdf.push_back(sum);
+            traffic_dest.push_back(indptr ? load(indices, k, 4) :
+                                   k - begin);
+        }
     }
+    munmap(map, size);
 }
 
 Port &
@@ -197,7 +341,7 @@ GarnetSyntheticTraffic::tick()
 
         if (max_row_sum > 0) {
             senderEnable &= (random_mt.random<uint64_t>(0, max_row_sum - 1) <
-                            traffic_matrix_row_sum[id]);
+                            row_sum);
         }
         if (senderEnable)
             generatePkt();
@@ -291,15 +435,15 @@ GarnetSyntheticTraffic::generatePkt()
             destination = hotSpotDest[random_mt.random<unsigned>(0, hotSpotDest.size() - 1)];
         }
     } else if (traffic == REAL_TRAFFIC_) {
-        std::vector< uint64_t > row = traffic_matrix[source];
-        uint64_t row_sum = traffic_matrix_row_sum[source];
+        // The first destination whose running sum exceeds the draw, i.e.
+        // destination i with probability row[i] / row_sum.
         uint64_t rand_num = random_mt.random<uint64_t>(0, row_sum - 1);
-        for (unsigned i = 0; i < row.size(); i++) {
-            if (rand_num < row[i]) {
-                destination = i + src_x * radix;
-                break;
-            }
-            rand_num -= row[i];
+        // An all-zero matrix lets every sender inject. Like the linear
+        // walk, the draw is still made and the packet goes to the source.
+        if (row_sum > 0) {
+            destination = traffic_dest[
+                std::upper_bound(traffic_cdf.begin(), traffic_cdf.end(),
+                                 rand_num) - traffic_cdf.begin()];
         }
     }
     // else {
@@ -67,6 +67,9 @@ class GarnetSyntheticTraffic : public ClockedObject
     // main simulation loop (one cycle)
     void tick();
 
+    // Change the injection rate between two m5.simulate() calls
+    void setInjectionRate(double rate) { injRate = rate; }
+
     Port &getPort(const std::string &if_name,
                   PortID idx=InvalidPortID) override;
 
@@ -136,8 +139,11 @@ class GarnetSyntheticTraffic : public ClockedObject
     std::vector< int > hotSpotDest;
     int hotSpotFactor;
     std::string traffic_matrix_file;
-    std::vector< std::vector< uint64_t > > traffic_matrix;
-    std::vector< uint64_t > traffic_matrix_row_sum;
+    // Running sums of the non-zero real_traffic weights of our row and
+    // the destinations they belong to
+    std::vector< uint64_t > traffic_cdf;
+    std::vector< unsigned > traffic_dest;
+    uint64_t row_sum;
     uint64_t max_row_sum;
 
     const Cycles responseLimit;
@@ -149,6 +155,8 @@ class GarnetSyntheticTraffic : public ClockedObject
     void generatePkt();
     void sendPkt(PacketPtr pkt);
     void initTrafficType();
+    void loadTrafficMatrix();
+    void loadBinaryTrafficMatrix();
 
     void doRetry();
 
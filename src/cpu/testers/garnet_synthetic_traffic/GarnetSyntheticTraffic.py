@@ -27,6 +27,7 @@
 from m5.objects.ClockedObject import ClockedObject
 from m5.params import *
 from m5.proxy import *
+from m5.SimObject import *
 
 
 class GarnetSyntheticTraffic(ClockedObject):
@@ -36,6 +37,8 @@ class GarnetSyntheticTraffic(ClockedObject):
     )
     cxx_class = "gem5::GarnetSyntheticTraffic"
 
+    cxx_exports = [PyBindMethod("setInjectionRate")]
+
     block_offset = Param.Int(6, "block offset in bits")
     num_dest = Param.Int(1, "Number of Destinations")
     memory_size = Param.Int(65536, "memory size")
@@ -79,4 +82,6 @@ class GarnetSyntheticTraffic(ClockedObject):
     hotspots = VectorParam.Int([], "List of hotspots")
     hotspot_factor = Param.Int(10, "Hotspot factor")
 
-    traffic_matrix = Param.String("", "Traffic matrix file")
+    traffic_matrix = Param.String(
+        "", "Traffic matrix file, text or binary (memory-mapped)"
+    )
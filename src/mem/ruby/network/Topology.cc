@@ -29,7 +29,10 @@
 
 #include "mem/ruby/network/Topology.hh"
 
+#include <algorithm>
 #include <cassert>
+#include <functional>
+#include <queue>
 
 #include "base/trace.hh"
 #include "debug/RubyNetwork.hh"
@@ -375,97 +378,176 @@ Topology::makeLink(Network *net, SwitchID src, SwitchID dest,
     }
 }
 
-// DUDE, WTF r u doing?
-// while (true) ijk floyd...
-
-// The following all-pairs shortest path algorithm is based on the
-// discussion from Cormen et al., Chapter 26.1.
+// Distance labels (distance, switch) of the Dijkstra searches below,
+// smallest distance first.
+typedef std::pair<int, int> Label;
+typedef std::priority_queue<Label, std::vector<Label>,
+                            std::greater<Label>> LabelQueue;
+
+// All-pairs shortest paths with one Dijkstra search per source switch over
+// the links of each vnet, O(N E log N) instead of the O(N^3) min-plus
+// passes (Cormen et al., Chapter 25) repeated until nothing changed.
+// Weights of INFINITE_LATENCY are missing links and distances saturate at
+// INFINITE_LATENCY, so the distances are exactly the fixed point those
+// passes reached. Latencies and inter_switches of the pairs whose distance
+// improved over the direct link are summed along the path found.
 void
 Topology::extend_shortest_path(Matrix &current_dist, Matrix &latencies,
     Matrix &inter_switches)
 {
     int nodes = current_dist[0].size();
 
-    // We find the shortest path for each vnet for a given pair of
-    // source and destinations. This is done simply by traversing via
-    // all other nodes and finding the minimum distance.
+    struct Edge
+    {
+        int dest;
+        int weight;
+        int latency;
+    };
+
+    std::vector<int> dist(nodes);
+    std::vector<int> pred(nodes);
+    std::vector<int> pred_latency(nodes);
+    std::vector<int> order;
+    order.reserve(nodes);
+
     for (int v = 0; v < m_vnets; v++) {
-        // There is a different topology for each vnet. Here we try to
-        // build a topology by finding the minimum number of intermediate
-        // switches needed to reach the destination
-        bool change = true;
-        while (change) {
-            change = false;
-            for (int i = 0; i < nodes; i++) {
-                for (int j = 0; j < nodes; j++) {
-                    // We follow an iterative process to build the shortest
-                    // path tree:
-                    // 1. Start from the direct connection (if there is one,
-                    // otherwise assume a hypothetical infinite weight link).
-                    // 2. Then we iterate through all other nodes considering
-                    // new potential intermediate switches. If we find any
-                    // lesser weight combination, we set(update) that as the
-                    // new weight between the source and destination.
-                    // 3. Repeat for all pairs of nodes.
-                    // 4. Go to step 1 if there was any new update done in
-                    // Step 2.
-                    int minimum = current_dist[v][i][j];
-                    int previous_minimum = minimum;
-                    int intermediate_switch = -1;
-                    for (int k = 0; k < nodes; k++) {
-                        minimum = std::min(minimum,
-                            current_dist[v][i][k] + current_dist[v][k][j]);
-                        if (previous_minimum != minimum) {
-                            intermediate_switch = k;
-                            inter_switches[i][j][v] =
-                                inter_switches[i][k][v] +
-                                inter_switches[k][j][v] + 1;
-                        }
-                        previous_minimum = minimum;
-                    }
-                    if (current_dist[v][i][j] != minimum) {
-                        change = true;
-                        current_dist[v][i][j] = minimum;
-                        assert(intermediate_switch >= 0);
-                        assert(intermediate_switch < latencies[i].size());
-                        latencies[i][j][v] =
-                            latencies[i][intermediate_switch][v] +
-                            latencies[intermediate_switch][j][v];
+        // There is a different topology for each vnet. Collect its links
+        // (and their latencies before any update) once.
+        std::vector<std::vector<Edge>> links(nodes);
+        for (int i = 0; i < nodes; i++) {
+            for (int j = 0; j < nodes; j++) {
+                int weight = current_dist[v][i][j];
+                if (i != j && weight < INFINITE_LATENCY)
+                    links[i].push_back({j, weight, latencies[i][j][v]});
+            }
+        }
+
+        for (int src = 0; src < nodes; src++) {
+            std::fill(dist.begin(), dist.end(), INFINITE_LATENCY);
+            std::fill(pred.begin(), pred.end(), -1);
+            order.clear();
+            LabelQueue queue;
+            dist[src] = 0;
+            queue.push({0, src});
+            while (!queue.empty()) {
+                Label top = queue.top();
+                queue.pop();
+                int u = top.second;
+                if (top.first > dist[u])
+                    continue;
+                order.push_back(u);
+                for (const Edge &edge : links[u]) {
+                    int d = dist[u] + edge.weight;
+                    if (d < dist[edge.dest]) {
+                        dist[edge.dest] = d;
+                        pred[edge.dest] = u;
+                        pred_latency[edge.dest] = edge.latency;
+                        queue.push({d, edge.dest});
                     }
                 }
             }
+
+            // Switches are settled in order of distance, so the latency to
+            // the predecessor of a switch is final when it is reached.
+            for (int dst : order) {
+                if (dist[dst] >= current_dist[v][src][dst])
+                    continue;
+                int via = pred[dst];
+                current_dist[v][src][dst] = dist[dst];
+                latencies[src][dst][v] =
+                    latencies[src][via][v] + pred_latency[dst];
+                inter_switches[src][dst][v] =
+                    inter_switches[src][via][v] + 1;
+            }
         }
     }
 }
 
+// ordered_dist[v][w][i][k] is the number of hops from switch i to k when
+// the packet may only take VCs of weight w or more and never decreases the
+// weight of the VC it travels on. Links whose VC weight is
+// INFINITE_LATENCY only eject to their destination, in one hop.
+//
+// Weights are solved from the largest down. For a destination k, the
+// distances over VCs of a larger weight are already known, so those of
+// weight w are a single Dijkstra search over the reversed links with a VC
+// of exactly weight w, started from every switch at once. This gives the
+// same fixed point as relaxing all (i, j, k) triples until nothing changes,
+// at O(N E log N) per weight.
 void
 Topology::extend_ordered_shortest_path(std::vector <Matrix> &ordered_dist, const std::vector<Matrix> &per_vc_weight)
 {
     ordered_dist.resize(m_vnets);
     int nodes = per_vc_weight[0].size();
+
+    struct Edge
+    {
+        int src;
+        int weight;
+    };
+
+    std::vector<int> label(nodes);
     for (int v = 0; v < m_vnets; v++) {
+        // in_links[j] lists the source and VC weight of every VC of every
+        // link into switch j.
+        std::vector<std::vector<Edge>> in_links(nodes);
+        std::vector<std::pair<int, int>> ejections;
+        for (int i = 0; i < nodes; i++) {
+            for (int j = 0; j < nodes; j++) {
+                for (auto vc_w : per_vc_weight[v][i][j]) {
+                    if (vc_w == INFINITE_LATENCY)
+                        ejections.push_back({i, j});
+                    else
+                        in_links[j].push_back({i, vc_w});
+                }
+            }
+        }
+
         ordered_dist[v].resize(max_weight + 1);
         ordered_dist[v][max_weight] = std::vector<std::vector<int>>(nodes, std::vector<int>(nodes, INFINITE_LATENCY));
         for (int i = 0; i < nodes; i++)
             ordered_dist[v][max_weight][i][i] = 0;
         for (int w = max_weight; w >= 1; w--) {
+            std::vector<std::vector<int>> &dist = ordered_dist[v][w];
             if (w != max_weight)
-                ordered_dist[v][w] = ordered_dist[v][w + 1];
-            for (int t = 0; t < nodes - 1; t++) {
-                bool changed = false;
-                for (int k = 0; k < nodes; k++)
-                    for (int i = 0; i < nodes; i++)
-                        for (int j = 0; j < nodes; j++)
-                            for (auto vc_w : per_vc_weight[v][i][j])
-                                if (vc_w == INFINITE_LATENCY) {
-                                    if (k != j) continue;
-                                    ordered_dist[v][w][i][j] = 1;
-                                }
-                                else if (vc_w >= w) {
-                                    if (1 + ordered_dist[v][vc_w][j][k] < ordered_dist[v][w][i][k])
-                                        ordered_dist[v][w][i][k] = 1 + ordered_dist[v][vc_w][j][k], changed = true;
-                                }
-                if (!changed) break;
+                dist = ordered_dist[v][w + 1];
+            for (auto &ejection : ejections)
+                dist[ejection.first][ejection.second] = 1;
+
+            for (int k = 0; k < nodes; k++) {
+                LabelQueue queue;
+                for (int i = 0; i < nodes; i++)
+                    label[i] = dist[i][k];
+                // Hops that continue on a VC of a larger weight
+                for (int j = 0; j < nodes; j++) {
+                    for (const Edge &edge : in_links[j]) {
+                        if (edge.weight > w) {
+                            label[edge.src] = std::min(label[edge.src],
+                                1 + ordered_dist[v][edge.weight][j][k]);
+                        }
+                    }
+                }
+                for (int i = 0; i < nodes; i++) {
+                    if (label[i] < INFINITE_LATENCY)
+                        queue.push({label[i], i});
+                }
+                // Hops on a VC of weight w
+                while (!queue.empty()) {
+                    Label top = queue.top();
+                    queue.pop();
+                    int j = top.second;
+                    if (top.first > label[j])
+                        continue;
+                    for (const Edge &edge : in_links[j]) {
+                        if (edge.weight == w &&
+                            label[j] + 1 < label[edge.src]) {
+                            label[edge.src] = label[j] + 1;
+                            queue.push({label[edge.src], edge.src});
+                        }
+                    }
+                }
+                for (int i = 0; i < nodes; i++)
+                    dist[i][k] = label[i];
             }
         }
     }
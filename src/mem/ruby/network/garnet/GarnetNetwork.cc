@@ -112,6 +112,12 @@ GarnetNetwork::GarnetNetwork(const Params &p)
         router->init_net_ptr(this);
     }
 
+    // record the internal links in the order of the config, which indexes
+    // the per-link statistics
+    for (auto *link : p.int_links) {
+        m_int_links.push_back(safe_cast<GarnetIntLink*>(link));
+    }
+
     // record the network interfaces
     for (std::vector<ClockedObject*>::const_iterator i = p.netifs.begin();
          i != p.netifs.end(); ++i) {
@@ -568,6 +574,19 @@ GarnetNetwork::regStats()
             statistics::oneline)
         ;
 
+    // Per-link and per-router activity, indexed by the position of the
+    // link in int_links and by the router id
+    m_int_link_flits
+        .init(m_int_links.size())
+        .name(name() + ".int_link_flits")
+        .flags(statistics::oneline)
+        ;
+    m_router_vc_occupancy
+        .init(m_routers.size())
+        .name(name() + ".router_vc_occupancy")
+        .flags(statistics::oneline)
+        ;
+
     // Traffic distribution
     for (int source = 0; source < m_routers.size(); ++source) {
         m_data_traffic_distribution.push_back(
@@ -616,6 +635,22 @@ GarnetNetwork::collateStats()
         }
     }
 
+    for (int i = 0; i < m_int_links.size(); i++) {
+        m_int_link_flits[i] =
+            m_int_links[i]->m_network_link->getLinkUtilization();
+    }
+
+    // Fraction of the input VCs of each router holding a packet
+    double ticks = time_delta * clockPeriod();
+    for (int i = 0; i < m_routers.size(); i++) {
+        int num_vcs = m_routers[i]->get_num_inports() *
+            m_routers[i]->get_num_vcs();
+        if (num_vcs > 0 && ticks > 0) {
+            m_router_vc_occupancy[i] =
+                m_routers[i]->get_vc_active_ticks() / (num_vcs * ticks);
+        }
+    }
+
     // Ask the routers to collate their statistics
     for (int i = 0; i < m_routers.size(); i++) {
         m_routers[i]->collateStats();
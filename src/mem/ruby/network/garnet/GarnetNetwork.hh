@@ -57,6 +57,7 @@ class Router;
 class NetworkLink;
 class NetworkBridge;
 class CreditLink;
+class GarnetIntLink;
 
 class GarnetNetwork : public Network
 {
@@ -172,6 +173,16 @@ class GarnetNetwork : public Network
         m_total_hops += hops;
     }
 
+    // Totals over all vnets since the last stats reset, exported to Python
+    double getPacketsInjected() const { return m_packets_injected.total(); }
+    double getPacketsReceived() const { return m_packets_received.total(); }
+    double
+    getPacketLatency() const
+    {
+        return m_packet_network_latency.total() +
+            m_packet_queueing_latency.total();
+    }
+
     void update_traffic_distribution(RouteInfo route);
     int getNextPacketID() { return m_next_packet_id++; }
     bool getWormholeEnabled() { return m_enable_wormhole; }
@@ -228,6 +239,8 @@ class GarnetNetwork : public Network
     statistics::Scalar m_total_int_link_utilization;
     statistics::Scalar m_average_link_utilization;
     statistics::Vector m_average_vc_load;
+    statistics::Vector m_int_link_flits;
+    statistics::Vector m_router_vc_occupancy;
 
     statistics::Scalar  m_total_hops;
     statistics::Formula m_avg_hops;
@@ -242,6 +255,7 @@ class GarnetNetwork : public Network
     std::vector<VNET_type > m_vnet_type;
     std::vector<Router *> m_routers;   // All Routers in Network
     std::vector<NetworkLink *> m_networklinks; // All flit links in the network
+    std::vector<GarnetIntLink *> m_int_links; // Internal links, config order
     std::vector<NetworkBridge *> m_networkbridges; // All network bridges
     std::vector<CreditLink *> m_creditlinks; // All credit links in the network
     std::vector<NetworkInterface *> m_nis;   // All NI's in Network
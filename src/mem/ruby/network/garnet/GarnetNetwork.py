@@ -30,6 +30,7 @@
 
 from m5.params import *
 from m5.proxy import *
+from m5.SimObject import *
 from m5.objects.Network import RubyNetwork
 from m5.objects.BasicRouter import BasicRouter
 from m5.objects.ClockedObject import ClockedObject
@@ -59,6 +60,14 @@ class GarnetNetwork(RubyNetwork):
     congestion_sensor = Param.Int(4, "congestion sensor granularity")
     simTicks = Param.UInt64(0, "simulation ticks")
 
+    # Running totals of the packet statistics, sampled between
+    # m5.simulate() calls by garnet_synth_traffic.py --steady-state
+    cxx_exports = [
+        PyBindMethod("getPacketsInjected"),
+        PyBindMethod("getPacketsReceived"),
+        PyBindMethod("getPacketLatency"),
+    ]
+
 class GarnetNetworkInterface(ClockedObject):
     type = "GarnetNetworkInterface"
     cxx_class = "gem5::ruby::garnet::NetworkInterface"
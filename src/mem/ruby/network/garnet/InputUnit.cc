@@ -176,6 +176,16 @@ InputUnit::functionalWrite(Packet *pkt)
     return num_functional_writes;
 }
 
+Tick
+InputUnit::get_vc_active_ticks(Tick curTime) const
+{
+    Tick active = 0;
+    for (auto& virtual_channel : virtualChannels) {
+        active += virtual_channel.get_active_ticks(curTime);
+    }
+    return active;
+}
+
 void
 InputUnit::resetStats()
 {
@@ -183,6 +193,9 @@ InputUnit::resetStats()
         m_num_buffer_reads[j] = 0;
         m_num_buffer_writes[j] = 0;
     }
+    for (auto& virtual_channel : virtualChannels) {
+        virtual_channel.resetStats(curTick());
+    }
 }
 
 } // namespace garnet
@@ -151,6 +151,7 @@ class InputUnit : public Consumer
     { return m_num_buffer_reads[vnet]; }
     double get_buf_write_activity(unsigned int vnet) const
     { return m_num_buffer_writes[vnet]; }
+    Tick get_vc_active_ticks(Tick curTime) const;
 
     bool functionalRead(Packet *pkt, WriteMask &mask);
     uint32_t functionalWrite(Packet *pkt);
@@ -319,6 +319,17 @@ Router::collateStats()
     m_crossbar_activity = crossbarSwitch.get_crossbar_activity();
 }
 
+// Sum over all input VCs of the ticks they held a packet
+Tick
+Router::get_vc_active_ticks()
+{
+    Tick active = 0;
+    for (int i = 0; i < m_input_unit.size(); i++) {
+        active += m_input_unit[i]->get_vc_active_ticks(curTick());
+    }
+    return active;
+}
+
 void
 Router::resetStats()
 {
@@ -134,6 +134,7 @@ class Router : public BasicRouter, public Consumer
     void regStats();
     void collateStats();
     void resetStats();
+    Tick get_vc_active_ticks();
 
     // For Fault Model:
     bool get_fault_vector(int temperature, float fault_vector[]) {
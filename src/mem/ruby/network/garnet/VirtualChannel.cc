@@ -42,13 +42,16 @@ namespace garnet
 
 VirtualChannel::VirtualChannel()
   : inputBuffer(), m_vc_state(IDLE_, Tick(0)), m_output_port(-1),
-    m_enqueue_time(INFINITE_), m_output_vc(-1)
+    m_enqueue_time(INFINITE_), m_output_vc(-1), m_active_ticks(0),
+    m_active_since(0)
 {
 }
 
 void
 VirtualChannel::set_idle(Tick curTime)
 {
+    if (m_vc_state.first == ACTIVE_)
+        m_active_ticks += curTime - m_active_since;
     m_vc_state.first = IDLE_;
     m_vc_state.second = curTime;
     m_enqueue_time = Tick(INFINITE_);
@@ -59,11 +62,28 @@ VirtualChannel::set_idle(Tick curTime)
 void
 VirtualChannel::set_active(Tick curTime)
 {
+    if (m_vc_state.first != ACTIVE_)
+        m_active_since = curTime;
     m_vc_state.first = ACTIVE_;
     m_vc_state.second = curTime;
     m_enqueue_time = curTime;
 }
 
+Tick
+VirtualChannel::get_active_ticks(Tick curTime) const
+{
+    if (m_vc_state.first == ACTIVE_ && curTime > m_active_since)
+        return m_active_ticks + (curTime - m_active_since);
+    return m_active_ticks;
+}
+
+void
+VirtualChannel::resetStats(Tick curTime)
+{
+    m_active_ticks = 0;
+    m_active_since = curTime;
+}
+
 bool
 VirtualChannel::need_stage(flit_stage stage, Tick time)
 {
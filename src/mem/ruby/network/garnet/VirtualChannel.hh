@@ -64,6 +64,10 @@ class VirtualChannel
     inline void set_enqueue_time(Tick time) { m_enqueue_time = time; }
     inline VC_state_type get_state()        { return m_vc_state.first; }
 
+    // Ticks this VC was active since the last stats reset
+    Tick get_active_ticks(Tick curTime) const;
+    void resetStats(Tick curTime);
+
     inline bool
     isReady(Tick curTime)
     {
@@ -104,6 +108,10 @@ class VirtualChannel
     int m_output_port;
     Tick m_enqueue_time;
     int m_output_vc;
+
+    // Statistical variables
+    Tick m_active_ticks;
+    Tick m_active_since;
 };
 
 } // namespace garnet
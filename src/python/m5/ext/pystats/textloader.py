@@ -0,0 +1,254 @@
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Bulk loader of the text stats.txt files into tidy tables.
+
+Every stat line of stats.txt becomes one row (dump, stat, index, value):
+
+  * ``dump`` counts the "Begin Simulation Statistics" blocks of the file,
+  * ``stat`` is the name before "::", e.g. "system.ruby.network.flits",
+  * ``index`` is the name after "::", e.g. "vnet-0", "total", "samples" or
+    the bucket "0-9" of a distribution, and "" for scalars,
+  * ``value`` is the first number of the line; the percentages of vector
+    and distribution lines are left out.
+
+Vectors printed on one line (" |  v0 |  v1 ...") get the indices 0, 1, ...
+
+The lines of all dumps are matched with one regular expression and the
+values converted in one NumPy call, so that loading does not go through Python
+code per stat. ``load`` returns a structured NumPy array, ``load_frame``
+a pandas DataFrame, and ``load_runs`` loads the stats.txt of many output
+directories in parallel:
+
+```
+from m5.ext.pystats import textloader
+
+table = textloader.load("m5out/stats.txt", stats="system.ruby.*")
+ticks = table[table["stat"] == "simTicks"]["value"]
+frame = textloader.load_runs("output/sweeps", jobs=8, as_frame=True)
+```
+"""
+
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import IO, Iterable, List, Optional, Union
+
+import numpy as np
+
+from .timeseries import stat_filter
+
+BEGIN = "---------- Begin Simulation Statistics ----------"
+
+# One match per stat line: the name (split at "::") and either the first
+# value or the values of a vector printed on one line. Begin lines match
+# the first group and number the dumps; names never start with "-", which
+# leaves out the End lines.
+_LINE = re.compile(
+    r"\n(?:(-)--------- Begin[^\n]*"
+    r"|([^\s#:\-][^\s:]*)(?:::(\S+))?[ \t]+"
+    r"(?:([^\s#|]\S*)|(\|[^#\n]*)))"
+)
+
+DTYPE = np.dtype(
+    [("dump", np.int64), ("stat", object), ("index", object), ("value", float)]
+)
+RUN_DTYPE = np.dtype([("run", object)] + DTYPE.descr)
+
+
+def _values(tokens: np.ndarray) -> np.ndarray:
+    try:
+        return tokens.astype(np.float64)
+    except ValueError:
+        values = np.empty(len(tokens))
+        for i, token in enumerate(tokens):
+            try:
+                values[i] = float(token)
+            except ValueError:
+                values[i] = np.nan
+        return values
+
+
+def parse(
+    text: str, stats: Optional[Union[str, Iterable[str]]] = None
+) -> np.ndarray:
+    """
+    Parse the text of a stats.txt into a structured array of DTYPE.
+
+    Parameters
+    ----------
+
+    text: str
+        The content of the file.
+
+    stats: Optional[Union[str, Iterable[str]]]
+        Only keep the stats whose names (before "::") match these globs,
+        see `timeseries.stat_filter`.
+    """
+
+    rows = _LINE.findall("\n" + text)
+    if not rows:
+        return np.empty(0, dtype=DTYPE)
+    begin, names, indices, tokens, oneline = np.array(rows, dtype=object).T
+    marker = begin != ""
+    # Anything before the first dump is not a stat
+    dumps = np.cumsum(marker) - 1 if marker.any() else np.zeros(len(rows))
+    keep = ~marker & (dumps >= 0)
+    vectors = keep & (oneline != "")
+    keep &= ~vectors
+    table = np.empty(int(keep.sum()), dtype=DTYPE)
+    table["dump"] = dumps[keep]
+    table["stat"] = names[keep]
+    table["index"] = indices[keep]
+    table["value"] = _values(tokens[keep])
+    if vectors.any():
+        expanded = []
+        for dump, name, values in zip(
+            dumps[vectors], names[vectors], oneline[vectors]
+        ):
+            # Every element is " |<value> [<pdf> <cdf>]"
+            for i, element in enumerate(values.split("|")[1:]):
+                token = (element.split() or ["nan"])[0]
+                expanded.append((dump, name, str(i), token))
+        columns = [np.array(c, dtype=object) for c in zip(*expanded)]
+        extra = np.empty(len(expanded), dtype=DTYPE)
+        extra["dump"], extra["stat"], extra["index"] = columns[:3]
+        extra["value"] = _values(columns[3])
+        table = np.concatenate([table, extra])
+        table = table[np.argsort(table["dump"], kind="stable")]
+    accept = stat_filter(stats)
+    if accept is not None and len(table):
+        unique, inverse = np.unique(table["stat"], return_inverse=True)
+        keep = np.fromiter((accept(n) for n in unique), bool, len(unique))
+        table = table[keep[inverse.reshape(-1)]]
+    return table
+
+
+def load(
+    file: Union[str, IO], stats: Optional[Union[str, Iterable[str]]] = None
+) -> np.ndarray:
+    """
+    Load a stats.txt into a structured array of DTYPE, see `parse`.
+
+    Parameters
+    ----------
+
+    file: Union[str, IO]
+        The path of the file, or an open text file.
+
+    stats: Optional[Union[str, Iterable[str]]]
+        Only keep the stats that match these globs.
+    """
+
+    if isinstance(file, str):
+        with open(file, "r") as fp:
+            return parse(fp.read(), stats)
+    return parse(file.read(), stats)
+
+
+def to_frame(table: np.ndarray):
+    """A pandas DataFrame of a table of `load` or `load_runs`."""
+    import pandas as pd
+
+    frame = pd.DataFrame({name: table[name] for name in table.dtype.names})
+    for column in ("run", "stat", "index"):
+        if column in frame:
+            frame[column] = frame[column].astype("category")
+    return frame
+
+
+def load_frame(
+    file: Union[str, IO], stats: Optional[Union[str, Iterable[str]]] = None
+):
+    """Load a stats.txt into a pandas DataFrame, see `load`."""
+    return to_frame(load(file, stats))
+
+
+def find_runs(root: str, stats_file: str = "stats.txt") -> List[str]:
+    """The directories below ``root`` that contain a ``stats_file``."""
+    runs = []
+    for directory, subdirs, files in os.walk(root):
+        subdirs.sort()
+        if stats_file in files:
+            runs.append(directory)
+    return runs
+
+
+def _load_run(job):
+    directory, stats_file, stats = job
+    return load(os.path.join(directory, stats_file), stats)
+
+
+def load_runs(
+    runs: Union[str, Iterable[str]],
+    stats: Optional[Union[str, Iterable[str]]] = None,
+    stats_file: str = "stats.txt",
+    jobs: Optional[int] = None,
+    as_frame: bool = False,
+):
+    """
+    Load the stats of many output directories into one table with the
+    additional field ``run``, the directory of every row.
+
+    Parameters
+    ----------
+
+    runs: Union[str, Iterable[str]]
+        The output directories, or a directory to search for them with
+        `find_runs`.
+
+    stats: Optional[Union[str, Iterable[str]]]
+        Only keep the stats that match these globs.
+
+    stats_file: str
+        The name of the stats file in every directory.
+
+    jobs: Optional[int]
+        The number of processes loading the files (default: the number of
+        cores), 1 to load them in this process.
+
+    as_frame: bool
+        Return a pandas DataFrame instead of a structured array.
+    """
+
+    if isinstance(runs, str):
+        runs = find_runs(runs, stats_file)
+    runs = list(runs)
+    work = [(run, stats_file, stats) for run in runs]
+    jobs = jobs or os.cpu_count() or 1
+    if jobs > 1 and len(runs) > 1:
+        chunksize = max(1, len(runs) // (4 * jobs))
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            tables = list(pool.map(_load_run, work, chunksize=chunksize))
+    else:
+        tables = [_load_run(job) for job in work]
+    table = np.empty(sum(len(t) for t in tables), dtype=RUN_DTYPE)
+    start = 0
+    for run, part in zip(runs, tables):
+        end = start + len(part)
+        table["run"][start:end] = run
+        for name in DTYPE.names:
+            table[name][start:end] = part[name]
+        start = end
+    return to_frame(table) if as_frame else table
@@ -0,0 +1,297 @@
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Time series of flat stat records, one record per stat dump.
+
+A record is the tick of the dump and the values of a list of stat names,
+such as "system.ruby.network.routers05.buffer_reads" or
+"system.ruby.network.average_packet_latency". Vector elements are named
+"<stat>::<subname>" and distributions are summarized by "<stat>::samples",
+"::mean", "::min_value", "::max_value", "::underflows" and "::overflows",
+like in stats.txt.
+
+Two formats append a record per dump without rewriting what was written
+before:
+
+  * JSON lines (``JsonlWriter``): a header line with the stat names, then
+    one line per dump with the dump number, the tick and the values. A new
+    header is written only when the names change.
+  * Parquet (``ParquetWriter``, needs pyarrow): a directory with one file
+    per dump and the columns dump, tick, name and value, which pyarrow and
+    pandas read as one dataset.
+
+``read_jsonl`` and ``read_parquet`` load a series as a ``StatSeries`` of
+NumPy arrays.
+"""
+
+import fnmatch
+import json
+import os
+import re
+from typing import Callable, IO, Iterable, List, NamedTuple, Optional, Union
+
+import numpy as np
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+class StatSeries(NamedTuple):
+    """
+    The records of a series: ``values[i, j]`` is stat ``names[j]`` at dump
+    ``dumps[i]``, taken at tick ``ticks[i]``. Stats missing from a dump are
+    NaN.
+    """
+
+    dumps: np.ndarray
+    ticks: np.ndarray
+    names: List[str]
+    values: np.ndarray
+
+    def column(self, name: str) -> np.ndarray:
+        """The values of one stat across the dumps."""
+        return self.values[:, self.names.index(name)]
+
+    def to_frame(self):
+        """A pandas DataFrame with one row per dump and a column per stat."""
+        import pandas as pd
+
+        frame = pd.DataFrame(self.values, columns=self.names)
+        frame.insert(0, "tick", self.ticks)
+        frame.index = pd.Index(self.dumps, name="dump")
+        return frame
+
+
+def stat_filter(
+    patterns: Optional[Union[str, Iterable[str]]]
+) -> Optional[Callable[[str], bool]]:
+    """
+    A predicate on stat names that accepts the names matching any of the
+    glob ``patterns``, or None to accept every name.
+
+    Parameters
+    ----------
+
+    patterns: Optional[Union[str, Iterable[str]]]
+        A glob such as "system.ruby.network.routers*", a comma-separated
+        list of globs or an iterable of them.
+    """
+
+    if patterns is None:
+        return None
+    if isinstance(patterns, str):
+        patterns = patterns.split(",")
+    patterns = [pattern.strip() for pattern in patterns if pattern.strip()]
+    if not patterns:
+        return None
+    regex = re.compile("|".join(fnmatch.translate(p) for p in patterns))
+    return lambda name: regex.match(name) is not None
+
+
+class JsonlWriter:
+    """
+    Appends stat records to a JSON lines file.
+
+    The file is truncated when the writer is created, every record is
+    flushed when it is written so a series can be read while the
+    simulation runs.
+    """
+
+    def __init__(self, file: str):
+        self.file = file
+        self._names = None
+        self._dumps = 0
+        with open(self.file, "w"):
+            pass
+
+    def write(self, tick: int, names: List[str], values: List[float]):
+        lines = []
+        if names != self._names:
+            self._names = list(names)
+            lines.append(json.dumps({"names": self._names}))
+        lines.append(
+            json.dumps(
+                {"dump": self._dumps, "tick": tick, "values": list(values)},
+                separators=(",", ":"),
+            )
+        )
+        self._dumps += 1
+        with open(self.file, "a") as fp:
+            fp.write("\n".join(lines) + "\n")
+
+
+class ParquetWriter:
+    """
+    Writes every stat record as one Parquet file of the directory
+    ``file``, in the long format dump, tick, name, value.
+    """
+
+    def __init__(self, file: str):
+        if pyarrow is None:
+            raise ImportError("parquet stats need pyarrow")
+        self.file = file
+        self._names = None
+        self._dumps = 0
+        os.makedirs(self.file, exist_ok=True)
+        for old in os.listdir(self.file):
+            if old.startswith("dump_") and old.endswith(".parquet"):
+                os.remove(os.path.join(self.file, old))
+
+    def write(self, tick: int, names: List[str], values: List[float]):
+        if names != self._names:
+            self._names = list(names)
+            self._name_array = pyarrow.array(self._names).dictionary_encode()
+        count = len(self._names)
+        table = pyarrow.table(
+            {
+                "dump": pyarrow.array(
+                    np.full(count, self._dumps, dtype=np.int64)
+                ),
+                "tick": pyarrow.array(np.full(count, tick, dtype=np.int64)),
+                "name": self._name_array,
+                "value": pyarrow.array(np.asarray(values, dtype=np.float64)),
+            }
+        )
+        path = os.path.join(self.file, f"dump_{self._dumps:06d}.parquet")
+        pyarrow.parquet.write_table(table, path)
+        self._dumps += 1
+
+
+def _series(blocks: List[tuple]) -> StatSeries:
+    """
+    A StatSeries of (names, dumps, ticks, values) blocks, whose stat
+    names are joined in the order they first appear.
+    """
+
+    index = {}
+    for names, _, _, _ in blocks:
+        for name in names:
+            index.setdefault(name, len(index))
+    dumps = [d for _, block, _, _ in blocks for d in block]
+    values = np.full((len(dumps), len(index)), np.nan)
+    row = 0
+    for names, block, _, block_values in blocks:
+        columns = np.fromiter((index[n] for n in names), np.int64, len(names))
+        end = row + len(block)
+        values[row:end, columns] = np.asarray(
+            block_values, dtype=np.float64
+        ).reshape(len(block), len(names))
+        row = end
+    return StatSeries(
+        np.asarray(dumps, dtype=np.int64),
+        np.asarray(
+            [t for _, _, ticks, _ in blocks for t in ticks], dtype=np.int64
+        ),
+        list(index),
+        values,
+    )
+
+
+def read_jsonl(
+    file: Union[str, IO], stats: Optional[Union[str, Iterable[str]]] = None
+) -> StatSeries:
+    """
+    Load the records of a JSON lines stat series.
+
+    Parameters
+    ----------
+
+    file: Union[str, IO]
+        The path of the series or an open text file.
+
+    stats: Optional[Union[str, Iterable[str]]]
+        Only load the stats that match these globs, see ``stat_filter``.
+    """
+
+    if isinstance(file, str):
+        with open(file, "r") as fp:
+            return read_jsonl(fp, stats)
+    accept = stat_filter(stats)
+    blocks = []
+    for line in file:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        if "names" in record:
+            names = record["names"]
+            keep = None
+            if accept is not None:
+                keep = [i for i, name in enumerate(names) if accept(name)]
+                names = [names[i] for i in keep]
+            blocks.append((names, [], [], []))
+            continue
+        if not blocks:
+            raise ValueError("stat record before the stat names")
+        _, dumps, ticks, values = blocks[-1]
+        dumps.append(record["dump"])
+        ticks.append(record["tick"])
+        row = record["values"]
+        values.append(row if keep is None else [row[i] for i in keep])
+    return _series(blocks)
+
+
+def read_parquet(
+    file: str, stats: Optional[Union[str, Iterable[str]]] = None
+) -> StatSeries:
+    """
+    Load the records of a Parquet stat series directory.
+
+    Parameters
+    ----------
+
+    file: str
+        The directory of the series.
+
+    stats: Optional[Union[str, Iterable[str]]]
+        Only load the stats that match these globs, see ``stat_filter``.
+    """
+
+    if pyarrow is None:
+        raise ImportError("parquet stats need pyarrow")
+    accept = stat_filter(stats)
+    blocks = []
+    for path in sorted(os.listdir(file)):
+        if not (path.startswith("dump_") and path.endswith(".parquet")):
+            continue
+        table = pyarrow.parquet.read_table(os.path.join(file, path))
+        names = [str(name) for name in table.column("name").to_pylist()]
+        values = table.column("value").to_numpy()
+        if accept is not None:
+            keep = [i for i, name in enumerate(names) if accept(name)]
+            names = [names[i] for i in keep]
+            values = values[keep]
+        dump = table.column("dump").to_numpy()
+        tick = table.column("tick").to_numpy()
+        blocks.append(
+            (
+                names,
+                [int(dump[0])] if len(dump) else [],
+                [int(tick[0])] if len(tick) else [],
+                values,
+            )
+        )
+    return _series([block for block in blocks if block[1]])
@@ -37,12 +37,15 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import importlib.util
+import os
+
 import m5
 
 import _m5.stats
 from m5.objects import Root
 from m5.params import isNullPointer
-from .gem5stats import JsonOutputVistor
+from .gem5stats import JsonOutputVistor, SeriesOutputVisitor
 from m5.util import attrdict, fatal
 
 # Stat exports
@@ -198,6 +201,59 @@ def _jsonFactory(fn):
     return JsonOutputVistor(fn)
 
 
+def _series_path(fn):
+    return os.path.join(m5.options.outdir, fn)
+
+
+@_url_factory(["jsonl"])
+def _jsonlFactory(fn, stats=None):
+    """Append one JSON record per stat dump.
+
+    The first line has the stat names, every dump adds one line with the
+    dump number, the tick and the values, so periodic dumps do not
+    rewrite the stats of the earlier ones. Load the series with
+    m5.ext.pystats.timeseries.read_jsonl.
+
+    Parameters:
+      * stats (str): Only record the stats that match these
+                     comma-separated globs (default: all stats)
+
+    Example:
+      jsonl://stats.jsonl?stats='system.ruby.network.*'
+
+    """
+
+    from m5.ext.pystats import timeseries
+
+    return SeriesOutputVisitor(timeseries.JsonlWriter(_series_path(fn)), stats)
+
+
+@_url_factory(
+    ["parquet"], enable=importlib.util.find_spec("pyarrow") is not None
+)
+def _parquetFactory(fn, stats=None):
+    """Write one Parquet file per stat dump into a directory.
+
+    Every file has the columns dump, tick, name and value; pyarrow and
+    pandas read the directory as one table. Load the series with
+    m5.ext.pystats.timeseries.read_parquet. Needs pyarrow.
+
+    Parameters:
+      * stats (str): Only record the stats that match these
+                     comma-separated globs (default: all stats)
+
+    Example:
+      parquet://stats.parquet?stats='system.ruby.network.routers*'
+
+    """
+
+    from m5.ext.pystats import timeseries
+
+    return SeriesOutputVisitor(
+        timeseries.ParquetWriter(_series_path(fn)), stats
+    )
+
+
 def addStatVisitor(url):
     """Add a stat visitor specified using a URL string
 
@@ -414,7 +470,7 @@ def dump(roots=None):
         prepare()
 
     for output in outputList:
-        if isinstance(output, JsonOutputVistor):
+        if isinstance(output, (JsonOutputVistor, SeriesOutputVisitor)):
             if not all_roots:
                 output.dump(Root.getInstance())
             else:
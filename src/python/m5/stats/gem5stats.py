@@ -84,6 +84,126 @@ class JsonOutputVistor:
             simstat.dump(fp=fp, **self.json_args)
 
 
+class SeriesOutputVisitor:
+    """
+    A stat visitor that appends one flat record per dump to a time series
+    (see `m5.ext.pystats.timeseries`) instead of building a SimStat tree.
+
+    The stats of a full dump are looked up once, at the first dump, with
+    the names that pass the filter; every later dump only reads their
+    values, so the cost of a dump does not depend on the stats filtered
+    out.
+    """
+
+    def __init__(self, writer, stats=None):
+        """
+        Parameters
+        ----------
+
+        writer:
+            The series writer, with a `write(tick, names, values)` method.
+
+        stats: Optional[Union[str, List[str]]]
+            Only record the stats whose names match these globs.
+        """
+
+        from m5.ext.pystats.timeseries import stat_filter
+
+        self.writer = writer
+        self.accept = stat_filter(stats)
+        self._root_stats = None
+
+    def _find_stats(self, group: _m5.stats.Group, prefix: str, found: List):
+        for stat in group.getStats():
+            names = _series_names(f"{prefix}{stat.name}", stat)
+            if self.accept is not None:
+                names = [
+                    (name, key) for name, key in names if self.accept(name)
+                ]
+            if names:
+                found.append((stat, names))
+        for name, child in group.getStatGroups().items():
+            self._find_stats(child, f"{prefix}{name}.", found)
+        return found
+
+    def dump(self, roots: Union[List[SimObject], Root]) -> None:
+        """
+        Appends the record of a simulation root (or list of roots) to the
+        series.
+
+        WARNING: This dump assumes the statistics have already been prepared
+        for the target root.
+        """
+
+        if isinstance(roots, Root):
+            if self._root_stats is None:
+                self._root_stats = self._find_stats(roots, "", [])
+            found = self._root_stats
+        else:
+            found = []
+            for root in roots:
+                prefix = "" if isinstance(root, Root) else f"{root.path()}."
+                self._find_stats(root, prefix, found)
+
+        names, values = [], []
+        for stat, stat_names in found:
+            value = _series_values(stat)
+            for name, key in stat_names:
+                names.append(name)
+                values.append(float(value[key]))
+        self.writer.write(int(_m5.core.curTick()), names, values)
+
+
+def _series_names(name: str, stat: _m5.stats.Info) -> List:
+    """
+    The (series name, index into `_series_values()`) pairs of a stat.
+    """
+
+    if isinstance(stat, _m5.stats.ScalarInfo):
+        return [(name, 0)]
+    if isinstance(stat, _m5.stats.VectorInfo):
+        if stat.size == 1 and not str(stat.subnames[0]):
+            return [(name, 0)]
+        names = []
+        for index in range(stat.size):
+            subname = str(stat.subnames[index]) or str(index)
+            names.append((f"{name}::{subname}", index))
+        names.append((f"{name}::total", stat.size))
+        return names
+    if isinstance(stat, _m5.stats.DistInfo):
+        return [
+            (f"{name}::{field}", index)
+            for index, field in enumerate(_DIST_FIELDS)
+        ]
+    return []
+
+
+_DIST_FIELDS = (
+    "samples",
+    "mean",
+    "min_value",
+    "max_value",
+    "underflows",
+    "overflows",
+)
+
+
+def _series_values(stat: _m5.stats.Info) -> List[float]:
+    if isinstance(stat, _m5.stats.ScalarInfo):
+        return [stat.value]
+    if isinstance(stat, _m5.stats.VectorInfo):
+        return list(stat.result) + [stat.total]
+    samples = sum(stat.values) + stat.underflow + stat.overflow
+    return [
+        samples,
+        stat.sum / samples if samples else float("nan"),
+        stat.min_val,
+        stat.max_val,
+        stat.underflow,
+        stat.overflow,
+    ]
+
+
 def get_stats_group(group: _m5.stats.Group) -> Group:
     """
     Translates a gem5 Group object into a Python stats Group object. A Python
@@ -0,0 +1,129 @@
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        os.pardir,
+        os.pardir,
+        os.pardir,
+        "expcode",
+    ),
+)
+
+from results import (
+    ResultStore,
+    parse_text,
+    read_dumps,
+    read_stats,
+    stat_values,
+)
+
+REFS = os.path.join(os.path.realpath(os.path.dirname(__file__)), "refs")
+
+
+class ResultsTestSuite(unittest.TestCase):
+    """Test cases for the SQLite result store of the sweeps"""
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.root = self._dir.name
+        self.stats_path = os.path.join(REFS, "stats.txt")
+        # Records of the former bash sweeps; the first run was interrupted
+        self.text_path = os.path.join(REFS, "mesh_real_16.txt")
+        self.db_path = os.path.join(self.root, "output", "results.sqlite")
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def test_stat_values(self):
+        stats = read_stats(self.stats_path)
+        self.assertEqual(len(read_dumps(self.stats_path)), 2)
+        values = stat_values(stats)
+        self.assertEqual(values["packets_injected::vnet-0"], 14202)
+        self.assertEqual(values["average_packet_latency"], 9.980423)
+        # Oneline vectors are printed as " |<value>" per element
+        self.assertEqual(
+            [values[f"int_link_flits::{i}"] for i in range(3)], [12, 0, 7]
+        )
+        self.assertNotIn("int_link_flits", values)
+        self.assertEqual(values["reception_hist::1"], 5)
+        self.assertEqual(stat_values(stats, prefix="")["finalTick"], 1e7)
+
+    def test_columns(self):
+        values = stat_values(read_stats(self.stats_path))
+        store = ResultStore(self.db_path)
+        run = store.add({"name": "mesh_synth_16", "rate": 0.01}, values)
+        store.add(
+            {"name": "mesh_synth_16", "rate": 0.04},
+            {"average_packet_latency": 12.5, "average_hops": 2.5},
+        )
+        store.commit()
+        self.assertIn("packets_injected::total", store.columns())
+        self.assertIn("average_hops", store.columns())
+        names, rows = store.query(
+            "mesh_synth_16",
+            ["rate", "average_packet_latency", "average_hops", "missing"],
+        )
+        self.assertEqual(
+            rows, [(0.01, 9.980423, None, None), (0.04, 12.5, 2.5, None)]
+        )
+        self.assertEqual(store.names(), [("mesh_synth_16", 2)])
+        store.close()
+
+        # Per component statistics are rows of component_stats
+        db = sqlite3.connect(self.db_path)
+        components = dict(
+            db.execute(
+                "SELECT stat, value FROM component_stats WHERE run = ?",
+                (run,),
+            )
+        )
+        db.close()
+        self.assertEqual(
+            components,
+            {
+                "int_link_flits::0": 12,
+                "int_link_flits::1": 0,
+                "int_link_flits::2": 7,
+                "router_vc_occupancy::3": 0.25,
+                "routers00.buffer_reads": 40310,
+                "int_links05.network_link.link_utilization": 11712,
+            },
+        )
+        for name in components:
+            self.assertNotIn(name, store.columns())
+
+        # Reopening the store sees the added columns, delete() the rows
+        store = ResultStore(self.db_path)
+        self.assertIn("average_hops", store.columns())
+        store.delete("mesh_synth_16")
+        store.commit()
+        self.assertEqual(store.names(), [])
+        self.assertEqual(
+            store.db.execute(
+                "SELECT COUNT(*) FROM component_stats"
+            ).fetchone(),
+            (0,),
+        )
+        store.close()
+
+    def test_parse_text(self):
+        runs = parse_text(self.text_path)
+        self.assertEqual(len(runs), 2)
+        self.assertEqual(runs[0]["rate"], 0.01)
+        self.assertEqual(runs[0]["synthetic"], "real_traffic")
+        self.assertEqual(runs[0]["routing"], 1)
+        self.assertEqual(
+            runs[0]["matrix"],
+            "real_traffic/mesh_4x4/Fpppp_mesh_4x4_traffic.txt",
+        )
+        self.assertEqual(runs[0]["packets_injected::total"], 14202)
+        self.assertEqual(runs[0]["packets_received::total"], 14200)
+        self.assertEqual(runs[0]["reception_rate"], 0.008875)
+        self.assertNotIn("packets_received::total", runs[1])
+        self.assertEqual(runs[1]["average_packet_latency"], 10.2)
@@ -0,0 +1,96 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        os.pardir,
+        os.pardir,
+        os.pardir,
+        "expcode",
+    ),
+)
+
+from sweep import RATES, SATURATION_LATENCY, search_rates
+
+
+def _curve(saturation_rate):
+    """Latency curve of a network that saturates at ``saturation_rate``."""
+
+    def latency(rate):
+        rate = float(rate)
+        if rate >= saturation_rate:
+            return 10.0 * SATURATION_LATENCY
+        return 20.0 / (1.0 - rate / saturation_rate)
+
+    return latency
+
+
+def _search(latency, knee=3):
+    """Run search_rates() to the end.
+
+    Returns (latencies, first saturated index, number of simulations).
+    """
+    latencies = {}
+    simulations = 0
+    while True:
+        indices, saturated = search_rates(latencies, RATES, knee)
+        if not indices:
+            return latencies, saturated, simulations
+        for r in indices:
+            latencies[r] = latency(RATES[r])
+            simulations += 1
+
+
+class SearchRatesTestSuite(unittest.TestCase):
+    """Test cases for the saturation-rate search of the sweep driver"""
+
+    def _first_saturated(self, latency):
+        return next(
+            (
+                r
+                for r, rate in enumerate(RATES)
+                if latency(rate) > SATURATION_LATENCY
+            ),
+            len(RATES),
+        )
+
+    def test_knee(self):
+        for saturation_rate in (0.05, 0.3, 0.5, 0.62, 0.9):
+            latency = _curve(saturation_rate)
+            latencies, saturated, simulations = _search(latency)
+            self.assertEqual(saturated, self._first_saturated(latency))
+            # No rate is simulated twice, and the knee right below the
+            # saturated rate is simulated densely
+            self.assertEqual(simulations, len(latencies))
+            for r in range(max(0, saturated - 3), saturated + 1):
+                self.assertIn(r, latencies)
+            self.assertLessEqual(simulations, 7)
+
+    def test_simulations(self):
+        # 0.50 is rate 17, walking the grid would take 18 simulations
+        latencies, saturated, simulations = _search(_curve(0.5))
+        self.assertEqual(saturated, 17)
+        self.assertEqual(simulations, 7)
+        self.assertEqual(sorted(latencies), [0, 8, 12, 14, 15, 16, 17])
+        # The secant step lands on the knee of a steep curve at once
+        latencies, saturated, simulations = _search(_curve(0.62))
+        self.assertEqual(saturated, 20)
+        self.assertEqual(simulations, 5)
+        self.assertEqual(sorted(latencies), [0, 17, 18, 19, 20])
+        latencies, saturated, simulations = _search(_curve(0.5), knee=5)
+        self.assertEqual(simulations, 8)
+        self.assertIn(13, latencies)
+
+    def test_ends(self):
+        # Saturated at the lowest rate
+        latencies, saturated, simulations = _search(_curve(0.001))
+        self.assertEqual(saturated, 0)
+        self.assertEqual(simulations, 2)
+        # Never saturated, the highest rates are the knee
+        latencies, saturated, simulations = _search(_curve(2.0))
+        self.assertEqual(saturated, len(RATES))
+        self.assertEqual(simulations, 7)
+        self.assertEqual(sorted(latencies)[-3:], [31, 32, 33])
@@ -0,0 +1,209 @@
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        os.pardir,
+        os.pardir,
+        os.pardir,
+        "configs",
+    ),
+)
+
+import numpy as np
+
+from network.power_area import (
+    NETWORK,
+    ROUTER_STATS,
+    TECHNOLOGIES,
+    evaluate_runs,
+    main,
+    read_network,
+    router_area,
+)
+
+TECH = TECHNOLOGIES["45nm"]
+_DIRECTIONS = {(1, 0): "East", (-1, 0): "West", (0, 1): "North"}
+
+
+def _mesh_links(cols, rows, express=()):
+    """(src, dst, outport) of a mesh with bidirectional express links."""
+    links = []
+    for r in range(cols * rows):
+        x, y = r % cols, r // cols
+        for (dx, dy), port in _DIRECTIONS.items():
+            if 0 <= x + dx < cols and 0 <= y + dy < rows:
+                links.append((r, r + dx + dy * cols, port))
+        if y > 0:
+            links.append((r, r - cols, "South"))
+    for i, j in express:
+        links += [(i, j, "NorthEast"), (j, i, "SouthWest")]
+    return links
+
+
+def _config(cols, rows, links):
+    """The network sections of a config.ini, as a dict."""
+    routers = [f"{NETWORK}.routers{r}" for r in range(cols * rows)]
+    int_links = [f"{NETWORK}.int_links{k:02d}" for k in range(len(links))]
+    ext_links = [f"{NETWORK}.ext_links{r}" for r in range(cols * rows)]
+    sections = {
+        NETWORK: {
+            "type": "GarnetNetwork",
+            "routers": " ".join(routers),
+            "int_links": " ".join(int_links),
+            "ext_links": " ".join(ext_links),
+            "ni_flit_size": "16",
+            "vcs_per_vnet": "4",
+            "number_of_virtual_networks": "3",
+            "buffers_per_data_vc": "4",
+            "num_rows": str(rows),
+        }
+    }
+    # Router ids in reverse order of the names
+    for r, name in enumerate(routers):
+        sections[name] = {"router_id": str(cols * rows - 1 - r)}
+    for name, (src, dst, port) in zip(int_links, links):
+        sections[name] = {
+            "src_node": routers[cols * rows - 1 - src],
+            "dst_node": routers[cols * rows - 1 - dst],
+            "src_outport": port,
+        }
+    for r, name in enumerate(ext_links):
+        sections[name] = {"int_node": routers[r]}
+    return sections
+
+
+def _write_ini(path, sections):
+    with open(path, "w") as f:
+        for name, params in sections.items():
+            f.write(f"[{name}]\n")
+            for key, value in params.items():
+                f.write(f"{key}={value}\n")
+            f.write("\n")
+
+
+def _write_json(path, sections):
+    """A config.json with the network and its children nested."""
+    network = dict(sections[NETWORK], path=NETWORK)
+    for key in ("routers", "int_links", "ext_links"):
+        network[key] = [
+            dict(sections[name], path=name) for name in network[key].split()
+        ]
+    with open(path, "w") as f:
+        json.dump({"system": {"ruby": {"network": network}}}, f)
+
+
+def _write_stats(path, model, scale, seconds=1e-6):
+    lines = [
+        "",
+        "---------- Begin Simulation Statistics ----------",
+        f"simSeconds {seconds} # Number of seconds simulated (Second)",
+    ]
+    for r, router in enumerate(model.routers):
+        for k, stat in enumerate(ROUTER_STATS):
+            lines.append(f"{router}.{stat} {scale * (r + k + 1)} # (Count)")
+    flits = " ".join(f"|{scale * (k + 1)}" for k in range(len(model.src)))
+    lines += [
+        f"{NETWORK}.int_link_flits {flits} # (Count)",
+        f"{NETWORK}.ext_in_link_utilization {scale * 10} # (Count)",
+        f"{NETWORK}.ext_out_link_utilization {scale * 10} # (Count)",
+        f"{NETWORK}.packets_received::total {scale * 4} # (Count)",
+        "",
+        "---------- End Simulation Statistics   ----------",
+    ]
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+class PowerAreaTestSuite(unittest.TestCase):
+    """The analytical power and area model"""
+
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.root.cleanup()
+
+    def _run(self, name, sections, scale, fmt="ini"):
+        outdir = os.path.join(self.root.name, name)
+        os.mkdir(outdir)
+        if fmt == "ini":
+            _write_ini(os.path.join(outdir, "config.ini"), sections)
+        else:
+            _write_json(os.path.join(outdir, "config.json"), sections)
+        model = read_network(os.path.join(outdir, f"config.{fmt}"))
+        _write_stats(os.path.join(outdir, "stats.txt"), model, scale)
+        return outdir, model
+
+    def test_network(self):
+        sections = _config(3, 3, _mesh_links(3, 3, [(0, 8)]))
+        outdir, model = self._run("mesh", sections, 1)
+        self.assertEqual(model.routers[0], f"{NETWORK}.routers8")
+        # Corner, edge and center routers, plus the NI and express ports
+        np.testing.assert_array_equal(model.ports, [4, 4, 3, 4, 5, 4, 3, 4, 4])
+        self.assertEqual(model.width, 128)
+        self.assertEqual(model.vcs, 12)
+        np.testing.assert_allclose(model.length[-2:], [8**0.5] * 2)
+        self.assertEqual(model.length[:-2].tolist(), [1.0] * 24)
+        _, json_model = self._run("json", sections, 1, fmt="json")
+        for field, value in model._asdict().items():
+            np.testing.assert_array_equal(getattr(json_model, field), value)
+        buffers, crossbar, allocators = router_area(model, TECH)
+        self.assertAlmostEqual(
+            buffers[4], 5 * 12 * 4 * 128 * TECH.buffer_bit_area
+        )
+        self.assertAlmostEqual(
+            crossbar[4], (5 * 128 * TECH.crossbar_pitch) ** 2
+        )
+
+    def test_energy(self):
+        sections = _config(2, 2, _mesh_links(2, 2))
+        outdir, model = self._run("mesh", sections, 1)
+        (row,) = evaluate_runs([outdir], TECH, jobs=1)
+        ports = model.ports
+        expected = 0
+        for r in range(4):
+            events = [r + k + 1 for k in range(5)]
+            expected += events[0] * 128 * TECH.buffer_read_energy
+            expected += events[1] * 128 * TECH.buffer_write_energy
+            expected += events[2] * 128 * ports[r] * TECH.crossbar_energy
+            expected += events[3] * 12 * TECH.arbiter_energy
+            expected += events[4] * ports[r] * TECH.arbiter_energy
+        self.assertAlmostEqual(row["router_energy_j"], expected * 1e-12)
+        flits = sum(range(1, 9)) + 20 * 0.5
+        self.assertAlmostEqual(
+            row["link_energy_j"], flits * 128 * TECH.wire_energy * 1e-12
+        )
+        self.assertEqual(row["long_links"], 0)
+        self.assertEqual(row["packets"], 4)
+        self.assertAlmostEqual(
+            row["energy_per_packet_nj"], row["energy_j"] / 4 * 1e9
+        )
+
+    def test_runs(self):
+        mesh = _config(3, 3, _mesh_links(3, 3))
+        express = _config(3, 3, _mesh_links(3, 3, [(0, 8), (2, 6)]))
+        outdirs = [
+            self._run("a", mesh, 1)[0],
+            self._run("b", express, 1)[0],
+            self._run("c", mesh, 2)[0],
+        ]
+        rows = evaluate_runs(outdirs, TECH, tile_mm=2.0, jobs=2)
+        self.assertEqual([row["outdir"] for row in rows], outdirs)
+        self.assertEqual([row["long_links"] for row in rows], [0, 4, 0])
+        self.assertAlmostEqual(rows[1]["wire_mm"], 2 * (24 + 4 * 8**0.5))
+        self.assertAlmostEqual(
+            rows[2]["router_energy_j"], 2 * rows[0]["router_energy_j"]
+        )
+        self.assertGreater(rows[1]["link_area_mm2"], rows[0]["link_area_mm2"])
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            with contextlib.redirect_stderr(io.StringIO()):
+                main(["--root", self.root.name, "--jobs", "1"])
+        self.assertEqual(len(out.getvalue().splitlines()), 4)
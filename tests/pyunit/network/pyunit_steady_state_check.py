@@ -0,0 +1,70 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        os.pardir,
+        os.pardir,
+        os.pardir,
+        "configs",
+    ),
+)
+
+from network.steady_state import SteadyState, t95
+
+
+def _feed(monitor, windows):
+    """Add (injected, received, latency) per window as running totals."""
+    injected = received = latency = 0.0
+    for window in windows:
+        injected += window[0]
+        received += window[1]
+        latency += window[2]
+        monitor.add(injected, received, latency)
+
+
+class SteadyStateTestSuite(unittest.TestCase):
+    """Test cases for the steady-state detection"""
+
+    def test_t_quantiles(self):
+        self.assertEqual(t95(1), 12.706)
+        self.assertEqual(t95(30), 2.042)
+        self.assertEqual(t95(100), 1.96)
+
+    def test_converges_on_stable_latency(self):
+        monitor = SteadyState(ci=0.05, min_windows=5)
+        windows = [(100, 100, 100 * (20 + i % 2)) for i in range(5)]
+        _feed(monitor, windows[:4])
+        self.assertIsNone(monitor.status())
+        monitor = SteadyState(ci=0.05, min_windows=5)
+        _feed(monitor, windows)
+        self.assertAlmostEqual(monitor.mean(), 20.4)
+        self.assertEqual(monitor.status(), "steady state reached")
+
+    def test_noisy_latency_keeps_sampling(self):
+        monitor = SteadyState(ci=0.02, min_windows=5)
+        _feed(monitor, [(100, 100, 1000 * (1 + i % 2)) for i in range(8)])
+        self.assertGreater(monitor.half_width(), 0.02 * monitor.mean())
+        self.assertIsNone(monitor.status())
+
+    def test_empty_windows_are_merged(self):
+        monitor = SteadyState()
+        _feed(monitor, [(10, 0, 0), (10, 10, 300)])
+        self.assertEqual(monitor.latencies, [30])
+
+    def test_saturation(self):
+        monitor = SteadyState(saturation_latency=1000)
+        _feed(monitor, [(100, 100, 100 * 1001)])
+        self.assertEqual(monitor.status(), "network saturated")
+
+        # 40 of every 100 injected packets stay in the network
+        windows = [(100, 60, 60 * 50)] * 4
+        monitor = SteadyState(backlog_windows=3)
+        _feed(monitor, windows[:3])
+        self.assertIsNone(monitor.status())
+        monitor = SteadyState(backlog_windows=3)
+        _feed(monitor, windows)
+        self.assertEqual(monitor.status(), "network saturated")
@@ -0,0 +1,60 @@
+import io
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from m5.ext.pystats.timeseries import (
+    JsonlWriter,
+    read_jsonl,
+    stat_filter,
+)
+
+
+class StatSeriesTestSuite(unittest.TestCase):
+    """Appending and loading stat time series"""
+
+    def test_filter(self):
+        accept = stat_filter("system.ruby.network.routers*, *.latency")
+        self.assertTrue(accept("system.ruby.network.routers03.buffer_reads"))
+        self.assertTrue(accept("system.cpu.latency"))
+        self.assertFalse(accept("system.ruby.network.ext_links0.int_node"))
+        self.assertFalse(accept("system.cpu.latency::total"))
+        self.assertIsNone(stat_filter(None))
+        self.assertIsNone(stat_filter(""))
+
+    def test_jsonl(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "stats.jsonl")
+            writer = JsonlWriter(path)
+            writer.write(1000, ["a", "b::0", "b::1"], [1, 2.5, 3])
+            writer.write(2000, ["a", "b::0", "b::1"], [4, 5, 6])
+            # The names of a sub-tree dump
+            writer.write(2500, ["c"], [7])
+            with open(path) as f:
+                lines = f.read().splitlines()
+            self.assertEqual(len(lines), 5)
+            series = read_jsonl(path)
+        np.testing.assert_array_equal(series.dumps, [0, 1, 2])
+        np.testing.assert_array_equal(series.ticks, [1000, 2000, 2500])
+        self.assertEqual(series.names, ["a", "b::0", "b::1", "c"])
+        np.testing.assert_array_equal(
+            series.values,
+            [[1, 2.5, 3, np.nan], [4, 5, 6, np.nan], [np.nan] * 3 + [7]],
+        )
+        np.testing.assert_array_equal(series.column("b::1")[:2], [3, 6])
+
+    def test_jsonl_stats(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "stats.jsonl")
+            writer = JsonlWriter(path)
+            for dump in range(3):
+                writer.write(dump * 10, ["x.a", "y.b", "x.c"], [dump] * 3)
+            with open(path) as f:
+                text = f.read()
+        series = read_jsonl(io.StringIO(text), ["x.*"])
+        self.assertEqual(series.names, ["x.a", "x.c"])
+        np.testing.assert_array_equal(series.values, [[0, 0], [1, 1], [2, 2]])
+        with self.assertRaises(ValueError):
+            read_jsonl(io.StringIO(text.split("\n", 1)[1]))
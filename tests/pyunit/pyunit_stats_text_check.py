@@ -0,0 +1,82 @@
+import io
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from m5.ext.pystats.textloader import BEGIN, load, load_runs, parse
+
+END = "---------- End Simulation Statistics   ----------"
+
+
+def _dump(ticks, flits):
+    return f"""
+{BEGIN}
+simTicks                                     {ticks}                       # Number of ticks simulated (Tick)
+system.ruby.network.flits::vnet-0          {flits}     75.00%     75.00% # Flits (Count)
+system.ruby.network.flits::vnet-1          {flits / 3:g}     25.00%    100.00% # Flits (Count)
+system.ruby.network.flits::total           {flits * 4 / 3:g}                       # Flits (Count)
+system.ruby.network.latency::samples              4                       # Latency (Tick)
+system.ruby.network.latency::mean          2.500000                       # Latency (Tick)
+system.ruby.network.latency::0-4                  3     75.00%     75.00% # Latency (Tick)
+system.ruby.network.latency::5-9                  1     25.00%    100.00% # Latency (Tick)
+system.ruby.network.latency::total                4                       # Latency (Tick)
+system.ruby.network.ratio                       nan                       # Ratio ((Count/Count))
+system.ruby.network.occupancy               |           1 |           2 |3   50.00%  100.00% # Occupancy (Count)
+
+{END}
+"""
+
+
+class StatsTextTestSuite(unittest.TestCase):
+    """Loading the text stats.txt"""
+
+    def test_parse(self):
+        table = parse(_dump(1000, 6) + _dump(2000, 9))
+        self.assertEqual(len(table), 2 * 13)
+        first = table[table["dump"] == 0]
+        rows = {(r["stat"], r["index"]): r["value"] for r in first}
+        self.assertEqual(rows[("simTicks", "")], 1000)
+        self.assertEqual(rows[("system.ruby.network.flits", "vnet-1")], 2)
+        self.assertEqual(rows[("system.ruby.network.flits", "total")], 8)
+        self.assertEqual(rows[("system.ruby.network.latency", "5-9")], 1)
+        self.assertEqual(rows[("system.ruby.network.latency", "mean")], 2.5)
+        self.assertTrue(np.isnan(rows[("system.ruby.network.ratio", "")]))
+        occupancy = "system.ruby.network.occupancy"
+        self.assertEqual(
+            [rows[(occupancy, str(i))] for i in range(3)], [1, 2, 3]
+        )
+        flits = table[
+            (table["stat"] == "system.ruby.network.flits")
+            & (table["index"] == "vnet-0")
+        ]
+        np.testing.assert_array_equal(flits["value"], [6, 9])
+        np.testing.assert_array_equal(flits["dump"], [0, 1])
+
+    def test_stats(self):
+        text = _dump(1000, 6)
+        table = load(io.StringIO(text), stats="*.latency")
+        self.assertEqual(set(table["stat"]), {"system.ruby.network.latency"})
+        self.assertEqual(len(table), 5)
+        self.assertEqual(len(parse("")), 0)
+
+    def test_runs(self):
+        with tempfile.TemporaryDirectory() as root:
+            for rate in range(3):
+                outdir = os.path.join(root, f"rate_{rate}")
+                os.mkdir(outdir)
+                with open(os.path.join(outdir, "stats.txt"), "w") as f:
+                    f.write(_dump(1000, rate))
+            os.mkdir(os.path.join(root, "empty"))
+            table = load_runs(root, stats="simTicks", jobs=2)
+            self.assertEqual(
+                list(table["run"]),
+                [os.path.join(root, f"rate_{rate}") for rate in range(3)],
+            )
+            np.testing.assert_array_equal(table["value"], [1000] * 3)
+            serial = load_runs(root, jobs=1)
+        self.assertEqual(len(serial), 3 * 13)
+        self.assertEqual(
+            list(serial[serial["index"] == "vnet-0"]["value"]), [0, 1, 2]
+        )
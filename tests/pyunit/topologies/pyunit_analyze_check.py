@@ -0,0 +1,150 @@
+import contextlib
+import csv
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        os.pardir,
+        os.pardir,
+        os.pardir,
+        "configs",
+    ),
+)
+
+import numpy as np
+
+from topologies.analyze import (
+    channel_loads,
+    link_load_rows,
+    main,
+    zero_load_latency,
+)
+from topologies.longrange_planner import (
+    grid_coordinates,
+    grid_index,
+    hop_distances,
+)
+
+
+def _walk_loads(traffic, dims, links):
+    """Route every packet hop by hop and count the flow per channel."""
+    coords = grid_coordinates(dims).tolist()
+    num_routers = len(coords)
+    hops = hop_distances(coords)
+    to = {}
+    for i, j in links:
+        to[i] = j
+        to[j] = i
+    loads = {}
+    for s in range(num_routers):
+        for d in range(num_routers):
+            flow = traffic[s][d] * num_routers
+            cur = s
+            if s in to and 1 + hops[to[s], d] < hops[s, d]:
+                loads[(s, to[s])] = loads.get((s, to[s]), 0) + flow
+                cur = to[s]
+            pos = list(coords[cur])
+            for k in range(len(dims)):
+                while pos[k] != coords[d][k]:
+                    a = int(grid_index(pos, dims))
+                    pos[k] += 1 if coords[d][k] > pos[k] else -1
+                    b = int(grid_index(pos, dims))
+                    loads[(a, b)] = loads.get((a, b), 0) + flow
+    return loads
+
+
+class ChannelLoadTestSuite(unittest.TestCase):
+    """Vectorized channel loads against a hop-by-hop walk"""
+
+    def test_against_walk(self):
+        rng = np.random.default_rng(1)
+        for dims, links in [
+            ((4, 4), [(0, 10), (3, 9)]),
+            ((3, 4), [(0, 11)]),
+            ((3, 3, 3), [(0, 26), (2, 24)]),
+            ((2, 3, 2, 2), [(0, 23)]),
+        ]:
+            n = int(np.prod(dims))
+            traffic = rng.random((n, n))
+            traffic /= traffic.sum()
+            mesh, express, _, _ = channel_loads(traffic, dims, links)
+            got = {
+                (s, d): load
+                for s, d, _, load in link_load_rows(dims, mesh, express)
+                if load > 0
+            }
+            expected = _walk_loads(traffic, dims, links)
+            self.assertEqual(set(got), set(expected))
+            for channel, load in expected.items():
+                self.assertAlmostEqual(got[channel], load)
+
+    def test_uniform_random_bisection(self):
+        # XY routing of uniform traffic on a k x k mesh loads the central
+        # channels with k / 4 flits per unit injection rate.
+        n = 64
+        traffic = np.full((n, n), 1 / n**2)
+        mesh, _, _, _ = channel_loads(traffic, (8, 8), [])
+        self.assertAlmostEqual(mesh.max(), 2.0)
+
+    def test_zero_load_latency(self):
+        # 3 cycles to enter and leave the network plus 2 per hop, at the
+        # 5.25 and 3.75 average hops of uniform traffic on 8x8 and 4x4x4.
+        for dims, expected in [((8, 8), 3 + 5.25 * 2), ((4, 4, 4), 10.5)]:
+            n = int(np.prod(dims))
+            hops = hop_distances(grid_coordinates(dims))
+            traffic = np.full((n, n), 1 / n**2)
+            self.assertAlmostEqual(zero_load_latency(traffic, hops), expected)
+        # Two-cycle routers on 4x4x4 add one cycle per router passed
+        self.assertAlmostEqual(
+            zero_load_latency(traffic, hops, router_latency=2), 15.25
+        )
+
+    def test_hiry_best_effort(self):
+        # Mesh_longrange_HiRy plans greedily like the topology itself
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "analyze.csv")
+            with contextlib.redirect_stderr(io.StringIO()):
+                main(
+                    [
+                        "--topology",
+                        "Mesh_longrange",
+                        "Mesh_longrange_HiRy",
+                        "--output",
+                        path,
+                    ]
+                )
+            with open(path) as f:
+                rows = list(csv.DictReader(f))
+        planners = [(r["best_effort"], r["link_planner"]) for r in rows]
+        self.assertEqual(planners, [("0", "random"), ("1", "greedy")])
+
+    def test_load_planner_routing(self):
+        # The load planner needs the dimension-order routing of the model
+        argv = ["--topology", "Mesh_longrange", "--link-planner", "load"]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "analyze.csv")
+            with contextlib.redirect_stderr(io.StringIO()):
+                main(argv + ["--output", path])
+                for routing in ("5", "8"):
+                    with self.assertRaises(ValueError):
+                        main(argv + ["--routing-algorithm", routing])
+            with open(path) as f:
+                rows = list(csv.DictReader(f))
+        self.assertEqual(rows[0]["link_planner"], "load")
+        with self.assertRaises(ValueError):
+            main(
+                [
+                    "--topology",
+                    "Mesh_longrange_HiRy",
+                    "--link-planner",
+                    "load",
+                    "--output",
+                    os.devnull,
+                ]
+            )
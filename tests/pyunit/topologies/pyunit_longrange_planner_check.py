@@ -0,0 +1,379 @@
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        os.pardir,
+        os.pardir,
+        os.pardir,
+        "configs",
+    ),
+)
+
+from topologies.longrange_planner import (
+    AnnealLinkPlanner,
+    LoadLinkPlanner,
+    anneal_links,
+    check_planner,
+    expected_hops,
+    greedy_links,
+    grid_coordinates,
+    hop_distances,
+    load_links,
+    mesh_channel_loads,
+    plan_long_range_links,
+    read_manifest,
+    route_starts,
+    wire_lengths,
+    write_manifest,
+)
+
+
+def _reference_links(traffic, dims, budget):
+    """The original scalar greedy loop of the *_longrange topologies."""
+    coords = grid_coordinates(dims).tolist()
+    num_routers = len(coords)
+
+    def hops(a, b):
+        return sum(abs(p - q) for p, q in zip(coords[a], coords[b]))
+
+    def wire(a, b):
+        return sum((p - q) ** 2 for p, q in zip(coords[a], coords[b])) ** 0.5
+
+    links = []
+    to = [-1] * num_routers
+    while budget > 0:
+        max_i, max_j, max_d = -1, -1, 0
+        for i in range(num_routers):
+            for j in range(i + 1, num_routers):
+                dst = wire(i, j)
+                if to[i] == -1 and to[j] == -1 and budget >= dst:
+                    cnt = 0
+                    for k in range(num_routers):
+                        cnt += traffic[j][k] * max(
+                            0, hops(k, j) - hops(k, i) - 1
+                        )
+                        cnt += traffic[i][k] * max(
+                            0, hops(k, i) - hops(k, j) - 1
+                        )
+                    if cnt / dst > max_d:
+                        max_i, max_j, max_d = i, j, cnt / dst
+        if max_i == -1:
+            break
+        links.append((max_i, max_j))
+        to[max_i] = max_j
+        to[max_j] = max_i
+        budget -= wire(max_i, max_j)
+    return links
+
+
+def _planned_links(traffic, dims, budget):
+    links, _ = greedy_links(traffic, grid_coordinates(dims), budget)
+    return links
+
+
+def _normalized(traffic):
+    total = sum(sum(row) for row in traffic)
+    return [[v / total for v in row] for row in traffic]
+
+
+class GreedyLinkPlannerTestSuite(unittest.TestCase):
+    """The vectorized planner must reproduce the scalar greedy loop"""
+
+    def _check(self, traffic, dims, budget=12):
+        traffic = _normalized(traffic)
+        self.assertEqual(
+            _planned_links(traffic, dims, budget),
+            _reference_links(traffic, dims, budget),
+        )
+
+    def test_uniform_random(self):
+        for dims in [(4, 4), (5, 3), (6, 6), (3, 3, 3), (2, 3, 2, 2)]:
+            n = len(grid_coordinates(dims))
+            self._check([[1] * n for _ in range(n)], dims)
+
+    def test_transpose(self):
+        n = 16
+        traffic = [[0] * n for _ in range(n)]
+        for i in range(4):
+            for j in range(4):
+                traffic[i + j * 4][j + i * 4] = 1
+        self._check(traffic, (4, 4))
+
+    def test_hotspot(self):
+        n = 16
+        traffic = [[1] * n for _ in range(n)]
+        for hotspot in (5, 11, 12):
+            for j in range(n):
+                traffic[j][hotspot] += 0.2
+        self._check(traffic, (4, 4), budget=20)
+
+    def test_random_traffic(self):
+        rng = random.Random(42)
+        for dims in [(4, 4), (3, 5), (2, 3, 3)]:
+            n = len(grid_coordinates(dims))
+            traffic = [
+                [rng.choice([0, 0, rng.randint(1, 1000)]) for _ in range(n)]
+                for _ in range(n)
+            ]
+            self._check(traffic, dims)
+
+    def test_zero_budget(self):
+        n = 16
+        traffic = _normalized([[1] * n for _ in range(n)])
+        self.assertEqual(_planned_links(traffic, (4, 4), 0), [])
+
+    def test_expected_hops(self):
+        # One packet from router 0 to router 3 of a 1x4 line.
+        traffic = [[0] * 4 for _ in range(4)]
+        traffic[0][3] = 1
+        hops = hop_distances(grid_coordinates((4,)))
+        self.assertEqual(expected_hops(traffic, hops, []), (3.0, 3.0))
+        self.assertEqual(expected_hops(traffic, hops, [(0, 2)]), (3.0, 2.0))
+        self.assertEqual(expected_hops(traffic, hops, [(3, 1)]), (3.0, 3.0))
+
+
+class AnnealLinkPlannerTestSuite(unittest.TestCase):
+    """Annealing must keep within the budget and improve on greedy"""
+
+    def _uniform(self, dims):
+        n = len(grid_coordinates(dims))
+        return _normalized([[1] * n for _ in range(n)])
+
+    def _saving(self, traffic, dims, links):
+        sum_d, sum_rd = expected_hops(
+            traffic, hop_distances(grid_coordinates(dims)), links
+        )
+        return sum_d - sum_rd
+
+    def test_incremental_gain(self):
+        dims = (6, 6)
+        traffic = self._uniform(dims)
+        coords = grid_coordinates(dims)
+        planner = AnnealLinkPlanner(traffic, coords, 20)
+        rng = random.Random(1)
+        for _ in range(2000):
+            move = planner.propose(rng)
+            if move is not None:
+                planner.apply(*move[1:])
+        self.assertAlmostEqual(
+            planner.total, self._saving(traffic, dims, planner.links)
+        )
+        self.assertLessEqual(planner.used, 20 + 1e-9)
+        ends = [k for link in planner.links for k in link]
+        self.assertEqual(len(ends), len(set(ends)))
+
+    def test_improves_on_greedy(self):
+        for dims, budget in [((8, 8), 12), ((4, 4, 4), 12), ((5, 3), 8)]:
+            traffic = self._uniform(dims)
+            coords = grid_coordinates(dims)
+            greedy, _ = greedy_links(traffic, coords, budget)
+            links, remaining = anneal_links(
+                traffic, coords, budget, max_moves=20000
+            )
+            wire = wire_lengths(coords)
+            self.assertAlmostEqual(
+                remaining, budget - sum(wire[i, j] for i, j in links)
+            )
+            self.assertGreaterEqual(remaining, -1e-9)
+            self.assertGreaterEqual(
+                self._saving(traffic, dims, links),
+                self._saving(traffic, dims, greedy) - 1e-12,
+            )
+        traffic = self._uniform((8, 8))
+        greedy, _ = greedy_links(traffic, grid_coordinates((8, 8)), 12)
+        links, _ = anneal_links(
+            traffic, grid_coordinates((8, 8)), 12, max_moves=50000
+        )
+        self.assertGreater(
+            self._saving(traffic, (8, 8), links),
+            self._saving(traffic, (8, 8), greedy),
+        )
+
+    def test_seed(self):
+        traffic = self._uniform((6, 6))
+        coords = grid_coordinates((6, 6))
+        plans = [
+            anneal_links(traffic, coords, 16, seed=seed, max_moves=5000)
+            for seed in (3, 3)
+        ]
+        self.assertEqual(plans[0], plans[1])
+
+
+class LoadLinkPlannerTestSuite(unittest.TestCase):
+    """The load planner must track the loads of topologies.analyze"""
+
+    def _hotspot(self, dims):
+        n = len(grid_coordinates(dims))
+        traffic = [[1] * n for _ in range(n)]
+        for j in range(n):
+            traffic[j][n // 3] += 0.5
+        return _normalized(traffic)
+
+    def _max_load(self, traffic, dims, links):
+        coords = grid_coordinates(dims)
+        flow = np.asarray(traffic) * len(coords)
+        start, express = route_starts(hop_distances(coords), links)
+        loads = [mesh_channel_loads(flow, start, dims).max()]
+        for i, j in links:
+            loads += [flow[i, express[i]].sum(), flow[j, express[j]].sum()]
+        return max(loads + [flow.sum(axis=0).max(), flow.sum(axis=1).max()])
+
+    def test_per_row_loads(self):
+        dims = (4, 3, 2)
+        coords = grid_coordinates(dims)
+        traffic = np.asarray(self._hotspot(dims))
+        start, _ = route_starts(hop_distances(coords), [(0, 23), (5, 14)])
+        rows = mesh_channel_loads(traffic, start, dims, per_row=True)
+        np.testing.assert_allclose(
+            rows.sum(axis=0),
+            mesh_channel_loads(traffic, start, dims),
+            atol=1e-12,
+        )
+        np.testing.assert_allclose(
+            rows[5],
+            mesh_channel_loads(traffic[5:6], start[5:6], dims),
+            atol=1e-12,
+        )
+
+    def test_incremental_loads(self):
+        dims = (6, 6)
+        traffic = self._hotspot(dims)
+        planner = LoadLinkPlanner(traffic, grid_coordinates(dims))
+        links = []
+        for i, j in [(0, 21), (30, 9), (5, 35)]:
+            planner.accept(i, j)
+            links.append((i, j))
+            self.assertAlmostEqual(
+                planner.state()[0], self._max_load(traffic, dims, links)
+            )
+
+    def test_lowers_max_load(self):
+        # The ejection port of the hotspot bounds the load of the cube.
+        for dims, budget in [((8, 8), 24), ((4, 4, 4), 12)]:
+            traffic = self._hotspot(dims)
+            coords = grid_coordinates(dims)
+            greedy, _ = greedy_links(traffic, coords, budget)
+            links, remaining = load_links(traffic, coords, budget)
+            self.assertTrue(links)
+            self.assertGreaterEqual(remaining, 0)
+            self.assertLessEqual(
+                self._max_load(traffic, dims, links),
+                self._max_load(traffic, dims, []),
+            )
+            self.assertLessEqual(
+                self._max_load(traffic, dims, links),
+                self._max_load(traffic, dims, greedy),
+            )
+        traffic = self._hotspot((8, 8))
+        links, _ = load_links(traffic, grid_coordinates((8, 8)), 24)
+        self.assertLess(
+            self._max_load(traffic, (8, 8), links),
+            self._max_load(traffic, (8, 8), []),
+        )
+
+    def test_routing_refused(self):
+        # Only dimension-order routing takes the channels of the loads
+        for routing in (1, 6):
+            check_planner("load", routing)
+        for routing in (None, 0, 4, 5, 7, 8):
+            check_planner("greedy", routing)
+            with self.assertRaises(ValueError):
+                check_planner("load", routing)
+        options = _options(link_planner="load", routing_algorithm=5)
+        with self.assertRaises(ValueError):
+            plan_long_range_links(options, (4, 4), topology="Mesh_longrange")
+
+
+def _options(**kwargs):
+    options = argparse.Namespace(
+        synthetic="uniform_random",
+        traffic_matrix=None,
+        hotspots=[],
+        hotspot_factor=20,
+        single_sender_id=-1,
+        single_dest_id=-1,
+        budget=12,
+        best_effort=False,
+        routing_algorithm=1,
+    )
+    vars(options).update(kwargs)
+    return options
+
+
+def _plan(options, dims=(8, 8)):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return plan_long_range_links(options, dims, topology="Mesh")
+
+
+class TopologyManifestTestSuite(unittest.TestCase):
+    """Seeded plans and their replay from the manifest"""
+
+    def test_seeded_random_links(self):
+        plans = [
+            _plan(_options(topology_seed=seed, budget=40))
+            for seed in (7, 7, 8)
+        ]
+        self.assertEqual(plans[0], plans[1])
+        self.assertNotEqual(plans[0], plans[2])
+
+    def test_manifest(self):
+        options = _options(topology_seed=3, budget=40)
+        links = _plan(options)
+        manifest = options.topology_manifest
+        self.assertEqual(manifest["planner"], "random")
+        self.assertEqual(manifest["seed"], 3)
+        self.assertEqual(manifest["links"], [list(link) for link in links])
+        self.assertAlmostEqual(manifest["wire_used"], sum(manifest["wire"]))
+        self.assertEqual(manifest["remaining_budget"], options.budget)
+        self.assertAlmostEqual(
+            manifest["improvement"],
+            1 - manifest["sum_rd"] / manifest["sum_d"],
+        )
+
+    def test_replay(self):
+        options = _options(link_planner="anneal", planner_moves=2000)
+        links = _plan(options)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "topology.json")
+            write_manifest(path, options.topology_manifest)
+            replay = _options(topology_from=path, topology_seed=5)
+            self.assertEqual(_plan(replay), links)
+            self.assertEqual(replay.budget, options.budget)
+            self.assertEqual(replay.topology_manifest["planner"], "anneal")
+            self.assertEqual(replay.topology_manifest["replayed_from"], path)
+            with self.assertRaises(ValueError):
+                read_manifest(path, "Mesh", (4, 4))
+
+    def test_replay_checks(self):
+        options = _options(best_effort=True, budget=40)
+        links = _plan(options)
+        manifest = options.topology_manifest
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "topology.json")
+            write_manifest(path, manifest)
+            self.assertEqual(read_manifest(path, "Mesh", (8, 8), 40), manifest)
+            # The current --budget does not cover the wire
+            with self.assertRaises(ValueError):
+                _plan(_options(topology_from=path, budget=1))
+            # Hand-edited manifests
+            edits = [
+                ("budget", 1),
+                ("links", manifest["links"] + [[links[0][0], 63]]),
+                ("links", [[5, 5]]),
+                ("links", [[0, 64]]),
+            ]
+            for field, value in edits:
+                write_manifest(path, dict(manifest, **{field: value}))
+                with self.assertRaises(ValueError):
+                    read_manifest(path, "Mesh", (8, 8))
@@ -0,0 +1,136 @@
+import contextlib
+import io
+import itertools
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        os.pardir,
+        os.pardir,
+        os.pardir,
+        "configs",
+    ),
+)
+
+import numpy as np
+
+from topologies.longrange_planner import hop_distances
+from topologies.real_traffic import (
+    main,
+    parse_rtp,
+    read_rtp,
+    remap_cores,
+    traffic_weights,
+    weighted_hops,
+)
+from topologies.traffic_matrix import TrafficMatrix, grid_coordinates
+
+
+def _rtp(rng, rows, cols, num_tasks, num_edges, header=17):
+    """A random graph laid out like the .rtp files of real_traffic."""
+    lines = [f"# header {i}\n" for i in range(header)]
+    lines.append(f"{num_tasks}\t{num_edges}\n")
+    lines += ["\n", "# task\tcore\n"]
+    for task in range(num_tasks):
+        x, y = rng.randrange(rows), rng.randrange(cols)
+        lines.append(f"{task}\t({x},{y})\t1\n")
+    for edge in range(num_edges):
+        src, dst = rng.randrange(num_tasks), rng.randrange(num_tasks)
+        volumes = "\t".join(
+            f"{rng.random() * 10:.3f}" for _ in range(rng.randint(1, 3))
+        )
+        lines.append(f"{edge}\t{src}\t{dst}\t7\t{volumes}\n")
+    return lines
+
+
+def _reference(lines, rows, cols):
+    """The loop of the original extract_traffic.py."""
+    num = rows * cols
+    parts = lines[17].split("\t")
+    num_tasks = int(parts[0])
+    num_edges = int(parts[1])
+    task2id = [-1] * num_tasks
+    traffic_matrix = [[0 for i in range(num)] for j in range(num)]
+    for i in range(20, 20 + num_tasks):
+        parts = lines[i].split("\t")
+        x = int(parts[1].split(",")[0].split("(")[1])
+        y = int(parts[1].split(",")[1].split(")")[0])
+        task2id[i - 20] = x + y * rows
+    for i in range(20 + num_tasks, 20 + num_tasks + num_edges):
+        parts = lines[i].split("\t")
+        src = int(parts[1])
+        dst = int(parts[2])
+        total = 0
+        for part in parts[3:]:
+            if "." in part:
+                total += float(part) * 100
+        traffic_matrix[task2id[src]][task2id[dst]] = int(total)
+    return traffic_matrix
+
+
+class RealTrafficTestSuite(unittest.TestCase):
+    """Extraction of the .rtp application graphs"""
+
+    def test_matches_original_extraction(self):
+        rng = random.Random(3)
+        for rows, cols in [(2, 2), (3, 3), (4, 4)]:
+            lines = _rtp(rng, rows, cols, 3 * rows * cols, 200)
+            weights = traffic_weights(parse_rtp(lines), (rows, cols), "last")
+            self.assertEqual(weights.tolist(), _reference(lines, rows, cols))
+
+    def test_sum_and_header(self):
+        lines = _rtp(random.Random(5), 3, 3, 20, 100, header=4)
+        graph = parse_rtp(lines)
+        self.assertEqual(len(graph.positions), 20)
+        weights = traffic_weights(graph, (3, 3))
+        self.assertEqual(weights.sum(), graph.volume.sum())
+        with self.assertRaises(ValueError):
+            parse_rtp(lines[:-1])
+
+    def test_remap(self):
+        rng = np.random.default_rng(1)
+        dims = (3, 3)
+        weights = rng.integers(0, 100, (9, 9)) * (rng.random((9, 9)) < 0.3)
+        place, remapped = remap_cores(weights, dims)
+        for a, b in itertools.product(range(9), repeat=2):
+            self.assertEqual(remapped[place[a], place[b]], weights[a, b])
+        hops = hop_distances(grid_coordinates(dims))
+        after = weighted_hops(remapped, hops)
+        self.assertLessEqual(after, weighted_hops(weights, hops))
+        # No single swap improves the result any more.
+        for a, b in itertools.combinations(range(9), 2):
+            swapped = remapped.copy()
+            swapped[[a, b]] = swapped[[b, a]]
+            swapped[:, [a, b]] = swapped[:, [b, a]]
+            self.assertGreaterEqual(weighted_hops(swapped, hops), after)
+
+    def test_command_line(self):
+        rng = random.Random(7)
+        with tempfile.TemporaryDirectory() as root:
+            paths = []
+            for rows, cols in [(2, 2), (4, 4)]:
+                directory = os.path.join(root, f"mesh_{rows}x{cols}")
+                os.mkdir(directory)
+                for app in ("a", "b"):
+                    path = os.path.join(
+                        directory, f"{app}_mesh_{rows}x{cols}.rtp"
+                    )
+                    with open(path, "w") as f:
+                        f.writelines(_rtp(rng, rows, cols, 30, 80))
+                    paths.append((path, (rows, cols)))
+            with contextlib.redirect_stdout(io.StringIO()):
+                with contextlib.redirect_stderr(io.StringIO()):
+                    main([root, "--format", "csr", "--jobs", "2"])
+            for path, dims in paths:
+                matrix = TrafficMatrix.read(
+                    path[: -len(".rtp")] + "_traffic.tmb", dims
+                )
+                np.testing.assert_array_equal(
+                    matrix.weights, traffic_weights(read_rtp(path), dims)
+                )
@@ -0,0 +1,58 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        os.pardir,
+        os.pardir,
+        os.pardir,
+        "configs",
+    ),
+)
+
+from topologies.topology_cache import TopologyCache, make_key
+
+
+def _key(budget):
+    return make_key("Mesh_longrange", (4, 4), "transpose", "ab", budget, True)
+
+
+class TopologyCacheTestSuite(unittest.TestCase):
+    """Test cases for the planned topology cache"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = TopologyCache(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        self.assertIsNone(self.cache.get(_key(12)))
+        self.cache.put(_key(12), links=[(1, 2), (3, 4)], remaining_budget=1)
+        entry = self.cache.get(_key(12))
+        self.assertEqual(entry["links"], [[1, 2], [3, 4]])
+        self.assertEqual(entry["remaining_budget"], 1)
+        self.assertIsNone(self.cache.get(_key(13)))
+
+    def test_lru_eviction(self):
+        for budget in range(3):
+            self.cache.put(_key(budget), links=[])
+            os.utime(self.cache._path(_key(budget)), (budget, budget))
+        # Touch the oldest entry so that the second one is evicted first.
+        self.cache.get(_key(0))
+        total = sum(size for _, size, _ in self.cache.entries())
+        self.assertEqual(self.cache.prune(total - 1), 1)
+        self.assertIsNotNone(self.cache.get(_key(0)))
+        self.assertIsNone(self.cache.get(_key(1)))
+        self.assertIsNotNone(self.cache.get(_key(2)))
+
+    def test_clear(self):
+        for budget in range(3):
+            self.cache.put(_key(budget), links=[])
+        self.assertEqual(self.cache.clear(), 3)
+        self.assertEqual(self.cache.entries(), [])
@@ -0,0 +1,140 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        os.pardir,
+        os.pardir,
+        os.pardir,
+        "configs",
+    ),
+)
+
+from topologies.longrange_planner import greedy_links
+from topologies.traffic_matrix import (
+    PATTERNS,
+    TrafficMatrix,
+    grid_coordinates,
+    map_binary,
+)
+
+
+_PERMUTATIONS = [
+    "tornado",
+    "bit_complement",
+    "bit_reverse",
+    "neighbor",
+    "transpose",
+]
+
+
+def _destination(pattern, x, y, radix):
+    """Destination (x, y) of the permutation patterns on a square mesh."""
+    if pattern == "tornado":
+        return (x + radix // 2) % radix, y
+    if pattern == "bit_complement":
+        return radix - 1 - x, radix - 1 - y
+    if pattern == "bit_reverse":
+        return x ^ (radix - 1), y ^ (radix - 1)
+    if pattern == "neighbor":
+        return (x + 1) % radix, y
+    if pattern == "transpose":
+        return y, x
+
+
+class TrafficMatrixTestSuite(unittest.TestCase):
+    """Test cases for the synthetic traffic matrices"""
+
+    def test_permutations(self):
+        radix = 4
+        for pattern in _PERMUTATIONS:
+            weights = TrafficMatrix.from_pattern(pattern, (radix, radix))
+            self.assertEqual(weights.weights.dtype, np.float32)
+            for src in range(radix * radix):
+                x, y = _destination(pattern, src % radix, src // radix, radix)
+                row = np.zeros(radix * radix)
+                row[y * radix + x] = 1
+                np.testing.assert_array_equal(weights.weights[src], row)
+
+    def test_cube_transpose_keeps_depth(self):
+        weights = TrafficMatrix.from_pattern("transpose", (4, 4, 4)).weights
+        # (1, 2, 3) -> (2, 1, 3)
+        self.assertEqual(weights[1 + 2 * 4 + 3 * 16].argmax(), 2 + 4 + 48)
+
+    def test_hotspot_and_single_sender(self):
+        weights = TrafficMatrix.from_pattern(
+            "hotspot", (4, 4), hotspots=[5], hotspot_factor=20, single_sender=3
+        ).weights
+        self.assertEqual(weights[3, 5], 1 + 20 / 100.0)
+        self.assertEqual(weights[3, 6], 1)
+        self.assertEqual(np.count_nonzero(weights.sum(axis=1)), 1)
+
+    def test_hotspot_plan(self):
+        # The links planned for the original 1 + factor / 100 weights
+        dims = (4, 4, 4)
+        traffic = TrafficMatrix.from_pattern(
+            "hotspot", dims, hotspots=[0, 21], hotspot_factor=20
+        ).normalized()
+        links, _ = greedy_links(traffic, grid_coordinates(dims), 6)
+        self.assertEqual(links, [(41, 63), (0, 22)])
+
+    def test_normalized(self):
+        weights = TrafficMatrix.from_pattern("shuffle", (8, 8)).normalized()
+        self.assertEqual(weights.dtype, np.float64)
+        self.assertAlmostEqual(weights.sum(), 1.0)
+        np.testing.assert_array_equal(weights.sum(axis=0), 1 / 64)
+
+    def test_write_read(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "traffic.txt")
+            for pattern in PATTERNS[:-1]:
+                matrix = TrafficMatrix.from_pattern(
+                    pattern, (4, 4), hotspots=[1, 2], hotspot_factor=30
+                )
+                matrix.write(path)
+                read = TrafficMatrix.read(path, (4, 4))
+                np.testing.assert_array_equal(
+                    read.weights, matrix.integer_weights()
+                )
+                np.testing.assert_allclose(
+                    read.normalized(), matrix.normalized(), rtol=1e-6
+                )
+
+    def test_binary_layouts(self):
+        weights = np.arange(64, dtype=np.float32).reshape(8, 8) % 5
+        weights[3] = 0
+        matrix = TrafficMatrix(weights, (4, 2))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "traffic.tmb")
+            for layout in ["dense", "csr"]:
+                matrix.write_binary(path, layout)
+                mapped = map_binary(path)
+                self.assertEqual(mapped.layout, layout)
+                self.assertEqual(mapped.dims, (4, 2))
+                np.testing.assert_array_equal(mapped.row_sums, weights.sum(1))
+                read = TrafficMatrix.read(path, (4, 2))
+                np.testing.assert_array_equal(read.weights, weights)
+            # A permutation is much smaller in CSR.
+            TrafficMatrix.from_pattern("shuffle", (8, 8)).write_binary(path)
+            self.assertEqual(map_binary(path).layout, "csr")
+            with self.assertRaises(ValueError):
+                TrafficMatrix.read(path, (16, 16))
+
+    def test_fractional_weights_are_scaled(self):
+        matrix = TrafficMatrix(np.full((4, 4), 0.25), (2, 2))
+        matrix.weights[0, 0] = 1e-9
+        ints = matrix.integer_weights()
+        self.assertEqual(ints.max(), 1 << 20)
+        self.assertEqual(ints[0, 0], 1)
+
+    def test_shape_mismatch(self):
+        with self.assertRaises(ValueError):
+            TrafficMatrix(np.ones((4, 4)), (3, 3))
+        with self.assertRaises(ValueError):
+            TrafficMatrix.from_pattern("transpose", (8, 4))
@@ -0,0 +1,149 @@
+import importlib.util
+import io
+import os
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+# util is not put on sys.path, where util/m5 would shadow the m5 package
+_spec = importlib.util.spec_from_file_location(
+    "protolib",
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        os.pardir,
+        os.pardir,
+        os.pardir,
+        "util",
+        "protolib.py",
+    ),
+)
+protolib = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(protolib)
+
+
+def _varint(value):
+    out = io.BytesIO()
+    protolib._EncodeVarint32(out, value)
+    return out.getvalue()
+
+
+def _packets(count, seed=0):
+    """Random Packet fields and their length-delimited encoding."""
+    rng = random.Random(seed)
+    packets = []
+    trace = b""
+    for i in range(count):
+        packet = {
+            "tick": i * 500 + rng.randrange(1 << 40),
+            "cmd": rng.choice([1, 4]),
+            "addr": rng.randrange(1 << 48),
+            "size": 64,
+        }
+        for name, chance, bits in (
+            ("flags", 0.5, 32),
+            ("pkt_id", 0.5, 64),
+            ("pc", 0.3, 64),
+        ):
+            if rng.random() < chance:
+                packet[name] = rng.randrange(1 << bits)
+        message = b"".join(
+            _varint(number << 3) + _varint(packet[name])
+            for name, number, _, _ in protolib.PACKET_FIELDS
+            if name in packet
+        )
+        packets.append(packet)
+        trace += _varint(len(message)) + message
+    return packets, trace
+
+
+class ProtolibTestSuite(unittest.TestCase):
+    """Chunked decoding of length-delimited protobuf traces"""
+
+    def test_frames(self):
+        messages = [b"a" * size for size in (1, 127, 128, 300, 5)]
+        trace = b"".join(_varint(len(m)) + m for m in messages)
+        for chunk_size in (1, 7, 128, 1 << 22):
+            self.assertEqual(
+                list(protolib.iterFrames(io.BytesIO(trace), chunk_size)),
+                messages,
+            )
+        self.assertEqual(list(protolib.iterFrames(trace, 3)), messages)
+        self.assertEqual(
+            list(protolib.iterFrames(b"gem5" + trace, offset=4)), messages
+        )
+        # A message of size zero ends the trace, a truncated one is dropped
+        self.assertEqual(list(protolib.iterFrames(trace[:-1])), messages[:-1])
+        ended = _varint(1) + b"a" + _varint(0) + trace
+        self.assertEqual(list(protolib.iterFrames(ended)), [b"a"])
+
+    def test_fields(self):
+        id_string = b"\x08\x01\x12\x03cpu"
+        header = (
+            b"\x0a\x04gem5\x10\x01\x18"
+            + _varint(10**12)
+            + b"\x22"
+            + _varint(len(id_string))
+            + id_string
+        )
+        self.assertEqual(
+            protolib.decodeFields(header),
+            [(1, b"gem5"), (2, 1), (3, 10**12), (4, id_string)],
+        )
+        with self.assertRaises(ValueError):
+            protolib.decodeFields(header[:-1])
+
+    def test_packet_arrays(self):
+        packets, trace = _packets(2000)
+        arrays = protolib.decodePacketArrays(trace)
+        for chunk_size in (1, 100, 4096):
+            chunks = list(
+                protolib.iterPacketArrays(io.BytesIO(trace), chunk_size)
+            )
+            self.assertGreater(len(chunks), 1)
+            for name, column in protolib.decodePacketArrays(
+                io.BytesIO(trace), chunk_size
+            ).items():
+                np.testing.assert_array_equal(column, arrays[name])
+        for name, number, dtype, optional in protolib.PACKET_FIELDS:
+            self.assertEqual(arrays[name].dtype, np.dtype(dtype))
+            self.assertEqual(
+                arrays[name].tolist(),
+                [packet.get(name, 0) for packet in packets],
+            )
+            if optional:
+                self.assertEqual(
+                    arrays["has_" + name].tolist(),
+                    [name in packet for packet in packets],
+                )
+
+    def test_packet_arrays_end(self):
+        packets, trace = _packets(10)
+        self.assertEqual(len(protolib.decodePacketArrays(b"")["tick"]), 0)
+        truncated = protolib.decodePacketArrays(trace[:-1])
+        self.assertEqual(len(truncated["tick"]), 9)
+        ended = trace + _varint(0) + trace
+        self.assertEqual(len(protolib.decodePacketArrays(ended)["tick"]), 10)
+        # A message whose length does not end it at a varint
+        with self.assertRaises(ValueError):
+            protolib.decodePacketArrays(bytes([trace[0] - 1]) + trace[1:])
+        # A length-delimited field
+        with self.assertRaises(ValueError):
+            protolib.decodePacketArrays(b"\x03\x0a\x01a")
+
+    def test_write(self):
+        packets, trace = _packets(100)
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "packets.npz")
+            count = protolib.writePacketArrays(
+                path,
+                protolib.iterPacketArrays(trace, 256),
+                {"tick_freq": 10**12},
+            )
+            self.assertEqual(count, 100)
+            with np.load(path) as saved:
+                self.assertEqual(int(saved["tick_freq"]), 10**12)
+                self.assertEqual(
+                    saved["addr"].tolist(), [p["addr"] for p in packets]
+                )
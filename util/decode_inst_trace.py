@@ -81,7 +81,7 @@ def main():
         exit(-1)
 
     # Open the file in read mode
-    proto_in = protolib.openFileRd(sys.argv[1])
+    proto_in = protolib.openFileBuf(sys.argv[1])
 
     try:
         ascii_out = open(sys.argv[2], "w")
@@ -124,7 +124,7 @@ def main():
         "size",
         "mem_flags",
     )
-    while protolib.decodeMessage(proto_in, inst):
+    for inst in protolib.decodeMessages(proto_in, inst):
         # If we have a tick use it, otherwise count instructions
         if inst.HasField("tick"):
             tick = inst.tick
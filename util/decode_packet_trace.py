@@ -36,7 +36,9 @@
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 # This script is used to dump protobuf packet traces to ASCII
-# format.
+# format, or to NumPy (.npz) or Parquet (.parquet) arrays with one
+# element per packet. The arrays are decoded without the protobuf
+# module, a chunk of the trace at a time.
 
 import os
 import protolib
@@ -44,24 +46,45 @@ import subprocess
 import sys
 
 util_dir = os.path.dirname(os.path.realpath(__file__))
-# Make sure the proto definitions are up to date.
-subprocess.check_call(["make", "--quiet", "-C", util_dir, "packet_pb2.py"])
-import packet_pb2
+
+
+def import_packet_pb2():
+    # Make sure the proto definitions are up to date.
+    subprocess.check_call(["make", "--quiet", "-C", util_dir, "packet_pb2.py"])
+    import packet_pb2
+
+    return packet_pb2
+
+
+def decode_header(frame):
+    """The PacketHeader fields of an encoded header, as a dict."""
+    header = {"obj_id": "", "ver": 0, "tick_freq": 0, "id_strings": []}
+    for number, value in protolib.decodeFields(frame):
+        if number == 1:
+            header["obj_id"] = value.decode()
+        elif number == 2:
+            header["ver"] = value
+        elif number == 3:
+            header["tick_freq"] = value
+        elif number == 4:
+            id_string = dict(protolib.decodeFields(value))
+            header["id_strings"].append(
+                (id_string.get(1, 0), id_string.get(2, b"").decode())
+            )
+    return header
 
 
 def main():
     if len(sys.argv) != 3:
-        print("Usage: ", sys.argv[0], " <protobuf input> <ASCII output>")
+        print(
+            "Usage: ",
+            sys.argv[0],
+            " <protobuf input> <ASCII, .npz or .parquet output>",
+        )
         exit(-1)
 
     # Open the file in read mode
-    proto_in = protolib.openFileRd(sys.argv[1])
-
-    try:
-        ascii_out = open(sys.argv[2], "w")
-    except IOError:
-        print("Failed to open ", sys.argv[2], " for writing")
-        exit(-1)
+    proto_in = protolib.openFileBuf(sys.argv[1])
 
     # Read the magic number in 4-byte Little Endian
     magic_number = proto_in.read(4).decode()
@@ -72,23 +95,41 @@ def main():
 
     print("Parsing packet header")
 
-    # Add the packet header
-    header = packet_pb2.PacketHeader()
-    protolib.decodeMessage(proto_in, header)
+    header = decode_header(protolib.readFrame(proto_in) or b"")
 
-    print("Object id:", header.obj_id)
-    print("Tick frequency:", header.tick_freq)
+    print("Object id:", header["obj_id"])
+    print("Tick frequency:", header["tick_freq"])
 
-    for id_string in header.id_strings:
-        print("Master id %d: %s" % (id_string.key, id_string.value))
+    for key, value in header["id_strings"]:
+        print("Master id %d: %s" % (key, value))
 
     print("Parsing packets")
 
+    if sys.argv[2].endswith((".npz", ".parquet")):
+        metadata = {
+            "obj_id": header["obj_id"],
+            "tick_freq": header["tick_freq"],
+        }
+        num_packets = protolib.writePacketArrays(
+            sys.argv[2], protolib.iterPacketArrays(proto_in), metadata
+        )
+        print("Parsed packets:", num_packets)
+        proto_in.close()
+        return
+
+    packet_pb2 = import_packet_pb2()
+
+    try:
+        ascii_out = open(sys.argv[2], "w")
+    except IOError:
+        print("Failed to open ", sys.argv[2], " for writing")
+        exit(-1)
+
     num_packets = 0
     packet = packet_pb2.Packet()
 
     # Decode the packet messages until we hit the end of the file
-    while protolib.decodeMessage(proto_in, packet):
+    for packet in protolib.decodeMessages(proto_in, packet):
         num_packets += 1
         # ReadReq is 1 and WriteReq is 4 in src/mem/packet.hh Command enum
         cmd = "r" if packet.cmd == 1 else ("w" if packet.cmd == 4 else "u")
@@ -67,8 +67,11 @@
 # This file is a library of commonly used functions used when interfacing
 # with protobuf python messages. For eg, the decode scripts for different
 # types of proto objects can use the same function to decode a single message
+# or, with decodeMessages, all the messages of a large trace a chunk at a
+# time. Packet traces can also be decoded straight into NumPy arrays.
 
 import gzip
+import mmap
 import struct
 
 
@@ -97,6 +100,25 @@ def openFileRd(in_file):
     return proto_in
 
 
+def openFileBuf(in_file):
+    """
+    Like openFileRd, but an uncompressed file is memory-mapped instead
+    of read through a file handle. The mmap supports read() and seek()
+    like a file, and is scanned without copying by iterFrames and
+    iterPacketArrays.
+    """
+    proto_in = openFileRd(in_file)
+    if isinstance(proto_in, gzip.GzipFile):
+        return proto_in
+    try:
+        buf = mmap.mmap(proto_in.fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError:
+        # Empty files cannot be mapped
+        return proto_in
+    proto_in.close()
+    return buf
+
+
 def _DecodeVarint32(in_file):
     """
     The decoding of the Varint32 is copied from
@@ -128,20 +150,31 @@ def _DecodeVarint32(in_file):
             raise IOError("Too many bytes when decoding varint.")
 
 
-def decodeMessage(in_file, message):
+def readFrame(in_file):
     """
-    Attempt to read a message from the file and decode it. Return
-    False if no message could be read.
+    Read the encoded bytes of the next message from the file. Return
+    None if no message could be read.
     """
     try:
         size, pos = _DecodeVarint32(in_file)
         if size == 0:
-            return False
+            return None
         buf = in_file.read(size)
-        message.ParseFromString(buf)
-        return True
+        return buf if len(buf) == size else None
     except IOError:
+        return None
+
+
+def decodeMessage(in_file, message):
+    """
+    Attempt to read a message from the file and decode it. Return
+    False if no message could be read.
+    """
+    buf = readFrame(in_file)
+    if buf is None:
         return False
+    message.ParseFromString(buf)
+    return True
 
 
 def _EncodeVarint32(out_file, value):
@@ -166,3 +199,327 @@ def encodeMessage(out_file, message):
     out = message.SerializeToString()
     _EncodeVarint32(out_file, len(out))
     out_file.write(out)
+
+
+def _DecodeVarint(buf, pos):
+    """
+    Decode the varint at position pos of a buffer. Return the value
+    and the position after it, or None if the buffer ends first.
+    """
+    result = 0
+    shift = 0
+    while pos < len(buf):
+        b = buf[pos]
+        result |= (b & 0x7F) << shift
+        pos += 1
+        if not (b & 0x80):
+            return (result, pos)
+        shift += 7
+        if shift >= 64:
+            raise IOError("Too many bytes when decoding varint.")
+    return None
+
+
+def _reader(source, offset):
+    """
+    A function reading the next bytes of a file, or of a buffer such as
+    bytes or an mmap from position offset on.
+    """
+    if hasattr(source, "read"):
+        return source.read
+
+    def read(size):
+        nonlocal offset
+        buf = source[offset : offset + size]
+        offset += len(buf)
+        return buf
+
+    return read
+
+
+def iterFrames(source, chunk_size=1 << 22, offset=0):
+    """
+    Generate the encoded bytes of the messages of a file or a buffer.
+
+    The source is read chunk_size bytes at a time and the frames are cut
+    out of every chunk, instead of reading the trace one byte at a time;
+    a frame that straddles two chunks is carried over to the next one.
+    Like decodeMessage, this stops at a message of size zero or at a
+    truncated message at the end of the source.
+    """
+    read = _reader(source, offset)
+    rest = b""
+    while True:
+        chunk = read(chunk_size)
+        if not chunk:
+            return
+        buf = rest + chunk if rest else chunk
+        end = len(buf)
+        pos = 0
+        while pos < end:
+            size = buf[pos]
+            start = pos + 1
+            if size & 0x80:
+                varint = _DecodeVarint(buf, pos)
+                if varint is None:
+                    break
+                size, start = varint
+            if size == 0:
+                return
+            if start + size > end:
+                break
+            pos = start + size
+            yield bytes(buf[start:pos])
+        rest = buf[pos:]
+
+
+def decodeMessages(source, message, chunk_size=1 << 22, offset=0):
+    """
+    Generate the messages of a file or a buffer, see iterFrames. Every
+    message is decoded into, and yielded as, the same message object.
+    """
+    for frame in iterFrames(source, chunk_size, offset):
+        message.ParseFromString(frame)
+        yield message
+
+
+def decodeMessageBatches(
+    source, message_type, batch_size=4096, chunk_size=1 << 22, offset=0
+):
+    """
+    Generate the messages of a file or a buffer as lists of up to
+    batch_size new messages of message_type, see iterFrames.
+    """
+    batch = []
+    for frame in iterFrames(source, chunk_size, offset):
+        message = message_type()
+        message.ParseFromString(frame)
+        batch.append(message)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def decodeFields(buf):
+    """
+    Decode the fields of an encoded message without its definition.
+    Return a list of (field number, value) pairs in the order of the
+    message: varints are ints, fixed-size fields are the raw 4 or 8
+    bytes and length-delimited fields (strings and nested messages)
+    are bytes.
+    """
+    fields = []
+    pos = 0
+    while pos < len(buf):
+        varint = _DecodeVarint(buf, pos)
+        if varint is None:
+            raise ValueError("Truncated field tag")
+        tag, pos = varint
+        wire_type = tag & 7
+        if wire_type == 0:
+            varint = _DecodeVarint(buf, pos)
+            if varint is None:
+                raise ValueError("Truncated varint field")
+            value, pos = varint
+        elif wire_type in (1, 2, 5):
+            size = {1: 8, 5: 4}.get(wire_type)
+            if size is None:
+                varint = _DecodeVarint(buf, pos)
+                if varint is None:
+                    raise ValueError("Truncated field length")
+                size, pos = varint
+            value = bytes(buf[pos : pos + size])
+            if len(value) != size:
+                raise ValueError("Truncated field")
+            pos += size
+        else:
+            raise ValueError(f"Unsupported wire type {wire_type}")
+        fields.append((tag >> 3, value))
+    return fields
+
+
+# The fields of the Packet message of src/proto/packet.proto, which are
+# all varints, as (name, field number, NumPy type name, optional)
+PACKET_FIELDS = (
+    ("tick", 1, "uint64", False),
+    ("cmd", 2, "uint32", False),
+    ("addr", 3, "uint64", False),
+    ("size", 4, "uint32", False),
+    ("flags", 5, "uint32", True),
+    ("pkt_id", 6, "uint64", True),
+    ("pc", 7, "uint64", True),
+)
+
+
+def _decodePacketChunk(buf):
+    """
+    Decode the complete Packet messages at the start of a buffer into
+    arrays. Return the arrays, the number of bytes they were decoded
+    from and whether a message of size zero ended the trace.
+
+    Only the walk from one length prefix to the next is done per
+    message. The length prefixes, tags and values of the messages are
+    all varints, so the varints of all the messages are then decoded at
+    once.
+    """
+    import numpy as np
+
+    frames = []
+    done = False
+    end = len(buf)
+    pos = 0
+    while pos < end:
+        size = buf[pos]
+        start = pos + 1
+        if size & 0x80:
+            varint = _DecodeVarint(buf, pos)
+            if varint is None:
+                break
+            size, start = varint
+        if size == 0:
+            done = True
+            break
+        if start + size > end:
+            break
+        frames.append(pos)
+        pos = start + size
+    if not frames:
+        return None, pos, done
+
+    data = np.frombuffer(buf, dtype=np.uint8, count=pos)
+    if data[-1] & 0x80:
+        raise ValueError("Packet message ends within a varint")
+    ends = np.flatnonzero(data < 0x80)
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    lengths = ends - starts + 1
+    if lengths.max() > 10:
+        raise IOError("Too many bytes when decoding varint.")
+    shifts = 7 * (np.arange(pos) - np.repeat(starts, lengths))
+    values = np.bitwise_or.reduceat(
+        (data & 0x7F).astype(np.uint64) << shifts.astype(np.uint64), starts
+    )
+
+    # The varints of every message: its length prefix, then a tag and a
+    # value per field
+    first = np.zeros(pos, dtype=bool)
+    first[frames] = True
+    first = first[starts]
+    if first.sum() != len(frames):
+        raise ValueError("Packet message ends within a varint")
+    frame = np.cumsum(first) - 1
+    fields = np.arange(len(starts)) - np.flatnonzero(first)[frame] - 1
+    if np.any(np.diff(np.append(np.flatnonzero(first), len(starts))) % 2 == 0):
+        raise ValueError("Truncated field in Packet message")
+    tags = np.flatnonzero((fields >= 0) & (fields % 2 == 0))
+    if np.any(values[tags] & np.uint64(7)):
+        raise ValueError("Packet message with a field that is not a varint")
+    numbers = values[tags] >> np.uint64(3)
+    frame = frame[tags]
+    values = values[tags + 1]
+
+    arrays = {}
+    for name, number, dtype, optional in PACKET_FIELDS:
+        field = numbers == number
+        arrays[name] = np.zeros(len(frames), dtype=dtype)
+        arrays[name][frame[field]] = values[field]
+        if optional:
+            arrays["has_" + name] = np.zeros(len(frames), dtype=bool)
+            arrays["has_" + name][frame[field]] = True
+    return arrays, pos, done
+
+
+def iterPacketArrays(source, chunk_size=1 << 22, offset=0):
+    """
+    Generate the Packet messages of a file or a buffer (after the packet
+    header) as dicts of NumPy arrays, one per chunk of chunk_size bytes.
+    Every dict has an array per field of PACKET_FIELDS, and a boolean
+    array has_<field> for the optional ones. This does not need the
+    protobuf module.
+    """
+    read = _reader(source, offset)
+    rest = b""
+    while True:
+        chunk = read(chunk_size)
+        if not chunk:
+            return
+        buf = rest + chunk if rest else chunk
+        arrays, consumed, done = _decodePacketChunk(buf)
+        if arrays is not None:
+            yield arrays
+        if done:
+            return
+        rest = buf[consumed:]
+
+
+def _packetColumns(optional):
+    """The (name, NumPy type name) of the packet arrays."""
+    for name, number, dtype, is_optional in PACKET_FIELDS:
+        yield name, dtype
+        if is_optional and optional:
+            yield "has_" + name, "bool"
+
+
+def _concatPacketArrays(chunks):
+    import numpy as np
+
+    chunks = list(chunks)
+    return {
+        name: np.concatenate([chunk[name] for chunk in chunks])
+        if chunks
+        else np.zeros(0, dtype=dtype)
+        for name, dtype in _packetColumns(True)
+    }
+
+
+def decodePacketArrays(source, chunk_size=1 << 22, offset=0):
+    """
+    Decode all the Packet messages of a file or a buffer into one dict
+    of NumPy arrays, see iterPacketArrays.
+    """
+    return _concatPacketArrays(iterPacketArrays(source, chunk_size, offset))
+
+
+def writePacketArrays(out_file, chunks, metadata=None):
+    """
+    Write the packet arrays of iterPacketArrays to a NumPy .npz file, or
+    to a Parquet file (which needs pyarrow) if out_file ends in
+    ".parquet". In Parquet, every chunk is a row group and the optional
+    fields are null where they are missing. The metadata, such as the
+    tick frequency of the trace, is stored as extra arrays of the .npz
+    file or as the schema metadata of the Parquet file. Return the
+    number of packets written.
+    """
+    import numpy as np
+
+    metadata = {key: str(value) for key, value in (metadata or {}).items()}
+    if not out_file.endswith(".parquet"):
+        arrays = _concatPacketArrays(chunks)
+        np.savez(out_file, **arrays, **metadata)
+        return len(arrays["tick"])
+
+    import pyarrow
+    import pyarrow.parquet
+
+    schema = pyarrow.schema(
+        [
+            (name, pyarrow.from_numpy_dtype(np.dtype(dtype)))
+            for name, dtype in _packetColumns(False)
+        ],
+        metadata=metadata,
+    )
+    count = 0
+    with pyarrow.parquet.ParquetWriter(out_file, schema) as writer:
+        for chunk in chunks:
+            columns = []
+            for name, number, dtype, optional in PACKET_FIELDS:
+                mask = ~chunk["has_" + name] if optional else None
+                columns.append(pyarrow.array(chunk[name], mask=mask))
+            writer.write_table(
+                pyarrow.Table.from_arrays(columns, schema=schema)
+            )
+            count += len(chunk["tick"])
+    return count